@@ -3,7 +3,7 @@
 # VS_build.py (minimal v2, MSBuild Copy вместо xcopy/cmd)
 #
 # VS2022 C++ (x64) проект под SDL2 + SDL2_image (динамические либы).
-# Опционально: --full (SDL2_ttf + SDL2_mixer), --git (git init)
+# Опционально: --full (SDL2_ttf + SDL2_mixer), --git (git init), --git-commit (+ первый коммит)
 #
 # Делает:
 # - Создаёт папку проекта: <out>\<ProjectName>\
@@ -15,12 +15,61 @@
 # - Линкует SDL2/SDL2_image (+ ttf/mixer при --full)
 # - Копирует DLL после сборки средствами MSBuild <Copy> (без cmd/xcopy!)
 # - Проверяет наличие .lib/.dll и предупреждает (или падает при --fail-on-missing)
+# - GUID'ы детерминированные (uuid5 от имени проекта) или берутся из уже существующих файлов
+# - --incremental: пишет только изменившиеся файлы (манифест .vsbuild/manifest.json)
+# - Пакетный режим (несколько имён или --batch FILE): пул потоков + общий .sln
+# - --sdl-root: автопоиск версий SDL; листинги SDK кешируются по mtime директорий
+# - dotFiles: любой набор файлов/папок (--dotfiles), hardlink/reflink (--dotfiles-mode),
+#   совпадающие уже не перекопируются
+# - --skeleton game-loop: фиксированный шаг логики + FrameProfiler (перцентили, оверлей, CSV)
+# - --pch: предкомпилированный заголовок (SDL/STL, по выбранным библиотекам)
+# - --build-profile fast-iterate|balanced|max-perf, --profile-config (Profile|x64)
+# - --unity N: unity (jumbo) сборка src\*.cpp, включаемая по конфигурациям
+# - --asset-pack: assets/ -> assets.pak (MSBuild-цель, pack-assets) + AssetPack в скелетоне
+# - --atlas: assets/sprites/<атлас>/*.png -> страницы атласа + индекс (build-atlas, MaxRects)
+# - --resource-cache: ResourceCache (фоновое декодирование, бюджет загрузки на кадр, LRU)
+# - Копирование только нужных DLL: разбор импортов .lib/.dll (PE) без внешних утилит
+# - --static: статическая линковка SDL + системные .lib + LTCG, без CopySdlDlls
+# - --backend cmake: CMakeLists.txt + CMakePresets.json (Ninja) из той же модели проекта
+# - add-class / add-file: точечная правка .vcxproj/.filters без перерендеринга
+# - sync: списки файлов .vcxproj/.filters по дереву src/include/assets (фильтры = папки)
+# - Проверка SDK и запись/копирование файлов идут параллельно (--io-workers)
+# - --timings / --timings-json / --pyprofile: фазы, файловые операции, cProfile; хуки фаз
+# - bench: фейковый SDK, сценарии single/batch/large/sync, фазы, база и порог регрессии
+# - --git-commit: git init + первый коммит (git add -A + git commit)
+# - analyze-includes: граф #include (байты на TU, fan-in, кандидаты в PCH, JSON)
+# - serve / client: резидентный генератор на Unix-сокете или канале Windows (multiprocessing.connection);
+#   vsb_client.py — тонкий клиент без импорта генератора
+# - Библиотечный API: ProjectSpec -> render() -> RenderedProject -> materialize()
 
 import argparse
+import concurrent.futures
+import contextlib
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import re
 import uuid
 import shutil
+import stat
+import struct
 import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field, replace
 from pathlib import Path
+from typing import Optional
+from xml.sax.saxutils import escape as xml_escape
+from xml.sax.saxutils import unescape as xml_unescape
+
+# Упаковщик ассетов и атласов — отдельный stdlib-модуль рядом с генератором
+import vsb_assets
+from vsb_assets import build_atlases, cmd_build_atlas, cmd_pack_assets, pack_assets
 
 # ---- Пути по умолчанию ----
 DEFAULT_OUT_DIR = r"D:\Code\Again"
@@ -44,28 +93,246 @@ SDL2_IMAGE_DLL_DIR = SDL2_IMAGE_LIB_X64
 SDL2_TTF_DLL_DIR   = SDL2_TTF_LIB_X64
 SDL2_MIXER_DLL_DIR = SDL2_MIXER_LIB_X64
 
+# Корень SDL для автопоиска (--sdl-root): папки вида SDL2-2.30.0, SDL2_image-2.8.2, ...
+SDL_ROOT = r"D:\Code\SDL_Dev"
+SDL_DIR_RE = re.compile(r"^(SDL2(?:_image|_ttf|_mixer)?)-(\d+(?:\.\d+)*)$", re.IGNORECASE)
+# пакет -> префикс аргументов (--sdl2img-inc, --sdl2img-lib, --sdl2img-dll-dir)
+SDL_PACKAGES = {
+    "SDL2": "sdl2",
+    "SDL2_image": "sdl2img",
+    "SDL2_ttf": "sdl2ttf",
+    "SDL2_mixer": "sdl2mixer",
+}
+
+# Потоков для параллельных stat/копирований (--io-workers); на сетевых дисках
+# каждый вызов стоит десятки мс, поэтому запросы выгоднее слать пачкой
+IO_WORKERS = 8
+
+# Кеш листингов директорий SDK (валиден, пока не изменился mtime директории)
+SDK_CACHE_VERSION = 1
+
 # dotFiles
 DOTFILES_DIR = r"D:\Code\SDL_Dev\dotFiles"
 DOTFILES = [".clang-format", ".editorconfig", ".gitignore", "readme.md"]
+# Элемент "*" в списке dotFiles — вся папка dotFiles целиком (без .git)
+DOTFILES_ALL = "*"
+# copy — shutil.copy2; link — hardlink; reflink — copy-on-write клон (FICLONE);
+# auto — reflink, потом hardlink, потом копия. Неподдерживаемое — откат на копию.
+DOTFILES_MODES = ("copy", "link", "reflink", "auto")
+FICLONE = 0x40049409  # ioctl Linux (btrfs/xfs/...)
+
+# Манифест инкрементальной генерации (хеши того, что записано в проект)
+MANIFEST_PATH = Path(".vsbuild") / "manifest.json"
+MANIFEST_VERSION = 1
+
+# Пространство имён для детерминированных GUID (uuid5): одинаковое имя проекта
+# даёт одинаковые GUID, и перегенерация не меняет .sln/.vcxproj
+GUID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "https://github.com/Sergei-ibarmalei/VS_build")
+
+# Пакетный режим: имя общего .sln по умолчанию (кладётся в --out)
+BATCH_SLN_NAME = "AllProjects"
+
+GUID_RE = r"\{([0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{12})\}"
+FILTER_GUID_KEYS = {"Source Files": "source", "Header Files": "header", "Asset Files": "asset"}
+
+# Unity (jumbo) сборка (--unity N): src\*.cpp склеиваются в unity\unity_<hash>.cpp.
+# Границы пачек зависят только от путей файлов (см. plan_unity), так что
+# добавление файла меняет одну пачку, а не сдвигает все следующие.
+UNITY_DIR = "unity"
+UNITY_FILTER = "Unity Files"
+CPP_EXTENSIONS = (".cpp", ".cc", ".cxx")
+
+# Сканирование дерева проекта (sync и перегенерация): что и как попадает в .vcxproj
+SCAN_DIRS = ("src", "include", "assets")
+SOURCE_EXTENSIONS = CPP_EXTENSIONS + (".c",)
+HEADER_EXTENSIONS = (".h", ".hpp", ".hh", ".hxx", ".inl")
+SCAN_IGNORE = (".git", ".vs", "Thumbs.db", "desktop.ini", ".DS_Store")
+# Описание проекта (ProjectSpec) для sync/add-*: пишется при генерации
+PROJECT_SPEC_PATH = Path(".vsbuild") / "project.json"
+SYNC_STATE_PATH = Path(".vsbuild") / "sync.json"
+# .vsbuild целиком локальный: project.json (абсолютные пути SDK этой машины),
+# манифест (mtime), sync.json и кеш include'ов в git не идут
+VSBUILD_GITIGNORE_PATH = Path(".vsbuild") / ".gitignore"
+VSBUILD_GITIGNORE = """# Локальные файлы VS_build (пути SDK, mtime, хеши) — не для git
+*
+!.gitignore
+"""
+
+# Упаковщик ассетов и атласов — отдельный модуль vsb_assets.py рядом с генератором;
+# в проекты он копируется как есть (форматы архива и индекса атласа — там же)
+PACK_TOOL_PATH = "tools/vsb_assets.py"
+# Каждая папка assets/sprites/<атлас>/ — свой атлас (см. SPRITE_ATLAS_H)
+ATLAS_SPRITES_DIR = "sprites"
+
+# Конфигурации сборки (x64). Profile (--profile-config) — оптимизированная
+# сборка с отладочной информацией и /PROFILE для профилировщиков.
+CONFIGURATIONS = ["Debug", "Release"]
+PROFILE_CONFIG = "Profile"
+
+# Базовые настройки конфигураций (как было в шаблоне). Ключи:
+#   props — PropertyGroup Label="Configuration", vars — PropertyGroup после
+#   OutDir/IntDir (LinkIncremental), cl — ClCompile, link — Link.
+# {includes}/{libdirs}/{libs} подставляются из build_config().
+CONFIG_SETTINGS = {
+    "Debug": {
+        "props": {
+            "ConfigurationType": "Application",
+            "UseDebugLibraries": "true",
+            "PlatformToolset": "v143",
+            "CharacterSet": "Unicode",
+        },
+        "vars": {},
+        "cl": {
+            "WarningLevel": "Level3",
+            "SDLCheck": "true",
+            "ConformanceMode": "true",
+            "LanguageStandard": "stdcpp20",
+            "PreprocessorDefinitions": "_DEBUG;_CRT_SECURE_NO_WARNINGS;NOMINMAX;%(PreprocessorDefinitions)",
+            "AdditionalIncludeDirectories": "$(ProjectDir)include;{includes};%(AdditionalIncludeDirectories)",
+        },
+        "link": {
+            "SubSystem": "Console",
+            "GenerateDebugInformation": "true",
+            "AdditionalLibraryDirectories": "{libdirs};%(AdditionalLibraryDirectories)",
+            "AdditionalDependencies": "{libs};%(AdditionalDependencies)",
+        },
+    },
+    "Release": {
+        "props": {
+            "ConfigurationType": "Application",
+            "UseDebugLibraries": "false",
+            "PlatformToolset": "v143",
+            "WholeProgramOptimization": "true",
+            "CharacterSet": "Unicode",
+        },
+        "vars": {},
+        "cl": {
+            "WarningLevel": "Level3",
+            "FunctionLevelLinking": "true",
+            "IntrinsicFunctions": "true",
+            "SDLCheck": "true",
+            "ConformanceMode": "true",
+            "LanguageStandard": "stdcpp20",
+            "PreprocessorDefinitions": "NDEBUG;_CRT_SECURE_NO_WARNINGS;NOMINMAX;%(PreprocessorDefinitions)",
+            "AdditionalIncludeDirectories": "$(ProjectDir)include;{includes};%(AdditionalIncludeDirectories)",
+        },
+        "link": {
+            "SubSystem": "Console",
+            "EnableCOMDATFolding": "true",
+            "OptimizeReferences": "true",
+            "AdditionalLibraryDirectories": "{libdirs};%(AdditionalLibraryDirectories)",
+            "AdditionalDependencies": "{libs};%(AdditionalDependencies)",
+        },
+    },
+}
+
+# Profile = Release + отладочная информация + /PROFILE
+PROFILE_CONFIG_OVERRIDES = {
+    "cl": {
+        "PreprocessorDefinitions": "NDEBUG;PROFILE_BUILD;_CRT_SECURE_NO_WARNINGS;NOMINMAX;%(PreprocessorDefinitions)",
+        "DebugInformationFormat": "ProgramDatabase",
+    },
+    "link": {"GenerateDebugInformation": "true", "Profile": "true"},
+    "vars": {"LinkIncremental": "false"},
+}
+
+# Статическая линковка SDL (--static): <lib>-static.lib (имена сборок CMake/vcpkg),
+# системные библиотеки, которые тянет статический SDL2 (kernel32, user32, gdi32,
+# ole32, ... уже есть в %(AdditionalDependencies) по умолчанию), и LTCG в Release,
+# чтобы оптимизация шла через границу SDL/игра
+STATIC_LIB_SUFFIX = "-static.lib"
+STATIC_SYSTEM_LIBS = ["winmm.lib", "imm32.lib", "version.lib", "setupapi.lib"]
+STATIC_LINK_OVERRIDES = {
+    "release": {
+        "props": {"WholeProgramOptimization": "true"},
+        "link": {"LinkTimeCodeGeneration": "UseLinkTimeCodeGeneration"},
+    },
+}
+
+# Профили скорости сборки (--build-profile). "all" — все конфигурации,
+# "debug" — Debug, "release" — Release и Profile (если нет своего "profile").
+# Поверх профиля в Profile всё равно действуют link/vars из PROFILE_CONFIG_OVERRIDES.
+BUILD_PROFILES = {
+    # Быстрый inner loop: /MP, /Zc:inline, /DEBUG:FASTLINK, инкрементальная
+    # линковка везде, без LTCG и с /Ob1 в Release
+    "fast-iterate": {
+        "all": {"cl": {"MultiProcessorCompilation": "true", "RemoveUnreferencedCodeData": "true"}},
+        "debug": {
+            "cl": {"DebugInformationFormat": "ProgramDatabase"},
+            "link": {"GenerateDebugInformation": "DebugFastLink"},
+            "vars": {"LinkIncremental": "true"},
+        },
+        "release": {
+            "props": {"WholeProgramOptimization": "false"},
+            "cl": {
+                "InlineFunctionExpansion": "OnlyExplicitInline",
+                "IntrinsicFunctions": "true",
+                "DebugInformationFormat": "ProgramDatabase",
+            },
+            "link": {
+                "GenerateDebugInformation": "DebugFastLink",
+                "EnableCOMDATFolding": "false",
+                "OptimizeReferences": "false",
+            },
+            "vars": {"LinkIncremental": "true"},
+        },
+        # Profile должен оставаться оптимизированной сборкой: полный инлайнинг,
+        # /OPT:REF,ICF; только LTCG выключен, как и в Release этого профиля
+        "profile": {
+            "props": {"WholeProgramOptimization": "false"},
+            "cl": {"IntrinsicFunctions": "true", "DebugInformationFormat": "ProgramDatabase"},
+        },
+    },
+    # Разумный компромисс: /MP, полный /Ob2 /Oi, но без LTCG
+    "balanced": {
+        "all": {"cl": {"MultiProcessorCompilation": "true", "RemoveUnreferencedCodeData": "true"}},
+        "debug": {
+            "cl": {"DebugInformationFormat": "ProgramDatabase"},
+            "vars": {"LinkIncremental": "true"},
+        },
+        "release": {
+            "props": {"WholeProgramOptimization": "false"},
+            "cl": {
+                "InlineFunctionExpansion": "AnySuitable",
+                "IntrinsicFunctions": "true",
+                "DebugInformationFormat": "ProgramDatabase",
+            },
+            "link": {"GenerateDebugInformation": "true"},
+            "vars": {"LinkIncremental": "false"},
+        },
+    },
+    # Максимальная производительность кода: LTCG, /O2 /Ob2 /Oi /Ot
+    "max-perf": {
+        "all": {"cl": {"MultiProcessorCompilation": "true", "RemoveUnreferencedCodeData": "true"}},
+        "debug": {
+            "cl": {"DebugInformationFormat": "ProgramDatabase"},
+            "vars": {"LinkIncremental": "true"},
+        },
+        "release": {
+            "props": {"WholeProgramOptimization": "true"},
+            "cl": {
+                "Optimization": "MaxSpeed",
+                "InlineFunctionExpansion": "AnySuitable",
+                "IntrinsicFunctions": "true",
+                "FavorSizeOrSpeed": "Speed",
+                "DebugInformationFormat": "ProgramDatabase",
+            },
+            "link": {"GenerateDebugInformation": "true", "LinkTimeCodeGeneration": "UseLinkTimeCodeGeneration"},
+            "vars": {"LinkIncremental": "false"},
+        },
+    },
+}
 
 # ---- Шаблоны ----
 SLN_TEMPLATE = r"""Microsoft Visual Studio Solution File, Format Version 12.00
 # Visual Studio Version 17
 VisualStudioVersion = 17.3.32929.385
 MinimumVisualStudioVersion = 10.0.40219.1
-Project("{{8BC9CEB8-8B4A-11D0-8D11-00A0C91BC942}}") = "{proj_name}", "{proj_name}.vcxproj", "{{{proj_guid}}}"
-EndProject
-Global
+{projects}Global
     GlobalSection(SolutionConfigurationPlatforms) = preSolution
-        Debug|x64 = Debug|x64
-        Release|x64 = Release|x64
-    EndGlobalSection
+{solution_configs}    EndGlobalSection
     GlobalSection(ProjectConfigurationPlatforms) = postSolution
-        {{{proj_guid}}}.Debug|x64.ActiveCfg = Debug|x64
-        {{{proj_guid}}}.Debug|x64.Build.0 = Debug|x64
-        {{{proj_guid}}}.Release|x64.ActiveCfg = Release|x64
-        {{{proj_guid}}}.Release|x64.Build.0 = Release|x64
-    EndGlobalSection
+{project_configs}    EndGlobalSection
     GlobalSection(SolutionProperties) = preSolution
         HideSolutionNode = FALSE
     EndGlobalSection
@@ -75,19 +342,34 @@ Global
 EndGlobal
 """
 
+# Одна запись Project(...) в .sln (в пакетном .sln их несколько)
+SLN_PROJECT = r"""Project("{{8BC9CEB8-8B4A-11D0-8D11-00A0C91BC942}}") = "{proj_name}", "{proj_path}", "{{{proj_guid}}}"
+EndProject
+"""
+
+SLN_PROJECT_CONFIGS = r"""        {{{proj_guid}}}.{config}|x64.ActiveCfg = {config}|x64
+        {{{proj_guid}}}.{config}|x64.Build.0 = {config}|x64
+"""
+
+# Куски .vcxproj, повторяющиеся для каждой конфигурации
+VCXPROJ_CONFIGURATION = r"""    <ProjectConfiguration Include="{config}|x64">
+      <Configuration>{config}</Configuration>
+      <Platform>x64</Platform>
+    </ProjectConfiguration>
+"""
+
+VCXPROJ_PROPERTY_SHEETS = r"""  <ImportGroup Label="PropertySheets" Condition="'$(Configuration)|$(Platform)'=='{config}|x64'">
+    <Import Project="$(UserRootDir)\Microsoft.Cpp.$(Platform).user.props" Condition="exists('$(UserRootDir)\Microsoft.Cpp.$(Platform).user.props')" Label="LocalAppDataPlatform" />
+  </ImportGroup>
+"""
+
+VCXPROJ_CONDITION = "Condition=\"'$(Configuration)|$(Platform)'=='{config}|x64'\""
+
 # ВАЖНО: DLL копируем MSBuild Copy target'ом (см. CopySdlDlls)
 VCXPROJ_TEMPLATE = r"""<?xml version="1.0" encoding="utf-8"?>
 <Project DefaultTargets="Build" xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
   <ItemGroup Label="ProjectConfigurations">
-    <ProjectConfiguration Include="Debug|x64">
-      <Configuration>Debug</Configuration>
-      <Platform>x64</Platform>
-    </ProjectConfiguration>
-    <ProjectConfiguration Include="Release|x64">
-      <Configuration>Release</Configuration>
-      <Platform>x64</Platform>
-    </ProjectConfiguration>
-  </ItemGroup>
+{project_configurations}  </ItemGroup>
 
   <PropertyGroup Label="Globals">
     <VCProjectVersion>17.0</VCProjectVersion>
@@ -100,33 +382,12 @@ VCXPROJ_TEMPLATE = r"""<?xml version="1.0" encoding="utf-8"?>
 
   <Import Project="$(VCTargetsPath)\Microsoft.Cpp.Default.props" />
 
-  <PropertyGroup Condition="'$(Configuration)|$(Platform)'=='Debug|x64'" Label="Configuration">
-    <ConfigurationType>Application</ConfigurationType>
-    <UseDebugLibraries>true</UseDebugLibraries>
-    <PlatformToolset>v143</PlatformToolset>
-    <CharacterSet>Unicode</CharacterSet>
-  </PropertyGroup>
-
-  <PropertyGroup Condition="'$(Configuration)|$(Platform)'=='Release|x64'" Label="Configuration">
-    <ConfigurationType>Application</ConfigurationType>
-    <UseDebugLibraries>false</UseDebugLibraries>
-    <PlatformToolset>v143</PlatformToolset>
-    <WholeProgramOptimization>true</WholeProgramOptimization>
-    <CharacterSet>Unicode</CharacterSet>
-  </PropertyGroup>
-
-  <Import Project="$(VCTargetsPath)\Microsoft.Cpp.props" />
+{configuration_props}  <Import Project="$(VCTargetsPath)\Microsoft.Cpp.props" />
 
   <ImportGroup Label="ExtensionSettings" />
   <ImportGroup Label="Shared" />
 
-  <ImportGroup Label="PropertySheets" Condition="'$(Configuration)|$(Platform)'=='Debug|x64'">
-    <Import Project="$(UserRootDir)\Microsoft.Cpp.$(Platform).user.props" Condition="exists('$(UserRootDir)\Microsoft.Cpp.$(Platform).user.props')" Label="LocalAppDataPlatform" />
-  </ImportGroup>
-  <ImportGroup Label="PropertySheets" Condition="'$(Configuration)|$(Platform)'=='Release|x64'">
-    <Import Project="$(UserRootDir)\Microsoft.Cpp.$(Platform).user.props" Condition="exists('$(UserRootDir)\Microsoft.Cpp.$(Platform).user.props')" Label="LocalAppDataPlatform" />
-  </ImportGroup>
-
+{property_sheets}
   <PropertyGroup Label="UserMacros" />
 
   <PropertyGroup>
@@ -134,58 +395,80 @@ VCXPROJ_TEMPLATE = r"""<?xml version="1.0" encoding="utf-8"?>
     <IntDir>$(ProjectDir)intermediate\$(Configuration)\</IntDir>
   </PropertyGroup>
 
-  <ItemDefinitionGroup Condition="'$(Configuration)|$(Platform)'=='Debug|x64'">
-    <ClCompile>
-      <WarningLevel>Level3</WarningLevel>
-      <SDLCheck>true</SDLCheck>
-      <ConformanceMode>true</ConformanceMode>
-      <LanguageStandard>stdcpp20</LanguageStandard>
-      <PreprocessorDefinitions>_DEBUG;_CRT_SECURE_NO_WARNINGS;NOMINMAX;%(PreprocessorDefinitions)</PreprocessorDefinitions>
-      <AdditionalIncludeDirectories>$(ProjectDir)include;{all_includes};%(AdditionalIncludeDirectories)</AdditionalIncludeDirectories>
-    </ClCompile>
-    <Link>
-      <SubSystem>Console</SubSystem>
-      <GenerateDebugInformation>true</GenerateDebugInformation>
-      <AdditionalLibraryDirectories>{all_libdirs};%(AdditionalLibraryDirectories)</AdditionalLibraryDirectories>
-      <AdditionalDependencies>{all_libs};%(AdditionalDependencies)</AdditionalDependencies>
-    </Link>
-  </ItemDefinitionGroup>
-
-  <ItemDefinitionGroup Condition="'$(Configuration)|$(Platform)'=='Release|x64'">
-    <ClCompile>
-      <WarningLevel>Level3</WarningLevel>
-      <FunctionLevelLinking>true</FunctionLevelLinking>
-      <IntrinsicFunctions>true</IntrinsicFunctions>
-      <SDLCheck>true</SDLCheck>
-      <ConformanceMode>true</ConformanceMode>
-      <LanguageStandard>stdcpp20</LanguageStandard>
-      <PreprocessorDefinitions>NDEBUG;_CRT_SECURE_NO_WARNINGS;NOMINMAX;%(PreprocessorDefinitions)</PreprocessorDefinitions>
-      <AdditionalIncludeDirectories>$(ProjectDir)include;{all_includes};%(AdditionalIncludeDirectories)</AdditionalIncludeDirectories>
-    </ClCompile>
-    <Link>
-      <SubSystem>Console</SubSystem>
-      <EnableCOMDATFolding>true</EnableCOMDATFolding>
-      <OptimizeReferences>true</OptimizeReferences>
-      <AdditionalLibraryDirectories>{all_libdirs};%(AdditionalLibraryDirectories)</AdditionalLibraryDirectories>
-      <AdditionalDependencies>{all_libs};%(AdditionalDependencies)</AdditionalDependencies>
-    </Link>
-  </ItemDefinitionGroup>
-
-  <!-- Явный список файлов (без wildcard'ов, чтобы VS не ругался) -->
+{config_properties}{item_definitions}  <!-- Явный список файлов (без wildcard'ов, чтобы VS не ругался) -->
   <ItemGroup>
-    <ClCompile Include="src\main.cpp" />
-    <ClCompile Include="src\app.cpp" />
-  </ItemGroup>
+{compile_items}  </ItemGroup>
 
   <ItemGroup>
-    <ClInclude Include="include\{proj_name}\app.h" />
-  </ItemGroup>
+{include_items}  </ItemGroup>
 
   <ItemGroup>
-    <None Include="assets\.keep" />
-  </ItemGroup>
+{none_items}  </ItemGroup>
+
+{copy_dlls_target}{extra_targets}  <Import Project="$(VCTargetsPath)\Microsoft.Cpp.targets" />
+  <ImportGroup Label="ExtensionTargets" />
+</Project>
+"""
+
+# Упаковка assets\ в $(OutDir)assets.pak. Список входов пишется в файл только при
+# изменении — так Inputs/Outputs замечают и удалённые ассеты
+ASSET_PACK_TARGET = r"""  <!-- Архив ассетов: tools\vsb_assets.py pack-assets (инкрементально, по хешам файлов) -->
+  <PropertyGroup>
+    <VsBuildPython Condition="'$(VsBuildPython)' == ''">python</VsBuildPython>
+    <AssetPackFile>$(OutDir)assets.pak</AssetPackFile>
+    <AssetPackInputsFile>$(IntDir)assets.pak.inputs</AssetPackInputsFile>
+  </PropertyGroup>
+
+  <Target Name="CollectAssets"{collect_depends}>
+    <ItemGroup>
+      <PackAssetFiles Include="$(ProjectDir)assets\**\*" Exclude="$(ProjectDir)assets\**\.*{exclude_items}" />
+    </ItemGroup>
+    <MakeDir Directories="$(IntDir)" />
+    <WriteLinesToFile File="$(AssetPackInputsFile)" Lines="@(PackAssetFiles)" Overwrite="true" WriteOnlyWhenDifferent="true" />
+  </Target>
+
+  <Target
+    Name="PackAssets"
+    AfterTargets="Build"
+    DependsOnTargets="CollectAssets"
+    Inputs="@(PackAssetFiles);$(AssetPackInputsFile);$(ProjectDir)tools\vsb_assets.py"
+    Outputs="$(AssetPackFile)">
+    <Exec Command="&quot;$(VsBuildPython)&quot; &quot;$(ProjectDir)tools\vsb_assets.py&quot; pack-assets &quot;$(ProjectDir)assets&quot; &quot;$(AssetPackFile)&quot;{pack_args} -q" />
+  </Target>
+
+"""
+
+# Сборка атласов из assets\\sprites\\ в assets\\atlases\\ (до упаковки ассетов).
+# Outputs — штамп: число и имена страниц атласов заранее неизвестны
+ATLAS_TARGET = r"""  <!-- Атласы спрайтов: tools\vsb_assets.py build-atlas (инкрементально, по хешам файлов) -->
+  <PropertyGroup>
+    <VsBuildPython Condition="'$(VsBuildPython)' == ''">python</VsBuildPython>
+    <AtlasInputsFile>$(IntDir)atlas.inputs</AtlasInputsFile>
+    <AtlasStampFile>$(IntDir)atlas.stamp</AtlasStampFile>
+  </PropertyGroup>
+
+  <Target Name="CollectSprites">
+    <ItemGroup>
+      <AtlasSprites Include="$(ProjectDir)assets\sprites\**\*.png" />
+    </ItemGroup>
+    <MakeDir Directories="$(IntDir)" />
+    <WriteLinesToFile File="$(AtlasInputsFile)" Lines="@(AtlasSprites)" Overwrite="true" WriteOnlyWhenDifferent="true" />
+  </Target>
+
+  <Target
+    Name="BuildAtlases"
+    AfterTargets="Build"
+    DependsOnTargets="CollectSprites"
+    Inputs="@(AtlasSprites);$(AtlasInputsFile);$(ProjectDir)tools\vsb_assets.py"
+    Outputs="$(AtlasStampFile)">
+    <Exec Command="&quot;$(VsBuildPython)&quot; &quot;$(ProjectDir)tools\vsb_assets.py&quot; build-atlas &quot;$(ProjectDir)assets\sprites&quot; &quot;$(ProjectDir)assets\atlases&quot; --max-size {max_size}" />
+    <Touch Files="$(AtlasStampFile)" AlwaysCreate="true" />
+  </Target>
+
+"""
 
-  <!-- Копирование DLL после сборки (без cmd/xcopy) -->
+# Копирование DLL: wildcard по папкам (--dll-copy glob или если импорты не разобрать)
+COPY_DLLS_GLOB_TARGET = r"""  <!-- Копирование DLL после сборки (без cmd/xcopy) -->
   <Target Name="CopySdlDlls" AfterTargets="Build">
     <ItemGroup>
       <SdlDlls Include="{dll_globs}" />
@@ -200,9 +483,26 @@ VCXPROJ_TEMPLATE = r"""<?xml version="1.0" encoding="utf-8"?>
       Condition="'@(SdlDlls)' != ''" />
   </Target>
 
-  <Import Project="$(VCTargetsPath)\Microsoft.Cpp.targets" />
-  <ImportGroup Label="ExtensionTargets" />
-</Project>
+"""
+
+# ... или явный список DLL из таблиц импорта: цель пропускается, пока копии свежее
+COPY_DLLS_LIST_TARGET = r"""  <!-- Копирование DLL после сборки (без cmd/xcopy): только DLL из таблиц импорта SDL -->
+  <Target
+    Name="CopySdlDlls"
+    AfterTargets="Build"
+    Inputs="{dll_inputs}"
+    Outputs="{dll_outputs}">
+    <ItemGroup>
+{dll_items}    </ItemGroup>
+
+    <Copy
+      SourceFiles="@(SdlDlls)"
+      DestinationFolder="$(OutDir)"
+      SkipUnchangedFiles="true"
+      Retries="2"
+      RetryDelayMilliseconds="250" />
+  </Target>
+
 """
 
 VCXPROJ_FILTERS = r"""<?xml version="1.0" encoding="utf-8"?>
@@ -217,38 +517,48 @@ VCXPROJ_FILTERS = r"""<?xml version="1.0" encoding="utf-8"?>
     <Filter Include="Asset Files">
       <UniqueIdentifier>{ASSET_GUID}</UniqueIdentifier>
     </Filter>
-  </ItemGroup>
+{extra_filters}  </ItemGroup>
 
   <ItemGroup>
-    <ClCompile Include="src\main.cpp">
-      <Filter>Source Files</Filter>
-    </ClCompile>
-    <ClCompile Include="src\app.cpp">
-      <Filter>Source Files</Filter>
-    </ClCompile>
-  </ItemGroup>
+{compile_items}  </ItemGroup>
 
   <ItemGroup>
-    <ClInclude Include="include\{proj_name}\app.h">
-      <Filter>Header Files</Filter>
-    </ClInclude>
-  </ItemGroup>
+{include_items}  </ItemGroup>
 
   <ItemGroup>
-    <None Include="assets\.keep">
-      <Filter>Asset Files</Filter>
-    </None>
-  </ItemGroup>
+{none_items}  </ItemGroup>
 </Project>
 """
 
+# Подключается через ForcedIncludeFiles (/FI) ко всем .cpp при --pch
+PCH_H = r"""#pragma once
+
+// Предкомпилированный заголовок (--pch): тяжёлые и редко меняющиеся заголовки.
+// Подключается ко всем .cpp автоматически (ForcedIncludeFiles), свои заголовки
+// проекта сюда лучше не добавлять — любое их изменение пересобирает всё.
+
+{sdl_includes}
+{std_includes}"""
+
+PCH_CPP = r"""// Единственный .cpp с PrecompiledHeader=Create: из него собирается .pch
+#include "{proj_name}/pch.h"
+"""
+
+PCH_STD_HEADERS = [
+    "algorithm", "array", "cstdint", "functional", "iostream", "memory",
+    "string", "string_view", "unordered_map", "utility", "vector",
+]
+
 # ---- Скелетон ----
+# Варианты скелетона (--skeleton)
+SKELETONS = ("basic", "game-loop")
+
 APP_H = r"""#pragma once
 
 #include <SDL.h>
 #include <SDL_image.h>
-
-class App {
+{app_includes}
+class App {{
 public:
     bool init();
     void run();
@@ -258,7 +568,7 @@ private:
     SDL_Window* window_ = nullptr;
     SDL_Renderer* renderer_ = nullptr;
     bool running_ = false;
-};
+{app_members}}};
 """
 
 APP_CPP = r"""#include "{proj_name}/app.h"
@@ -303,27 +613,14 @@ bool App::init()
         return false;
     }}
 
-    running_ = true;
+{app_init}    running_ = true;
     return true;
 }}
 
-void App::run()
-{{
-    while (running_) {{
-        SDL_Event e;
-        while (SDL_PollEvent(&e)) {{
-            if (e.type == SDL_QUIT) running_ = false;
-        }}
-
-        SDL_SetRenderDrawColor(renderer_, 30, 30, 36, 255);
-        SDL_RenderClear(renderer_);
-        SDL_RenderPresent(renderer_);
-    }}
-}}
-
+{app_run}
 void App::shutdown()
 {{
-    if (renderer_) {{
+{app_shutdown}    if (renderer_) {{
         SDL_DestroyRenderer(renderer_);
         renderer_ = nullptr;
     }}
@@ -334,6 +631,23 @@ void App::shutdown()
     IMG_Quit();
     SDL_Quit();
 }}
+{app_methods}"""
+
+# Цикл App::run() скелетона "basic": опрос событий + очистка, темп задаёт VSync;
+# {app_frame} — работа модулей раз в кадр (до отрисовки)
+APP_RUN_BASIC = r"""void App::run()
+{{
+    while (running_) {{
+        SDL_Event e;
+        while (SDL_PollEvent(&e)) {{
+            if (e.type == SDL_QUIT) running_ = false;
+        }}
+
+{app_frame}        SDL_SetRenderDrawColor(renderer_, 30, 30, 36, 255);
+        SDL_RenderClear(renderer_);
+        SDL_RenderPresent(renderer_);
+    }}
+}}
 """
 
 MAIN_CPP = r"""#include "{proj_name}/app.h"
@@ -348,213 +662,4568 @@ int main(int, char**)
 }}
 """
 
-def write_text(path: Path, data: str):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(data, encoding="utf-8")
-    print(f"  wrote {path}")
+# ---- Скелетон "game-loop" (--skeleton game-loop) ----
 
-def norm(p: str) -> str:
-    return Path(p).as_posix().replace("/", "\\")
+# Фиксированный шаг логики + интерполированная отрисовка + FrameProfiler
+APP_RUN_GAME_LOOP = r"""void App::run()
+{{
+    // Логика — фиксированными шагами kFixedDt, отрисовка — раз в кадр
+    // с долей alpha между последними шагами
+    const double freq = double(SDL_GetPerformanceFrequency());
+    Uint64 prev = SDL_GetPerformanceCounter();
+    Uint64 titleAt = prev;
+    double accumulator = 0.0;
 
-def ensure_dirs(project_root: Path, project_name: str):
-    (project_root / "src").mkdir(parents=True, exist_ok=True)
-    (project_root / "assets").mkdir(parents=True, exist_ok=True)
-    (project_root / "include" / project_name).mkdir(parents=True, exist_ok=True)
+    while (running_) {{
+        profiler_.beginFrame();
+        const Uint64 now = SDL_GetPerformanceCounter();
+        double frameTime = double(now - prev) / freq;
+        prev = now;
+        if (frameTime > kMaxFrameTime) frameTime = kMaxFrameTime;  // после паузы/отладчика не догоняем
+        accumulator += frameTime;
 
-    keep = project_root / "assets" / ".keep"
-    if not keep.exists():
-        keep.write_text("", encoding="utf-8")
-        print(f"  wrote {keep}")
+        SDL_Event e;
+        while (SDL_PollEvent(&e)) {{
+            if (e.type == SDL_QUIT) running_ = false;
+            if (e.type == SDL_KEYDOWN && e.key.keysym.sym == SDLK_F3) showOverlay_ = !showOverlay_;
+        }}
 
-def copy_dotfiles(project_root: Path, dotfiles_dir: str, fail_on_missing: bool):
-    src_dir = Path(dotfiles_dir)
-    problems = []
-    for fname in DOTFILES:
-        src = src_dir / fname
-        dst = project_root / fname
-        if not src.exists():
-            problems.append(f"[dotfile] missing: {src}")
-            continue
-        shutil.copy2(src, dst)
-        print(f"  copied {src} -> {dst}")
+        int updates = 0;
+        while (accumulator >= kFixedDt) {{
+            update(kFixedDt);
+            accumulator -= kFixedDt;
+            ++updates;
+        }}
+{app_frame}        render(accumulator / kFixedDt);
+        if (showOverlay_) profiler_.drawOverlay(renderer_);
 
-    if problems:
-        print("\n=== DOTFILES WARNINGS ===")
-        for msg in problems:
-            print(" -", msg)
-        print("=========================\n")
-        if fail_on_missing:
-            raise SystemExit("Missing dotFiles. Aborting due to --fail-on-missing.")
+        // До Present: ожидание VSync в CPU-время кадра не входит
+        profiler_.endFrame(updates);
+        SDL_RenderPresent(renderer_);
 
-def git_init(project_root: Path):
-    try:
-        subprocess.run(["git", "init"], cwd=str(project_root), check=True, capture_output=True, text=True)
-        print("  git init: OK")
-    except FileNotFoundError:
-        print("  git init: SKIP (git not found in PATH)")
-    except subprocess.CalledProcessError as e:
-        print("  git init: FAILED")
-        if e.stdout:
-            print(e.stdout.strip())
-        if e.stderr:
-            print(e.stderr.strip())
+        if (now - titleAt >= Uint64(freq)) {{
+            titleAt = now;
+            updateTitle();
+        }}
+    }}
+}}
+"""
 
-def check_paths_and_files(
-    includes: list[str],
-    libdirs: list[str],
-    dll_dirs: list[str],
-    expected_libs: list[tuple[str, str]],
-    expected_dll_patterns: list[tuple[str, str]],
-    fail_on_missing: bool,
-) -> None:
-    problems = []
+APP_GAME_LOOP_METHODS = r"""
+void App::update(double dt)
+{{
+    // Логика игры: всегда ровно dt секунд
+    (void)dt;
+}}
 
-    for p in includes:
-        if not Path(p).exists():
-            problems.append(f"[dir] include not found: {p}")
-    for p in libdirs:
-        if not Path(p).exists():
-            problems.append(f"[dir] lib not found: {p}")
-    for p in dll_dirs:
-        if not Path(p).exists():
-            problems.append(f"[dir] dll dir not found: {p}")
+void App::render(double alpha)
+{{
+    // alpha в [0, 1): доля шага между предыдущим и текущим состоянием
+    (void)alpha;
+    SDL_SetRenderDrawColor(renderer_, 30, 30, 36, 255);
+    SDL_RenderClear(renderer_);
+}}
 
-    for base, fname in expected_libs:
-        if not Path(base, fname).exists():
-            problems.append(f"[lib] {fname} not found in: {base}")
+void App::updateTitle()
+{{
+    const FrameProfiler::Stats s = profiler_.stats();
+    char title[160];
+    SDL_snprintf(title, sizeof(title), "{proj_name} | cpu %.2f ms avg, p95 %.2f, p99 %.2f, max %.2f",
+                  s.avgMs, s.p95Ms, s.p99Ms, s.maxMs);
+    SDL_SetWindowTitle(window_, title);
+}}
+"""
 
-    for base, pattern in expected_dll_patterns:
-        bp = Path(base)
-        if bp.exists() and not list(bp.glob(pattern)):
-            problems.append(f"[dll] {pattern} not found in: {base}")
+APP_GAME_LOOP_MEMBERS = r"""
+    void update(double dt);
+    void render(double alpha);
+    void updateTitle();
 
-    if problems:
-        print("\n=== CHECK WARNINGS ===")
-        for msg in problems:
-            print(" -", msg)
-        print("======================\n")
-        if fail_on_missing:
-            raise SystemExit("Missing required files/dirs. Aborting due to --fail-on-missing.")
+    static constexpr double kFixedDt = 1.0 / 120.0;
+    static constexpr double kMaxFrameTime = 0.25;
 
-def build_config(full: bool, args) -> dict:
-    includes = [args.sdl2_inc, args.sdl2img_inc]
-    libdirs  = [args.sdl2_lib, args.sdl2img_lib]
-    dll_dirs = [args.sdl2_dll_dir, args.sdl2img_dll_dir]
+    FrameProfiler profiler_;
+    bool showOverlay_ = false;  // F3
+"""
 
-    libs = ["SDL2.lib", "SDL2main.lib", "SDL2_image.lib"]
+# Итог профайлера в консоль + CSV, если задана переменная окружения FRAME_CSV
+APP_GAME_LOOP_SHUTDOWN = r"""    if (profiler_.size()) {
+        const FrameProfiler::Stats s = profiler_.stats();
+        std::cout << "Frames (last " << s.frames << "): cpu avg " << s.avgMs << " ms, p50 " << s.p50Ms
+                  << ", p95 " << s.p95Ms << ", p99 " << s.p99Ms << ", max " << s.maxMs << std::endl;
+        if (const char* csv = SDL_getenv("FRAME_CSV")) {
+            if (!profiler_.writeCsv(csv)) std::cerr << "Cannot write " << csv << std::endl;
+        }
+    }
+"""
 
-    expected_libs = [
-        (args.sdl2_lib, "SDL2.lib"),
-        (args.sdl2_lib, "SDL2main.lib"),
-        (args.sdl2img_lib, "SDL2_image.lib"),
-    ]
-    expected_dll_patterns = [
-        (args.sdl2_dll_dir, "SDL2.dll"),
-        (args.sdl2img_dll_dir, "SDL2_image*.dll"),
-    ]
+FRAME_PROFILER_H = r"""#pragma once
 
-    if full:
-        includes += [args.sdl2ttf_inc, args.sdl2mixer_inc]
-        libdirs  += [args.sdl2ttf_lib, args.sdl2mixer_lib]
-        dll_dirs += [args.sdl2ttf_dll_dir, args.sdl2mixer_dll_dir]
+#include <SDL.h>
+#include <cstddef>
+#include <cstdint>
+#include <vector>
 
-        libs += ["SDL2_ttf.lib", "SDL2_mixer.lib"]
+// Профайлер кадров: CPU-время кадра в кольцевом буфере последних N кадров,
+// перцентили, оверлей (столбики, без шрифтов) и CSV.
+//   beginFrame(); ... endFrame(updates); SDL_RenderPresent(...);
+class FrameProfiler {
+public:
+    struct Stats {
+        double avgMs = 0, p50Ms = 0, p95Ms = 0, p99Ms = 0, maxMs = 0;
+        std::size_t frames = 0;
+    };
 
-        expected_libs += [
-            (args.sdl2ttf_lib, "SDL2_ttf.lib"),
-            (args.sdl2mixer_lib, "SDL2_mixer.lib"),
-        ]
-        expected_dll_patterns += [
-            (args.sdl2ttf_dll_dir, "SDL2_ttf*.dll"),
-            (args.sdl2mixer_dll_dir, "SDL2_mixer*.dll"),
-        ]
+    explicit FrameProfiler(std::size_t capacity = 600);
 
-    # MSBuild <Copy> умеет wildcard'ы в Include
-    dll_globs = ";".join([f"{d}\\*.dll" for d in dll_dirs])
+    void beginFrame();
+    // updates — сколько шагов логики было в кадре
+    void endFrame(int updates = 0);
 
-    return {
-        "includes": includes,
-        "libdirs": libdirs,
-        "dll_dirs": dll_dirs,
-        "libs": libs,
-        "expected_libs": expected_libs,
-        "expected_dll_patterns": expected_dll_patterns,
-        "dll_globs": dll_globs,
-    }
+    std::size_t size() const { return count_; }
+    double lastMs() const;
+    Stats stats() const;
 
-def generate_skeleton(project_root: Path, project_name: str):
-    write_text(project_root / "include" / project_name / "app.h", APP_H)
-    write_text(project_root / "src" / "app.cpp", APP_CPP.format(proj_name=project_name))
-    write_text(project_root / "src" / "main.cpp", MAIN_CPP.format(proj_name=project_name))
+    // Столбики последних кадров внизу окна + линии 16.7 и 33.3 мс
+    void drawOverlay(SDL_Renderer* renderer) const;
+    // frame,cpu_ms,updates — по кадру из буфера на строку
+    bool writeCsv(const char* path) const;
 
-def generate(project_name: str, out_dir: str, full: bool, do_git: bool, fail_on_missing: bool, args):
-    cfg = build_config(full, args)
+private:
+    // i-й по старшинству кадр в буфере (0 — самый старый)
+    std::size_t slot(std::size_t i) const;
 
-    check_paths_and_files(
-        includes=cfg["includes"],
-        libdirs=cfg["libdirs"],
-        dll_dirs=cfg["dll_dirs"],
-        expected_libs=cfg["expected_libs"],
-        expected_dll_patterns=cfg["expected_dll_patterns"],
-        fail_on_missing=fail_on_missing,
-    )
+    std::vector<float> ms_;
+    std::vector<std::uint8_t> updates_;
+    std::size_t head_ = 0;
+    std::size_t count_ = 0;
+    std::uint64_t frames_ = 0;
+    std::uint64_t start_ = 0;
+    double toMs_ = 0;
+};
+"""
 
-    sln_guid = str(uuid.uuid4()).upper()
-    proj_guid = str(uuid.uuid4()).upper()
+FRAME_PROFILER_CPP = r"""#include "{proj_name}/frame_profiler.h"
 
-    source_guid = str(uuid.uuid4()).upper()
-    header_guid = str(uuid.uuid4()).upper()
-    asset_guid  = str(uuid.uuid4()).upper()
+#include <algorithm>
+#include <cmath>
+#include <cstdio>
 
-    project_root = Path(out_dir) / project_name
-    ensure_dirs(project_root, project_name)
-    copy_dotfiles(project_root, args.dotfiles_dir, fail_on_missing)
-    generate_skeleton(project_root, project_name)
+FrameProfiler::FrameProfiler(std::size_t capacity)
+    : ms_(std::max<std::size_t>(capacity, 1)),
+      updates_(ms_.size()),
+      toMs_(1000.0 / double(SDL_GetPerformanceFrequency()))
+{{
+}}
 
-    sln_path = project_root / f"{project_name}.sln"
-    proj_path = project_root / f"{project_name}.vcxproj"
-    filters_path = project_root / f"{project_name}.vcxproj.filters"
+void FrameProfiler::beginFrame()
+{{
+    start_ = SDL_GetPerformanceCounter();
+}}
 
-    sln_text = SLN_TEMPLATE.format(
-        sln_guid=sln_guid,
-        proj_guid=proj_guid,
-        proj_name=project_name
-    )
+void FrameProfiler::endFrame(int updates)
+{{
+    ms_[head_] = float(double(SDL_GetPerformanceCounter() - start_) * toMs_);
+    updates_[head_] = std::uint8_t(std::min(updates, 255));
+    head_ = (head_ + 1) % ms_.size();
+    count_ = std::min(count_ + 1, ms_.size());
+    ++frames_;
+}}
 
-    vcx_text = VCXPROJ_TEMPLATE.format(
-        proj_guid=proj_guid,
-        proj_name=project_name,
-        all_includes=";".join(cfg["includes"]),
-        all_libdirs=";".join(cfg["libdirs"]),
-        all_libs=";".join(cfg["libs"]),
-        dll_globs=cfg["dll_globs"],
-    )
+std::size_t FrameProfiler::slot(std::size_t i) const
+{{
+    return (head_ + ms_.size() - count_ + i) % ms_.size();
+}}
 
-    filters_text = VCXPROJ_FILTERS.format(
-        proj_name=project_name,
-        SOURCE_GUID="{" + source_guid + "}",
-        HEADER_GUID="{" + header_guid + "}",
-        ASSET_GUID="{" + asset_guid + "}",
-    )
+double FrameProfiler::lastMs() const
+{{
+    return count_ ? ms_[slot(count_ - 1)] : 0.0;
+}}
 
-    write_text(sln_path, sln_text)
-    write_text(proj_path, vcx_text)
-    write_text(filters_path, filters_text)
+FrameProfiler::Stats FrameProfiler::stats() const
+{{
+    Stats s;
+    s.frames = count_;
+    if (!count_) return s;
 
-    if do_git:
-        git_init(project_root)
+    std::vector<float> sorted(count_);
+    double sum = 0;
+    for (std::size_t i = 0; i < count_; ++i) {{
+        sorted[i] = ms_[slot(i)];
+        sum += sorted[i];
+    }}
+    std::sort(sorted.begin(), sorted.end());
+    // Перцентиль по ближайшему рангу
+    auto pct = [&](double p) {{
+        std::size_t rank = std::size_t(std::ceil(p * double(count_)));
+        return double(sorted[std::min(std::max<std::size_t>(rank, 1), count_) - 1]);
+    }};
+    s.avgMs = sum / double(count_);
+    s.p50Ms = pct(0.50);
+    s.p95Ms = pct(0.95);
+    s.p99Ms = pct(0.99);
+    s.maxMs = sorted.back();
+    return s;
+}}
+
+void FrameProfiler::drawOverlay(SDL_Renderer* renderer) const
+{{
+    int w = 0, h = 0;
+    if (!count_ || SDL_GetRendererOutputSize(renderer, &w, &h) != 0) return;
+
+    const float pxPerMs = 4.0f;  // 16.7 мс = 67 px
+    const int barW = 2;
+    const std::size_t shown = std::min(count_, std::size_t(w / barW));
+
+    // Три цвета — три пакетных SDL_RenderFillRects вместо вызова на столбик
+    std::vector<SDL_Rect> bars[3];
+    for (std::size_t i = 0; i < shown; ++i) {{
+        const float ms = ms_[slot(count_ - shown + i)];
+        const int bh = std::min(int(ms * pxPerMs) + 1, h);
+        const int level = ms < 16.7f ? 0 : ms < 33.3f ? 1 : 2;
+        bars[level].push_back(SDL_Rect{{int(i) * barW, h - bh, barW - 1, bh}});
+    }}
+    const Uint8 colors[3][3] = {{{{80, 220, 100}}, {{240, 200, 60}}, {{240, 70, 60}}}};
+    for (int level = 0; level < 3; ++level) {{
+        if (bars[level].empty()) continue;
+        SDL_SetRenderDrawColor(renderer, colors[level][0], colors[level][1], colors[level][2], 255);
+        SDL_RenderFillRects(renderer, bars[level].data(), int(bars[level].size()));
+    }}
+
+    SDL_SetRenderDrawColor(renderer, 200, 200, 200, 255);
+    for (float budget : {{16.7f, 33.3f}}) {{
+        const int y = h - int(budget * pxPerMs);
+        SDL_RenderDrawLine(renderer, 0, y, int(shown) * barW, y);
+    }}
+}}
+
+bool FrameProfiler::writeCsv(const char* path) const
+{{
+    std::FILE* f = std::fopen(path, "w");
+    if (!f) return false;
+    std::fputs("frame,cpu_ms,updates\n", f);
+    const std::uint64_t first = frames_ - count_;
+    for (std::size_t i = 0; i < count_; ++i) {{
+        const std::size_t k = slot(i);
+        std::fprintf(f, "%llu,%.4f,%u\n", (unsigned long long)(first + i), ms_[k], unsigned(updates_[k]));
+    }}
+    return std::fclose(f) == 0;
+}}
+"""
+
+# ---- Архив ассетов (--asset-pack) ----
+
+ASSET_PACK_H = r"""#pragma once
+
+#include <SDL.h>
+#include <cstddef>
+#include <cstdint>
+#include <string_view>
+#include <unordered_map>
+#include <vector>
+
+// Архив ассетов (VS_build.py pack-assets): файл отображается в память один раз,
+// записи отдаются через SDL_RWFromConstMem без копирования и без открытия файлов
+class AssetPack {
+public:
+    AssetPack() = default;
+    ~AssetPack();
+    AssetPack(const AssetPack&) = delete;
+    AssetPack& operator=(const AssetPack&) = delete;
+
+    bool open(const char* path);
+    // Архив рядом с .exe (SDL_GetBasePath), а не в текущей папке
+    bool openNextToExe(const char* fileName = "assets.pak");
+    void close();
+
+    bool isOpen() const { return base_ != nullptr; }
+    std::size_t size() const { return count_; }
+    bool contains(std::string_view name) const { return find(name) != nullptr; }
+
+    // Имя — путь от assets/ через '/': "sprites/hero.png".
+    // Сжатая запись распаковывается при первом обращении и живёт до close()
+    bool data(std::string_view name, const void*& ptr, std::size_t& size);
+    // Для IMG_Load_RW(rw, 1), Mix_LoadWAV_RW(rw, 1), TTF_OpenFontRW(rw, 1, size)
+    SDL_RWops* openRW(std::string_view name);
+
+private:
+    struct Entry {
+        std::uint64_t offset;
+        std::uint32_t size;
+        std::uint32_t rawSize;
+        std::uint32_t nameOffset;
+        std::uint16_t nameLength;
+        std::uint16_t flags;
+        std::uint32_t crc32;
+        std::uint32_t reserved;
+    };
+    static_assert(sizeof(Entry) == 32, "AssetPack::Entry must match the pack format");
+
+    const Entry* find(std::string_view name) const;
+
+    const std::uint8_t* base_ = nullptr;
+    std::size_t mappedSize_ = 0;
+    const Entry* entries_ = nullptr;
+    const char* names_ = nullptr;
+    std::uint32_t count_ = 0;
+    void* file_ = nullptr;
+    void* mapping_ = nullptr;
+    std::unordered_map<const Entry*, std::vector<std::uint8_t>> unpacked_;
+};
+"""
+
+ASSET_PACK_CPP = r"""#include "{proj_name}/asset_pack.h"
+
+#include <cstring>
+#include <iostream>
+#include <string>
+
+#ifdef _WIN32
+#ifndef WIN32_LEAN_AND_MEAN
+#define WIN32_LEAN_AND_MEAN
+#endif
+#ifndef NOMINMAX
+#define NOMINMAX
+#endif
+#include <windows.h>
+#else
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+
+namespace {{
+
+constexpr std::uint32_t kVersion = 1;
+constexpr std::uint16_t kDeflate = 1;
+
+struct Header {{
+    char magic[4];
+    std::uint32_t version;
+    std::uint32_t count;
+    std::uint32_t namesSize;
+}};
+
+// ---- Распаковка raw deflate (RFC 1951), по мотивам zlib/contrib/puff ----
+
+struct Huffman {{
+    std::uint16_t counts[16];
+    std::uint16_t symbols[288];
+}};
+
+class Inflater {{
+public:
+    Inflater(const std::uint8_t* src, std::size_t size, std::uint8_t* dst, std::size_t dstSize)
+        : src_(src), srcEnd_(src + size), dst_(dst), dstSize_(dstSize) {{}}
+
+    bool run()
+    {{
+        int last = 0;
+        do {{
+            last = bits(1);
+            int type = bits(2);
+            bool ok = type == 0 ? stored() : type == 1 ? fixed() : type == 2 ? dynamic() : false;
+            if (!ok || overrun_) return false;
+        }} while (!last);
+        return out_ == dstSize_;
+    }}
+
+private:
+    int bits(int need)
+    {{
+        std::uint32_t value = bitBuf_;
+        while (bitCount_ < need) {{
+            if (src_ == srcEnd_) {{
+                overrun_ = true;
+                return 0;
+            }}
+            value |= std::uint32_t(*src_++) << bitCount_;
+            bitCount_ += 8;
+        }}
+        bitBuf_ = value >> need;
+        bitCount_ -= need;
+        return int(value & ((1u << need) - 1));
+    }}
+
+    bool stored()
+    {{
+        bitBuf_ = 0;
+        bitCount_ = 0;
+        if (srcEnd_ - src_ < 4) return false;
+        unsigned len = src_[0] | (src_[1] << 8);
+        unsigned nlen = src_[2] | (src_[3] << 8);
+        src_ += 4;
+        if (len != (~nlen & 0xffffu) || std::size_t(srcEnd_ - src_) < len || dstSize_ - out_ < len) return false;
+        if (len) std::memcpy(dst_ + out_, src_, len);
+        src_ += len;
+        out_ += len;
+        return true;
+    }}
+
+    int decode(const Huffman& h)
+    {{
+        int code = 0, first = 0, index = 0;
+        for (int len = 1; len < 16; ++len) {{
+            code |= bits(1);
+            int count = h.counts[len];
+            if (code - count < first) return h.symbols[index + (code - first)];
+            index += count;
+            first = (first + count) << 1;
+            code <<= 1;
+            if (overrun_) return -1;
+        }}
+        return -1;
+    }}
+
+    static bool build(Huffman& h, const std::uint8_t* lengths, int n)
+    {{
+        std::memset(h.counts, 0, sizeof(h.counts));
+        for (int s = 0; s < n; ++s) h.counts[lengths[s]]++;
+        if (h.counts[0] == n) return true;
+        int left = 1;
+        for (int len = 1; len < 16; ++len) {{
+            left = (left << 1) - h.counts[len];
+            if (left < 0) return false;
+        }}
+        std::uint16_t offs[16] = {{}};
+        for (int len = 1; len < 15; ++len) offs[len + 1] = offs[len] + h.counts[len];
+        for (int s = 0; s < n; ++s) {{
+            if (lengths[s]) h.symbols[offs[lengths[s]]++] = std::uint16_t(s);
+        }}
+        return true;
+    }}
+
+    bool codes(const Huffman& lencode, const Huffman& distcode)
+    {{
+        static const std::uint16_t lens[29] = {{
+            3, 4, 5, 6, 7, 8, 9, 10, 11, 13, 15, 17, 19, 23, 27, 31,
+            35, 43, 51, 59, 67, 83, 99, 115, 131, 163, 195, 227, 258}};
+        static const std::uint8_t lext[29] = {{
+            0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 4, 4, 4, 4, 5, 5, 5, 5, 0}};
+        static const std::uint16_t dists[30] = {{
+            1, 2, 3, 4, 5, 7, 9, 13, 17, 25, 33, 49, 65, 97, 129, 193,
+            257, 385, 513, 769, 1025, 1537, 2049, 3073, 4097, 6145, 8193, 12289, 16385, 24577}};
+        static const std::uint8_t dext[30] = {{
+            0, 0, 0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 9, 9, 10, 10, 11, 11, 12, 12, 13, 13}};
+
+        for (;;) {{
+            int symbol = decode(lencode);
+            if (symbol < 0) return false;
+            if (symbol < 256) {{
+                if (out_ == dstSize_) return false;
+                dst_[out_++] = std::uint8_t(symbol);
+                continue;
+            }}
+            if (symbol == 256) return true;
+            symbol -= 257;
+            if (symbol >= 29) return false;
+            std::size_t len = lens[symbol] + bits(lext[symbol]);
+            symbol = decode(distcode);
+            if (symbol < 0 || symbol >= 30) return false;
+            std::size_t dist = dists[symbol] + bits(dext[symbol]);
+            if (overrun_ || dist > out_ || dstSize_ - out_ < len) return false;
+            // Перекрывающееся копирование (dist < len) — побайтно
+            for (; len; --len, ++out_) dst_[out_] = dst_[out_ - dist];
+        }}
+    }}
+
+    bool fixed()
+    {{
+        static Huffman lencode, distcode;
+        static bool ready = false;
+        if (!ready) {{
+            std::uint8_t lengths[288];
+            int s = 0;
+            for (; s < 144; ++s) lengths[s] = 8;
+            for (; s < 256; ++s) lengths[s] = 9;
+            for (; s < 280; ++s) lengths[s] = 7;
+            for (; s < 288; ++s) lengths[s] = 8;
+            build(lencode, lengths, 288);
+            for (s = 0; s < 30; ++s) lengths[s] = 5;
+            build(distcode, lengths, 30);
+            ready = true;
+        }}
+        return codes(lencode, distcode);
+    }}
+
+    bool dynamic()
+    {{
+        static const std::uint8_t order[19] = {{16, 17, 18, 0, 8, 7, 9, 6, 10, 5, 11, 4, 12, 3, 13, 2, 14, 1, 15}};
+        int nlen = bits(5) + 257;
+        int ndist = bits(5) + 1;
+        int ncode = bits(4) + 4;
+        if (nlen > 286 || ndist > 30) return false;
+
+        std::uint8_t lengths[320] = {{}};
+        for (int i = 0; i < ncode; ++i) lengths[order[i]] = std::uint8_t(bits(3));
+        Huffman lencode, distcode;
+        if (!build(lencode, lengths, 19)) return false;
+
+        int index = 0;
+        while (index < nlen + ndist) {{
+            int symbol = decode(lencode);
+            if (symbol < 0) return false;
+            if (symbol < 16) {{
+                lengths[index++] = std::uint8_t(symbol);
+                continue;
+            }}
+            std::uint8_t len = 0;
+            int repeat;
+            if (symbol == 16) {{
+                if (index == 0) return false;
+                len = lengths[index - 1];
+                repeat = 3 + bits(2);
+            }} else if (symbol == 17) {{
+                repeat = 3 + bits(3);
+            }} else {{
+                repeat = 11 + bits(7);
+            }}
+            if (index + repeat > nlen + ndist) return false;
+            while (repeat--) lengths[index++] = len;
+        }}
+        if (lengths[256] == 0) return false;
+        if (!build(lencode, lengths, nlen) || !build(distcode, lengths + nlen, ndist)) return false;
+        return codes(lencode, distcode);
+    }}
+
+    const std::uint8_t* src_;
+    const std::uint8_t* srcEnd_;
+    std::uint8_t* dst_;
+    std::size_t dstSize_;
+    std::size_t out_ = 0;
+    std::uint32_t bitBuf_ = 0;
+    int bitCount_ = 0;
+    bool overrun_ = false;
+}};
+
+}}  // namespace
+
+AssetPack::~AssetPack()
+{{
+    close();
+}}
+
+bool AssetPack::open(const char* path)
+{{
+    close();
+#ifdef _WIN32
+    int wideLen = MultiByteToWideChar(CP_UTF8, 0, path, -1, nullptr, 0);
+    std::wstring widePath(wideLen > 0 ? wideLen : 1, L'\0');
+    MultiByteToWideChar(CP_UTF8, 0, path, -1, widePath.data(), wideLen);
+    HANDLE file = CreateFileW(widePath.c_str(), GENERIC_READ, FILE_SHARE_READ, nullptr, OPEN_EXISTING,
+                              FILE_ATTRIBUTE_NORMAL, nullptr);
+    if (file == INVALID_HANDLE_VALUE) return false;
+    LARGE_INTEGER fileSize{{}};
+    GetFileSizeEx(file, &fileSize);
+    HANDLE mapping = fileSize.QuadPart ? CreateFileMappingW(file, nullptr, PAGE_READONLY, 0, 0, nullptr) : nullptr;
+    void* view = mapping ? MapViewOfFile(mapping, FILE_MAP_READ, 0, 0, 0) : nullptr;
+    file_ = file;
+    mapping_ = mapping;
+    mappedSize_ = std::size_t(fileSize.QuadPart);
+#else
+    int fd = ::open(path, O_RDONLY);
+    if (fd < 0) return false;
+    struct stat st {{}};
+    fstat(fd, &st);
+    void* view = st.st_size ? mmap(nullptr, std::size_t(st.st_size), PROT_READ, MAP_PRIVATE, fd, 0) : MAP_FAILED;
+    ::close(fd);
+    if (view == MAP_FAILED) view = nullptr;
+    mappedSize_ = std::size_t(st.st_size);
+#endif
+    base_ = static_cast<const std::uint8_t*>(view);
+    if (!base_) {{
+        close();
+        return false;
+    }}
+
+    Header header{{}};
+    if (mappedSize_ < sizeof(Header)) {{
+        close();
+        return false;
+    }}
+    std::memcpy(&header, base_, sizeof(Header));
+    std::size_t indexEnd = sizeof(Header) + std::size_t(header.count) * sizeof(Entry) + header.namesSize;
+    if (std::memcmp(header.magic, "VSPK", 4) != 0 || header.version != kVersion || indexEnd > mappedSize_) {{
+        std::cerr << "AssetPack: " << path << " is not a valid pack" << std::endl;
+        close();
+        return false;
+    }}
+    count_ = header.count;
+    entries_ = reinterpret_cast<const Entry*>(base_ + sizeof(Header));
+    names_ = reinterpret_cast<const char*>(base_ + sizeof(Header) + std::size_t(count_) * sizeof(Entry));
+    return true;
+}}
+
+bool AssetPack::openNextToExe(const char* fileName)
+{{
+    char* basePath = SDL_GetBasePath();
+    std::string path = std::string(basePath ? basePath : "") + fileName;
+    SDL_free(basePath);
+    return open(path.c_str());
+}}
+
+void AssetPack::close()
+{{
+    unpacked_.clear();
+#ifdef _WIN32
+    if (base_) UnmapViewOfFile(base_);
+    if (mapping_) CloseHandle(static_cast<HANDLE>(mapping_));
+    if (file_) CloseHandle(static_cast<HANDLE>(file_));
+#else
+    if (base_) munmap(const_cast<std::uint8_t*>(base_), mappedSize_);
+#endif
+    base_ = nullptr;
+    mappedSize_ = 0;
+    entries_ = nullptr;
+    names_ = nullptr;
+    count_ = 0;
+    file_ = nullptr;
+    mapping_ = nullptr;
+}}
+
+const AssetPack::Entry* AssetPack::find(std::string_view name) const
+{{
+    // Индекс отсортирован по байтам имени — двоичный поиск
+    std::uint32_t lo = 0, hi = count_;
+    while (lo < hi) {{
+        std::uint32_t mid = lo + (hi - lo) / 2;
+        const Entry& e = entries_[mid];
+        int cmp = std::string_view(names_ + e.nameOffset, e.nameLength).compare(name);
+        if (cmp == 0) return &e;
+        if (cmp < 0) lo = mid + 1;
+        else hi = mid;
+    }}
+    return nullptr;
+}}
+
+bool AssetPack::data(std::string_view name, const void*& ptr, std::size_t& size)
+{{
+    const Entry* e = find(name);
+    if (!e || e->offset + e->size > mappedSize_) return false;
+    const std::uint8_t* stored = base_ + e->offset;
+    if (!(e->flags & kDeflate)) {{
+        ptr = stored;
+        size = e->size;
+        return true;
+    }}
+    auto it = unpacked_.find(e);
+    if (it == unpacked_.end()) {{
+        std::vector<std::uint8_t> raw(e->rawSize);
+        if (!Inflater(stored, e->size, raw.data(), raw.size()).run()) {{
+            std::cerr << "AssetPack: corrupt entry " << name << std::endl;
+            return false;
+        }}
+        it = unpacked_.emplace(e, std::move(raw)).first;
+    }}
+    ptr = it->second.data();
+    size = it->second.size();
+    return true;
+}}
+
+SDL_RWops* AssetPack::openRW(std::string_view name)
+{{
+    const void* ptr = nullptr;
+    std::size_t size = 0;
+    if (!data(name, ptr, size)) {{
+        SDL_SetError("AssetPack: no entry '%.*s'", int(name.size()), name.data());
+        return nullptr;
+    }}
+    return SDL_RWFromConstMem(ptr, int(size));
+}}
+"""
+
+APP_ASSET_PACK_INIT = r"""    // Ассеты — из assets.pak рядом с .exe: IMG_LoadTexture_RW(renderer_, assets_.openRW("hero.png"), 1)
+    if (!assets_.openNextToExe()) {
+        std::cerr << "AssetPack: assets.pak not found next to the executable" << std::endl;
+    }
+
+"""
+
+# ---- Кеш текстур (--resource-cache) ----
+# Бюджет памяти текстур по умолчанию, МБ (--resource-cache-mb — свой)
+RESOURCE_CACHE_DEFAULT_MB = 256
+
+RESOURCE_CACHE_H = r"""#pragma once
+
+#include <SDL.h>
+#include <condition_variable>
+#include <cstddef>
+#include <cstdint>
+#include <deque>
+#include <functional>
+#include <list>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <unordered_map>
+#include <vector>
+
+// Кеш текстур: PNG/JPG декодируются в SDL_Surface на рабочих потоках,
+// в текстуры загружаются на главном потоке в pump() с бюджетом времени на кадр,
+// одинаковые пути не грузятся дважды, при превышении бюджета памяти вытесняются
+// давно не использованные (LRU) текстуры.
+//   init:   resources_.start(renderer_);
+//   кадр:   resources_.pump();  SDL_Texture* t = resources_.get("hero.png");  // nullptr, пока не готова
+//   выход:  resources_.shutdown();  // до SDL_DestroyRenderer
+class ResourceCache {
+public:
+    // Открывает ассет по относительному пути; вызывается с рабочих потоков
+    // (под внутренним мьютексом, так что источник может быть непотокобезопасным)
+    using Opener = std::function<SDL_RWops*(const std::string& path)>;
+
+    struct Config {
+        std::size_t memoryBudget = std::size_t(256) << 20;  // байт текстур (оценка w*h*bpp)
+        double uploadBudgetMs = 2.0;                        // на pump(), минимум одна текстура
+        unsigned workers = 2;                               // потоков декодирования
+    };
+
+    struct Stats {
+        std::size_t textures = 0;
+        std::size_t bytes = 0;
+        std::size_t pending = 0;  // в очереди или декодируются
+        std::uint64_t hits = 0;
+        std::uint64_t misses = 0;
+        std::uint64_t evictions = 0;
+        std::uint64_t failures = 0;
+    };
+
+    ResourceCache() = default;
+    ~ResourceCache() { shutdown(); }
+    ResourceCache(const ResourceCache&) = delete;
+    ResourceCache& operator=(const ResourceCache&) = delete;
+
+    // opener по умолчанию — файлы из <папка .exe>/assets/
+    bool start(SDL_Renderer* renderer, const Config& config, Opener opener = {});
+    bool start(SDL_Renderer* renderer) { return start(renderer, Config{}); }
+    void shutdown();
+
+    // Ставит путь в очередь (если его ещё нет в кеше)
+    void request(const std::string& path);
+    // Текстура, если уже загружена (и отметка использования для LRU); иначе
+    // ставит в очередь и возвращает nullptr
+    SDL_Texture* get(const std::string& path);
+    // Синхронная загрузка мимо очереди (загрузочный экран)
+    SDL_Texture* getNow(const std::string& path);
+    bool ready(const std::string& path) const;
+
+    // Главный поток, раз в кадр: готовые поверхности -> текстуры, затем вытеснение
+    void pump();
+
+    // Открыть ассет через тот же источник (и тот же мьютекс), что у рабочих потоков
+    SDL_RWops* open(const std::string& path);
+
+    Stats stats() const;
+
+private:
+    enum class State : std::uint8_t { Queued, Ready, Failed };
+
+    struct Entry {
+        State state = State::Queued;
+        SDL_Texture* texture = nullptr;
+        std::size_t bytes = 0;
+        std::uint64_t lastFrame = 0;
+        std::list<std::string>::iterator lru;  // только для Ready
+    };
+
+    struct Decoded {
+        std::string path;
+        SDL_Surface* surface;  // nullptr — ошибка
+    };
+
+    void workerLoop();
+    SDL_Surface* decode(const std::string& path);
+    void upload(const std::string& path, SDL_Surface* surface);
+    void touch(Entry& entry);
+    void evict();
+
+    SDL_Renderer* renderer_ = nullptr;
+    Config config_;
+    Opener opener_;
+    std::mutex openMutex_;
+
+    // Главный поток
+    std::unordered_map<std::string, Entry> entries_;
+    std::list<std::string> lru_;  // front — самая свежая
+    std::size_t bytes_ = 0;
+    std::uint64_t frame_ = 0;
+    std::uint64_t hits_ = 0, misses_ = 0, evictions_ = 0, failures_ = 0;
+
+    // Общие с рабочими потоками
+    mutable std::mutex mutex_;
+    std::condition_variable wake_;
+    std::deque<std::string> requests_;
+    std::vector<Decoded> decoded_;
+    std::size_t pending_ = 0;
+    bool stop_ = false;
+    std::vector<std::thread> workers_;
+};
+"""
+
+RESOURCE_CACHE_CPP = r"""#include "{proj_name}/resource_cache.h"
+
+#include <SDL_image.h>
+#include <algorithm>
+#include <iostream>
+#include <iterator>
+
+bool ResourceCache::start(SDL_Renderer* renderer, const Config& config, Opener opener)
+{{
+    shutdown();
+    renderer_ = renderer;
+    config_ = config;
+    opener_ = std::move(opener);
+    if (!opener_) {{
+        char* base = SDL_GetBasePath();
+        std::string root = base ? std::string(base) + "assets/" : std::string("assets/");
+        SDL_free(base);
+        opener_ = [root](const std::string& path) {{ return SDL_RWFromFile((root + path).c_str(), "rb"); }};
+    }}
+
+    stop_ = false;
+    const unsigned count = std::max(config_.workers, 1u);
+    for (unsigned i = 0; i < count; ++i) {{
+        workers_.emplace_back(&ResourceCache::workerLoop, this);
+    }}
+    return true;
+}}
+
+void ResourceCache::shutdown()
+{{
+    {{
+        std::lock_guard<std::mutex> lock(mutex_);
+        stop_ = true;
+        requests_.clear();
+    }}
+    wake_.notify_all();
+    for (std::thread& t : workers_) t.join();
+    workers_.clear();
+
+    for (Decoded& d : decoded_) {{
+        if (d.surface) SDL_FreeSurface(d.surface);
+    }}
+    decoded_.clear();
+    pending_ = 0;
+    for (auto& [path, entry] : entries_) {{
+        if (entry.texture) SDL_DestroyTexture(entry.texture);
+    }}
+    entries_.clear();
+    lru_.clear();
+    bytes_ = 0;
+    renderer_ = nullptr;
+}}
+
+void ResourceCache::request(const std::string& path)
+{{
+    if (!renderer_ || entries_.count(path)) return;
+    entries_.emplace(path, Entry{{}});
+    ++misses_;
+    {{
+        std::lock_guard<std::mutex> lock(mutex_);
+        requests_.push_back(path);
+        ++pending_;
+    }}
+    wake_.notify_one();
+}}
+
+SDL_Texture* ResourceCache::get(const std::string& path)
+{{
+    auto it = entries_.find(path);
+    if (it == entries_.end()) {{
+        request(path);
+        return nullptr;
+    }}
+    Entry& entry = it->second;
+    if (entry.state != State::Ready) return nullptr;
+    ++hits_;
+    touch(entry);
+    return entry.texture;
+}}
+
+SDL_Texture* ResourceCache::getNow(const std::string& path)
+{{
+    auto it = entries_.find(path);
+    if (it != entries_.end()) {{
+        if (it->second.state == State::Ready) return get(path);
+        if (it->second.state == State::Failed) return nullptr;
+        // Уже в очереди: декодируем сами, результат рабочего потока отбросит upload()
+    }} else {{
+        entries_.emplace(path, Entry{{}});
+        ++misses_;
+    }}
+    upload(path, decode(path));
+    evict();
+    return get(path);
+}}
+
+bool ResourceCache::ready(const std::string& path) const
+{{
+    auto it = entries_.find(path);
+    return it != entries_.end() && it->second.state == State::Ready;
+}}
+
+SDL_RWops* ResourceCache::open(const std::string& path)
+{{
+    std::lock_guard<std::mutex> lock(openMutex_);
+    return opener_ ? opener_(path) : nullptr;
+}}
+
+SDL_Surface* ResourceCache::decode(const std::string& path)
+{{
+    SDL_RWops* rw = open(path);
+    if (!rw) return nullptr;
+    return IMG_Load_RW(rw, 1);
+}}
+
+void ResourceCache::workerLoop()
+{{
+    for (;;) {{
+        std::string path;
+        {{
+            std::unique_lock<std::mutex> lock(mutex_);
+            wake_.wait(lock, [this] {{ return stop_ || !requests_.empty(); }});
+            if (stop_) return;
+            path = std::move(requests_.front());
+            requests_.pop_front();
+        }}
+        SDL_Surface* surface = decode(path);
+        std::lock_guard<std::mutex> lock(mutex_);
+        if (stop_) {{
+            if (surface) SDL_FreeSurface(surface);
+            return;
+        }}
+        decoded_.push_back(Decoded{{std::move(path), surface}});
+    }}
+}}
+
+void ResourceCache::upload(const std::string& path, SDL_Surface* surface)
+{{
+    auto it = entries_.find(path);
+    if (it == entries_.end() || it->second.state != State::Queued) {{
+        if (surface) SDL_FreeSurface(surface);
+        return;
+    }}
+    Entry& entry = it->second;
+    SDL_Texture* texture = surface ? SDL_CreateTextureFromSurface(renderer_, surface) : nullptr;
+    if (!texture) {{
+        std::cerr << "ResourceCache: cannot load " << path << ": " << SDL_GetError() << std::endl;
+        entry.state = State::Failed;
+        ++failures_;
+        if (surface) SDL_FreeSurface(surface);
+        return;
+    }}
+    entry.state = State::Ready;
+    entry.texture = texture;
+    entry.bytes = std::size_t(surface->w) * std::size_t(surface->h) * surface->format->BytesPerPixel;
+    entry.lastFrame = frame_;
+    entry.lru = lru_.insert(lru_.begin(), path);
+    bytes_ += entry.bytes;
+    SDL_FreeSurface(surface);
+}}
+
+void ResourceCache::pump()
+{{
+    ++frame_;
+    std::vector<Decoded> ready;
+    {{
+        std::lock_guard<std::mutex> lock(mutex_);
+        ready.swap(decoded_);
+    }}
+
+    // Загрузка в GPU — в пределах бюджета; остальное ждёт следующего кадра
+    const Uint64 start = SDL_GetPerformanceCounter();
+    const double toMs = 1000.0 / double(SDL_GetPerformanceFrequency());
+    std::size_t done = 0;
+    while (done < ready.size()) {{
+        upload(ready[done].path, ready[done].surface);
+        ++done;
+        if (double(SDL_GetPerformanceCounter() - start) * toMs >= config_.uploadBudgetMs) break;
+    }}
+    {{
+        std::lock_guard<std::mutex> lock(mutex_);
+        pending_ -= done;
+        if (done < ready.size()) {{
+            decoded_.insert(decoded_.begin(), std::make_move_iterator(ready.begin() + done),
+                            std::make_move_iterator(ready.end()));
+        }}
+    }}
+    evict();
+}}
+
+void ResourceCache::touch(Entry& entry)
+{{
+    entry.lastFrame = frame_;
+    lru_.splice(lru_.begin(), lru_, entry.lru);
+}}
+
+void ResourceCache::evict()
+{{
+    // С хвоста LRU; текстуры, взятые в этом кадре, не трогаем
+    while (bytes_ > config_.memoryBudget && !lru_.empty()) {{
+        auto it = entries_.find(lru_.back());
+        if (it->second.lastFrame >= frame_) break;
+        SDL_DestroyTexture(it->second.texture);
+        bytes_ -= it->second.bytes;
+        lru_.pop_back();
+        entries_.erase(it);
+        ++evictions_;
+    }}
+}}
+
+ResourceCache::Stats ResourceCache::stats() const
+{{
+    Stats s;
+    s.textures = lru_.size();
+    s.bytes = bytes_;
+    s.hits = hits_;
+    s.misses = misses_;
+    s.evictions = evictions_;
+    s.failures = failures_;
+    std::lock_guard<std::mutex> lock(mutex_);
+    s.pending = pending_;
+    return s;
+}}
+"""
+
+# {source} — пусто (файлы assets/ рядом с .exe) или opener через AssetPack
+APP_RESOURCE_CACHE_INIT = r"""    // Текстуры: в кадре resources_.get("hero.png") — nullptr, пока не загружена
+{note}    ResourceCache::Config cacheConfig;
+    cacheConfig.memoryBudget = std::size_t({budget_mb}) << 20;
+    resources_.start(renderer_, cacheConfig{source});
+
+"""
+
+# Источник кеша — assets.pak; AssetPack непотокобезопасен, поэтому при кеше
+# ассеты открываются только через resources_.open(...)
+APP_RESOURCE_CACHE_PACK_SOURCE = ", [this](const std::string& path) { return assets_.openRW(path); }"
+APP_RESOURCE_CACHE_PACK_NOTE = "    // assets_ читают потоки кеша: остальные ассеты — через resources_.open(\"...\")\n"
+
+# ---- Атласы спрайтов (--atlas) ----
+
+SPRITE_ATLAS_H = r"""#pragma once
+
+#include <SDL.h>
+#include <algorithm>
+#include <cstdint>
+#include <cstring>
+#include <string>
+#include <string_view>
+#include <vector>
+
+// Индекс атласа спрайтов <atlas>.atlas (VS_build.py build-atlas).
+// Имя спрайта — путь от папки атласа без расширения: "buttons/ok"
+struct SpriteRect {
+    int page = 0;
+    SDL_Rect rect{};
+};
+
+class SpriteAtlas {
+public:
+    struct Page {
+        std::string file;  // <atlas>_<n>.png рядом с .atlas
+        int width = 0;
+        int height = 0;
+    };
+
+    // Читает индекс целиком; freesrc — как в SDL (закрыть rw после чтения).
+    // Например: atlas.load(assets_.openRW("atlases/ui.atlas"))
+    bool load(SDL_RWops* rw, bool freesrc = true)
+    {
+        pages_.clear();
+        sprites_.clear();
+        if (!rw) return false;
+        std::vector<std::uint8_t> data(std::size_t(std::max<Sint64>(SDL_RWsize(rw), 0)));
+        bool ok = data.empty() || SDL_RWread(rw, data.data(), data.size(), 1) == 1;
+        if (freesrc) SDL_RWclose(rw);
+        return ok && parse(data);
+    }
+
+    const SpriteRect* find(std::string_view name) const
+    {
+        auto it = std::lower_bound(sprites_.begin(), sprites_.end(), name,
+                                   [](const Sprite& s, std::string_view n) { return s.name < n; });
+        return it != sprites_.end() && it->name == name ? &it->rect : nullptr;
+    }
+
+    const std::vector<Page>& pages() const { return pages_; }
+    std::size_t size() const { return sprites_.size(); }
+
+private:
+    struct Sprite {
+        std::string name;
+        SpriteRect rect;
+    };
+
+    static std::uint32_t u32(const std::uint8_t* p)
+    {
+        std::uint32_t v;
+        std::memcpy(&v, p, 4);
+        return v;
+    }
+
+    static std::uint16_t u16(const std::uint8_t* p)
+    {
+        std::uint16_t v;
+        std::memcpy(&v, p, 2);
+        return v;
+    }
+
+    bool parse(const std::vector<std::uint8_t>& data)
+    {
+        // Заголовок: "VSAT", версия, страниц, спрайтов, размер таблицы имён
+        constexpr std::size_t header = 20, pageSize = 16, spriteSize = 20;
+        if (data.size() < header || std::memcmp(data.data(), "VSAT", 4) != 0 || u32(&data[4]) != 1) return false;
+        std::size_t pageCount = u32(&data[8]), spriteCount = u32(&data[12]), namesSize = u32(&data[16]);
+        std::size_t namesAt = header + pageCount * pageSize + spriteCount * spriteSize;
+        if (namesAt + namesSize > data.size()) return false;
+        auto name = [&](const std::uint8_t* p, std::string& out) {
+            std::size_t offset = u32(p), length = u32(p + 4);
+            if (offset + length > namesSize) return false;
+            out.assign(reinterpret_cast<const char*>(&data[namesAt + offset]), length);
+            return true;
+        };
+
+        pages_.resize(pageCount);
+        for (std::size_t i = 0; i < pageCount; ++i) {
+            const std::uint8_t* p = &data[header + i * pageSize];
+            if (!name(p, pages_[i].file)) return false;
+            pages_[i].width = int(u32(p + 8));
+            pages_[i].height = int(u32(p + 12));
+        }
+        sprites_.resize(spriteCount);
+        for (std::size_t i = 0; i < spriteCount; ++i) {
+            const std::uint8_t* p = &data[header + pageCount * pageSize + i * spriteSize];
+            Sprite& s = sprites_[i];
+            if (!name(p, s.name)) return false;
+            s.rect.page = u16(p + 8);
+            s.rect.rect = SDL_Rect{u16(p + 10), u16(p + 12), u16(p + 14), u16(p + 16)};
+        }
+        return true;
+    }
+
+    std::vector<Page> pages_;
+    std::vector<Sprite> sprites_;  // отсортированы по имени (байтово) — двоичный поиск
+};
+"""
+
+# ---- CMake + Ninja (--backend cmake) ----
+
+CMAKE_TEMPLATE = r"""# Сгенерировано VS_build.py (--backend cmake); список файлов обновляет `VS_build.py sync`.
+#   cmake --preset release && cmake --build --preset release
+cmake_minimum_required(VERSION {cmake_min})
+project({proj_name} LANGUAGES {languages})
+
+set(CMAKE_CXX_STANDARD 20)
+set(CMAKE_CXX_STANDARD_REQUIRED ON)
+set(CMAKE_CXX_EXTENSIONS OFF)
+set(CMAKE_EXPORT_COMPILE_COMMANDS ON)
+
+option(VSB_UNITY "Unity (jumbo) build" {unity_default})
+option(VSB_PROFILE_BUILD "Define PROFILE_BUILD (Profile preset)" OFF)
+
+# Явный список файлов (как в .vcxproj)
+set(VSB_SOURCES
+{sources})
+set(VSB_HEADERS
+{headers})
+
+add_executable({proj_name} ${{VSB_SOURCES}} ${{VSB_HEADERS}})
+set_target_properties({proj_name} PROPERTIES RUNTIME_OUTPUT_DIRECTORY "${{CMAKE_CURRENT_BINARY_DIR}}")
+target_include_directories({proj_name} PRIVATE "${{CMAKE_CURRENT_SOURCE_DIR}}/include")
+if(MSVC)
+    target_compile_definitions({proj_name} PRIVATE _CRT_SECURE_NO_WARNINGS NOMINMAX)
+    target_compile_options({proj_name} PRIVATE /W3 /permissive- /sdl)
+endif()
+if(VSB_PROFILE_BUILD)
+    target_compile_definitions({proj_name} PRIVATE PROFILE_BUILD)
+endif()
+
+# SDL: на Windows — SDK из VS_build.py, иначе — системный SDL2 через pkg-config
+if(WIN32)
+    target_include_directories({proj_name} PRIVATE
+{win_includes}    )
+    target_link_directories({proj_name} PRIVATE
+{win_libdirs}    )
+    target_link_libraries({proj_name} PRIVATE {win_libs})
+{copy_dlls}else()
+    find_package(PkgConfig REQUIRED)
+    pkg_check_modules(VSB_SDL REQUIRED IMPORTED_TARGET {pkg_modules})
+    target_link_libraries({proj_name} PRIVATE PkgConfig::VSB_SDL)
+endif()
+{extras}"""
+
+# DLL рядом с .exe (как CopySdlDlls): {dll_list} — set(...) или file(GLOB ...)
+CMAKE_COPY_DLLS = r"""    {dll_list}
+    if(VSB_SDL_DLLS)
+        add_custom_command(TARGET {proj_name} POST_BUILD
+            COMMAND ${{CMAKE_COMMAND}} -E copy_if_different ${{VSB_SDL_DLLS}} "$<TARGET_FILE_DIR:{proj_name}>"
+            VERBATIM)
+    endif()
+"""
+
+CMAKE_PCH = r"""
+target_precompile_headers({proj_name} PRIVATE "$<$<COMPILE_LANGUAGE:CXX>:${{CMAKE_CURRENT_SOURCE_DIR}}/include/{proj_name}/pch.h>")
+"""
+
+# Те же стабильные пачки, что unity/*.cpp в .vcxproj (UNITY_BUILD_MODE GROUP, CMake 3.18+)
+CMAKE_UNITY = r"""
+if(VSB_UNITY)
+    set_target_properties({proj_name} PROPERTIES UNITY_BUILD ON UNITY_BUILD_MODE GROUP)
+{groups}endif()
+"""
+
+CMAKE_IPO = r"""
+# LTO в Release (как WholeProgramOptimization в .vcxproj)
+include(CheckIPOSupported)
+check_ipo_supported(RESULT VSB_IPO OUTPUT VSB_IPO_ERROR)
+if(VSB_IPO)
+    set_property(TARGET {proj_name} PROPERTY INTERPROCEDURAL_OPTIMIZATION_RELEASE ON)
+endif()
+"""
+
+# Ассеты: те же шаги, что цели BuildAtlases/PackAssets в .vcxproj
+CMAKE_ASSETS = r"""
+find_package(Python3 COMPONENTS Interpreter REQUIRED)
+set(VSB_TOOL "${{CMAKE_CURRENT_SOURCE_DIR}}/tools/vsb_assets.py")
+{atlas}file(GLOB_RECURSE VSB_ASSETS CONFIGURE_DEPENDS "${{CMAKE_CURRENT_SOURCE_DIR}}/assets/*")
+list(FILTER VSB_ASSETS EXCLUDE REGEX "{exclude_regex}")
+add_custom_command(
+    OUTPUT "${{CMAKE_CURRENT_BINARY_DIR}}/assets.pak"
+    COMMAND Python3::Interpreter "${{VSB_TOOL}}" pack-assets "${{CMAKE_CURRENT_SOURCE_DIR}}/assets" "${{CMAKE_CURRENT_BINARY_DIR}}/assets.pak"{pack_args} -q
+    DEPENDS ${{VSB_ASSETS}} "${{VSB_TOOL}}"{pack_depends}
+    VERBATIM)
+add_custom_target({proj_name}_assets ALL DEPENDS "${{CMAKE_CURRENT_BINARY_DIR}}/assets.pak")
+"""
+
+CMAKE_ATLAS = r"""file(GLOB_RECURSE VSB_SPRITES CONFIGURE_DEPENDS "${{CMAKE_CURRENT_SOURCE_DIR}}/assets/sprites/*.png")
+add_custom_command(
+    OUTPUT "${{CMAKE_CURRENT_BINARY_DIR}}/atlas.stamp"
+    COMMAND Python3::Interpreter "${{VSB_TOOL}}" build-atlas "${{CMAKE_CURRENT_SOURCE_DIR}}/assets/sprites" "${{CMAKE_CURRENT_SOURCE_DIR}}/assets/atlases" --max-size {max_size} -q
+    COMMAND ${{CMAKE_COMMAND}} -E touch "${{CMAKE_CURRENT_BINARY_DIR}}/atlas.stamp"
+    DEPENDS ${{VSB_SPRITES}} "${{VSB_TOOL}}"
+    VERBATIM)
+"""
+
+# Конфигурации -> CMAKE_BUILD_TYPE пресетов Ninja
+CMAKE_BUILD_TYPES = {"Debug": "Debug", "Release": "Release", PROFILE_CONFIG: "RelWithDebInfo"}
+# Библиотеки SDL -> модули pkg-config (не-Windows)
+SDL_PKG_MODULES = {"SDL.h": "sdl2", "SDL_image.h": "SDL2_image", "SDL_ttf.h": "SDL2_ttf", "SDL_mixer.h": "SDL2_mixer"}
+
+# Заготовки add-class / add-file
+CLASS_H = r"""#pragma once
+
+class {cls_name} {{
+public:
+    {cls_name}();
+    ~{cls_name}();
+}};
+"""
+
+CLASS_CPP = r"""#include "{header}"
+
+{cls_name}::{cls_name}()
+{{
+}}
+
+{cls_name}::~{cls_name}()
+{{
+}}
+"""
+
+HEADER_STUB = "#pragma once\n"
+
+# ---- Замеры фаз ----
+
+@dataclass
+class Timings:
+    """Замер запуска: фазы {имя: [секунды, вызовов]}, файловые операции
+    {имя: [вызовов, байт]} и записанные файлы. Фазы из потоков пакетного
+    режима суммируются."""
+    phases: dict = field(default_factory=dict)
+    fs: dict = field(default_factory=dict)
+    files: list = field(default_factory=list)
+
+    def to_json(self) -> dict:
+        return {
+            "phases": {name: {"seconds": t, "calls": n} for name, (t, n) in self.phases.items()},
+            "fs": {name: {"calls": n, "bytes": b} for name, (n, b) in self.fs.items()},
+        }
+
+    def print_table(self, total: Optional[float] = None):
+        print(f"\n{'phase':<24} {'ms':>10} {'calls':>7} {'share':>7}")
+        for name, (t, n) in sorted(self.phases.items(), key=lambda kv: -kv[1][0]):
+            share = f"{t / total:>7.0%}" if total else ""
+            print(f"{name:<24} {t * 1000:>10.2f} {n:>7} {share}")
+        if total is not None:
+            print(f"{'total (wall)':<24} {total * 1000:>10.2f}")
+        if self.fs:
+            print(f"\n{'fs op':<24} {'calls':>10} {'bytes':>12}")
+            for name, (n, b) in sorted(self.fs.items()):
+                print(f"{name:<24} {n:>10} {b:>12}")
+
+_phase_lock = threading.Lock()
+# None — замер выключен (phase()/fs_op() ничего не делают, если нет хуков)
+_timings: Optional[Timings] = None
+# Хуки библиотечного кода: hook(event, name, seconds), event — "start" или "end"
+_phase_hooks: list = []
+
+def add_phase_hook(hook):
+    """Регистрирует hook(event, name, seconds): "start" (seconds = 0) и "end"
+    для каждой фазы phase(). Вызывается в потоке фазы (в пакете — из пула)."""
+    _phase_hooks.append(hook)
+
+def remove_phase_hook(hook):
+    if hook in _phase_hooks:
+        _phase_hooks.remove(hook)
+
+@contextlib.contextmanager
+def phase(name: str):
+    """Копит время блока в фазу name, если замер включён (collect_phases())
+    или зарегистрированы хуки."""
+    if _timings is None and not _phase_hooks:
+        yield
+        return
+    for hook in list(_phase_hooks):
+        hook("start", name, 0.0)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        timings = _timings
+        if timings is not None:
+            with _phase_lock:
+                total, count = timings.phases.get(name, (0.0, 0))
+                timings.phases[name] = (total + elapsed, count + 1)
+        for hook in list(_phase_hooks):
+            hook("end", name, elapsed)
+
+def fs_op(name: str, nbytes: int = 0, path: Optional[Path] = None):
+    """Считает файловую операцию (write/copy/read/mkdir/scandir/...) при замере;
+    path — записанный файл (попадает в Timings.files)."""
+    timings = _timings
+    if timings is None:
+        return
+    with _phase_lock:
+        count, total = timings.fs.get(name, (0, 0))
+        timings.fs[name] = (count + 1, total + nbytes)
+        if path is not None:
+            timings.files.append(str(path))
+
+@contextlib.contextmanager
+def collect_phases():
+    """Включает замер фаз и файловых операций; отдаёт Timings.
+    Вложенный замер по выходе добавляется во внешний."""
+    global _timings
+    saved = _timings
+    _timings = timings = Timings()
+    try:
+        yield timings
+    finally:
+        _timings = saved
+        if saved is not None:
+            with _phase_lock:
+                for name, (total, count) in timings.phases.items():
+                    t, c = saved.phases.get(name, (0.0, 0))
+                    saved.phases[name] = (t + total, c + count)
+                for name, (count, nbytes) in timings.fs.items():
+                    c, n = saved.fs.get(name, (0, 0))
+                    saved.fs[name] = (c + count, n + nbytes)
+                saved.files.extend(timings.files)
+
+def encode_text(data: str) -> bytes:
+    # Те же байты, что пишет Path.write_text в текстовом режиме (CRLF на Windows)
+    return data.replace("\n", os.linesep).encode("utf-8")
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def load_manifest(project_root: Path) -> dict:
+    try:
+        data = json.loads((project_root / MANIFEST_PATH).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+def save_manifest(project_root: Path, files: dict):
+    path = project_root / MANIFEST_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"version": MANIFEST_VERSION, "files": files}
+    text = json.dumps(data, indent=2, sort_keys=True) + "\n"
+    path.write_text(text, encoding="utf-8")
+    fs_op("write", len(text))
+
+def parallel_map(fn, items, workers: int = IO_WORKERS) -> list:
+    """map() пулом потоков (порядок результатов сохраняется); workers<=1 — обычный map."""
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        return list(pool.map(fn, items))
+
+class OutputWriter:
+    """Пишет файлы проекта, пропуская те, чьё содержимое не изменилось.
+
+    В обычном режиме пишет всё (как раньше). В инкрементальном сверяет
+    sha256 нового содержимого с манифестом .vsbuild/manifest.json и
+    файлом на диске, и не трогает совпадающие файлы (mtime сохраняется,
+    MSBuild/VS не видят изменений).
+    """
+
+    def __init__(
+        self,
+        project_root: Path,
+        incremental: bool,
+        quiet: bool = False,
+        copy_mode: str = "copy",
+        partial: bool = False,
+    ):
+        self.project_root = project_root
+        self.incremental = incremental
+        self.quiet = quiet
+        self.copy_mode = copy_mode
+        self.old_manifest = load_manifest(project_root) if incremental or partial else {}
+        # partial — пишется только часть файлов (sync), остальные записи
+        # манифеста сохраняются как были
+        self.manifest = dict(self.old_manifest) if partial else {}
+        self.written = 0
+        self.skipped = 0
+        self._dirs = set()
+        self._lock = threading.Lock()
+
+    def _mkdir(self, path: Path):
+        # Без лишних mkdir на каждый файл (заметно на медленных дисках)
+        if path not in self._dirs:
+            path.mkdir(parents=True, exist_ok=True)
+            self._dirs.add(path)
+            fs_op("mkdir")
+
+    def _up_to_date(self, rel: str, path: Path, data: bytes, digest: str) -> bool:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return False
+        if st.st_size != len(data):
+            return False
+        entry = self.old_manifest.get(rel) or {}
+        if (entry.get("sha256") == digest
+                and entry.get("size") == st.st_size
+                and entry.get("mtime_ns") == st.st_mtime_ns):
+            return True
+        # Манифеста нет или файл трогали руками — сверяем содержимое
+        fs_op("read", st.st_size)
+        return file_digest(path.read_bytes()) == digest
+
+    def _record(self, rel: str, path: Path, digest: str):
+        st = path.stat()
+        with self._lock:
+            self.manifest[rel] = {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def _store(self, rel: str, data: bytes, src: Optional[Path] = None) -> Optional[str]:
+        """Пишет (или копирует из src) один файл; возвращает строку для лога
+        или None, если файл пропущен. Потокобезопасно."""
+        path = self.project_root / rel
+        digest = file_digest(data)
+        # Копии (dotFiles) с тем же содержимым не трогаем никогда
+        if ((src is not None and same_file_content(path, src))
+                or (self.incremental and self._up_to_date(rel, path, data, digest))):
+            self._record(rel, path, digest)
+            with self._lock:
+                self.skipped += 1
+            fs_op("skip")
+            return None
+        self._mkdir(path.parent)
+        if src is not None:
+            how = provision_file(src, path, self.copy_mode)
+            line = f"  {how} {src} -> {path}"
+            fs_op(how, len(data), path)
+        else:
+            path.write_bytes(data)
+            line = f"  wrote {path}"
+            fs_op("write", len(data), path)
+        self._record(rel, path, digest)
+        with self._lock:
+            self.written += 1
+        return line
+
+    def _log(self, line: Optional[str]) -> bool:
+        if line is not None and not self.quiet:
+            print(line)
+        return line is not None
+
+    def put(self, rel: str, data: bytes) -> bool:
+        return self._log(self._store(rel, data))
+
+    def put_text(self, rel: str, text: str) -> bool:
+        return self.put(rel, encode_text(text))
+
+    def copy(self, rel: str, src: Path, data: Optional[bytes] = None) -> bool:
+        """Копия src (способом copy_mode); пропускается, если dst уже такой же."""
+        if data is None:
+            data = src.read_bytes()
+        return self._log(self._store(rel, data, src))
+
+    def store_many(self, items: list[tuple[str, bytes, Optional[Path]]], workers: int = 1):
+        """items: [(rel, data, src|None)]. Пишет пулом потоков, лог — в исходном порядке."""
+        for line in parallel_map(lambda item: self._store(*item), items, workers):
+            self._log(line)
+
+    def finish(self):
+        save_manifest(self.project_root, self.manifest)
+        if self.incremental and not self.quiet:
+            print(f"  incremental: written {self.written}, skipped {self.skipped}")
+
+def norm(p: str) -> str:
+    """Путь из командной строки в родном для ОС виде (на Windows — с \\);
+    в MSBuild XML пути переводятся в \\ отдельно (win_path)."""
+    return os.path.normpath(p)
+
+def walk_files(root: Path, rel_prefix: str = "", skip: tuple[str, ...] = (".git",)) -> list[tuple[str, Path]]:
+    """Рекурсивный обход через os.scandir: [(rel через /, путь)], отсортировано."""
+    found = []
+    stack = [(root, rel_prefix)]
+    while stack:
+        d, rel = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        fs_op("scandir")
+        for e in entries:
+            if e.name in skip:
+                continue
+            erel = f"{rel}/{e.name}" if rel else e.name
+            if e.is_dir(follow_symlinks=False):
+                stack.append((Path(e.path), erel))
+            elif e.is_file():
+                found.append((erel, Path(e.path)))
+    found.sort()
+    return found
+
+def scan_dotfiles(
+    dotfiles_dir: str,
+    io_workers: int = 1,
+    names: Optional[list[str]] = None,
+) -> tuple[list[tuple[str, Path]], list[str]]:
+    """Список dotFiles: [(rel, src)]. Элементы names — файлы или папки
+    (папки раскрываются рекурсивно), "*" — вся папка dotFiles."""
+    src_dir = Path(dotfiles_dir)
+    names = DOTFILES if names is None else names
+    if DOTFILES_ALL in names:
+        if not src_dir.is_dir():
+            return [], [f"[dotfile] missing: {src_dir}"]
+        return walk_files(src_dir), []
+
+    srcs = [src_dir / fname for fname in names]
+
+    def kind(src: Path) -> Optional[str]:
+        try:
+            st = src.stat()
+        except OSError:
+            return None
+        return "dir" if stat.S_ISDIR(st.st_mode) else "file"
+
+    found = []
+    problems = []
+    for fname, src, k in zip(names, srcs, parallel_map(kind, srcs, io_workers)):
+        if k is None:
+            problems.append(f"[dotfile] missing: {src}")
+        elif k == "dir":
+            found += walk_files(src, Path(fname).as_posix())
+        else:
+            found.append((Path(fname).as_posix(), src))
+    return found, problems
+
+def same_file_content(dst: Path, src: Path) -> bool:
+    """Быстрая проверка без чтения: тот же inode (hardlink) или совпадают
+    размер и mtime (copy2 сохраняет mtime)."""
+    try:
+        d = dst.stat()
+        s = src.stat()
+    except OSError:
+        return False
+    if (d.st_dev, d.st_ino) == (s.st_dev, s.st_ino):
+        return True
+    return d.st_size == s.st_size and d.st_mtime_ns == s.st_mtime_ns
+
+def reflink(src: Path, dst: Path) -> bool:
+    """Copy-on-write клон (Linux FICLONE). False — не поддерживается."""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, "rb") as fs, open(dst, "wb") as fd:
+            fcntl.ioctl(fd.fileno(), FICLONE, fs.fileno())
+    except OSError:
+        try:
+            dst.unlink()
+        except OSError:
+            pass
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+def provision_file(src: Path, dst: Path, mode: str = "copy") -> str:
+    """Кладёт src в dst способом mode; возвращает, чем в итоге получилось."""
+    tmp = dst.with_name(dst.name + ".vsbuild-tmp")
+    if mode in ("reflink", "auto"):
+        if reflink(src, tmp):
+            os.replace(tmp, dst)
+            return "reflinked"
+    if mode in ("link", "auto"):
+        try:
+            if tmp.exists():
+                tmp.unlink()
+            os.link(src, tmp)
+            os.replace(tmp, dst)
+            return "linked"
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+    return "copied"
+
+def find_dotfiles(
+    dotfiles_dir: str,
+    fail_on_missing: bool,
+    io_workers: int = 1,
+    names: Optional[list[str]] = None,
+) -> list[tuple[str, Path]]:
+    found, problems = scan_dotfiles(dotfiles_dir, io_workers, names)
+    if problems:
+        print("\n=== DOTFILES WARNINGS ===")
+        for msg in problems:
+            print(" -", msg)
+        print("=========================\n")
+        if fail_on_missing:
+            raise SystemExit("Missing dotFiles. Aborting due to --fail-on-missing.")
+    return found
+
+def git_init(project_root: Path, quiet: bool = False):
+    try:
+        subprocess.run(["git", "init"], cwd=str(project_root), check=True, capture_output=True, text=True)
+        if not quiet:
+            print("  git init: OK")
+    except FileNotFoundError:
+        print("  git init: SKIP (git not found in PATH)")
+    except subprocess.CalledProcessError as e:
+        print("  git init: FAILED")
+        if e.stdout:
+            print(e.stdout.strip())
+        if e.stderr:
+            print(e.stderr.strip())
+
+# ---- Первый коммит (--git-commit) ----
+
+GIT_COMMIT_MESSAGE = "Initial commit (VS_build)"
+GIT_FALLBACK_AUTHOR = "VS_build <vsbuild@localhost>"
+GIT_AUTHOR_RE = re.compile(r"^\s*([^<>]+?)\s*<([^<>]*)>\s*$")
+
+def parse_git_author(value: str) -> tuple[str, str]:
+    m = GIT_AUTHOR_RE.match(value)
+    if not m:
+        raise ValueError(f"expected 'Name <email>', got {value!r}")
+    return m.group(1), m.group(2)
+
+def default_git_author() -> str:
+    """Автор как у git: GIT_AUTHOR_NAME/EMAIL, иначе [user] из глобального
+    конфига (без запуска git), иначе GIT_FALLBACK_AUTHOR."""
+    name = os.environ.get("GIT_AUTHOR_NAME")
+    email = os.environ.get("GIT_AUTHOR_EMAIL")
+    xdg = os.environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+    for path in (Path(xdg) / "git" / "config", Path.home() / ".gitconfig"):
+        if name and email:
+            break
+        try:
+            text = path.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            continue
+        section = None
+        for line in text.splitlines():
+            line = line.split("#", 1)[0].split(";", 1)[0].strip()
+            m = re.match(r"^\[\s*([^\]\s]+)", line)
+            if m:
+                section = m.group(1).lower()
+            elif section == "user" and "=" in line:
+                key, value = (x.strip() for x in line.split("=", 1))
+                value = value.strip('"')
+                if key.lower() == "name" and not name:
+                    name = value
+                elif key.lower() == "email" and not email:
+                    email = value
+    if not name or not email:
+        return GIT_FALLBACK_AUTHOR
+    return f"{name} <{email}>"
+
+def git_head_ref(git_dir: Path) -> Optional[str]:
+    """Ветка HEAD (refs/heads/...) или None, если HEAD не символьная ссылка."""
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return head[5:].strip() if head.startswith("ref:") else None
+
+def git_has_commits(git_dir: Path, ref: str) -> bool:
+    if (git_dir / ref).is_file():
+        return True
+    try:
+        packed = (git_dir / "packed-refs").read_text(encoding="utf-8")
+    except OSError:
+        return False
+    return any(line.endswith(" " + ref) for line in packed.splitlines())
+
+def git_commit_initial(
+    project_root: Path,
+    author: Optional[str] = None,
+    message: str = GIT_COMMIT_MESSAGE,
+    quiet: bool = False,
+) -> bool:
+    """git init (если репозитория ещё нет) и первый коммит всех файлов проекта:
+    git add -A + git commit. Что коммитить и как (.gitignore, .git/info/exclude,
+    core.excludesFile, core.autocrlf и .gitattributes) решает сам git."""
+    git_dir = project_root / ".git"
+    if not git_dir.exists():
+        with phase("git_init"):
+            git_init(project_root, quiet=True)
+        if not git_dir.is_dir():
+            return False  # git_init уже сообщил причину
+    if not git_dir.is_dir():
+        print("  git commit: SKIP (.git is not a directory)")
+        return False
+    ref = git_head_ref(git_dir)
+    if ref is None:
+        print("  git commit: SKIP (detached HEAD)")
+        return False
+    if git_has_commits(git_dir, ref):
+        print(f"  git commit: SKIP ({ref} already has commits)")
+        return False
+
+    with phase("git_commit"):
+        name, email = parse_git_author(author or default_git_author())
+        # Коммиттер — тот же автор: коммит проходит и без user.name в конфиге
+        env = dict(os.environ, GIT_AUTHOR_NAME=name, GIT_AUTHOR_EMAIL=email,
+                   GIT_COMMITTER_NAME=name, GIT_COMMITTER_EMAIL=email)
+        try:
+            for cmd in (["git", "add", "-A"], ["git", "commit", "-q", "--no-verify", "-m", message]):
+                subprocess.run(cmd, cwd=str(project_root), env=env, check=True, capture_output=True, text=True)
+        except FileNotFoundError:
+            print("  git commit: SKIP (git not found in PATH)")
+            return False
+        except subprocess.CalledProcessError as e:
+            print("  git commit: FAILED")
+            for out in (e.stdout, e.stderr):
+                if out:
+                    print(out.strip())
+            return False
+    if not quiet:
+        print(f"  git commit: OK (on {ref[len('refs/heads/'):]})")
+    return True
+
+def sdk_cache_path() -> Path:
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+    return (Path(base) if base else Path.home() / ".cache") / "VS_build" / "sdk_index.json"
+
+class DirIndex:
+    """Кеш листингов директорий SDK: {dir: [mtime_ns, [имена]]}.
+
+    Листинг берётся из кеша, пока mtime директории совпадает (добавление или
+    удаление файла меняет mtime), так что проверка SDK стоит один stat на
+    директорию вместо stat на каждый файл и glob'а на каждый шаблон.
+    path=None — кеш только в памяти.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        self._stats = {}
+        self._listings = {}
+        if path is not None:
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = None
+            if isinstance(data, dict) and data.get("version") == SDK_CACHE_VERSION:
+                self.entries = data.get("dirs") or {}
+
+    def _stat(self, p: str):
+        if p not in self._stats:
+            fs_op("stat")
+            try:
+                self._stats[p] = os.stat(p)
+            except OSError:
+                self._stats[p] = None
+        return self._stats[p]
+
+    def is_dir(self, p: str) -> bool:
+        st = self._stat(p)
+        return st is not None and stat.S_ISDIR(st.st_mode)
+
+    def exists(self, p: str) -> bool:
+        return self._stat(p) is not None
+
+    def listing(self, d: str) -> Optional[list[str]]:
+        """Имена в директории (None, если её нет)."""
+        if d in self._listings:
+            return self._listings[d]
+        names = None
+        if self.is_dir(d):
+            mtime = self._stat(d).st_mtime_ns
+            entry = self.entries.get(d)
+            if entry and entry[0] == mtime:
+                names = entry[1]
+            else:
+                try:
+                    with os.scandir(d) as it:
+                        names = sorted(e.name for e in it)
+                except OSError:
+                    names = None
+                else:
+                    fs_op("scandir")
+                    self.entries[d] = [mtime, names]
+                    self.dirty = True
+        self._listings[d] = names
+        return names
+
+    def has_file(self, d: str, name: str) -> bool:
+        names = self.listing(d)
+        if names is None:
+            return False
+        key = os.path.normcase(name)
+        return any(os.path.normcase(n) == key for n in names)
+
+    def glob(self, d: str, pattern: str) -> list[str]:
+        names = self.listing(d)
+        return fnmatch.filter(names, pattern) if names else []
+
+    def prefetch(self, paths: list[str], dirs: list[str], workers: int = IO_WORKERS):
+        """Параллельно делает stat(paths) и листинг dirs, чтобы последующие
+        exists()/has_file()/glob() шли из памяти."""
+        paths = [p for p in dict.fromkeys(paths) if p not in self._stats]
+        parallel_map(self._stat, paths, workers)
+        dirs = [d for d in dict.fromkeys(dirs) if d not in self._listings]
+        parallel_map(self.listing, dirs, workers)
+
+    def invalidate(self):
+        """Сбросить то, что закешировано на время одного запуска (stat'ы)."""
+        self._stats.clear()
+        self._listings.clear()
+
+    def save(self):
+        if self.path is None or not self.dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"version": SDK_CACHE_VERSION, "dirs": self.entries}), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"  sdk cache: not saved ({e})")
+
+# Индекс SDK резидентного процесса (serve): живёт между запросами
+_resident_sdk_index: Optional[DirIndex] = None
+
+def open_sdk_index(args) -> DirIndex:
+    """Индекс SDK для запуска: из args (уже открытый), резидентный или с диска."""
+    index = getattr(args, "sdk_index", None)
+    if index is None and getattr(args, "sdk_cache", True):
+        index = _resident_sdk_index
+    if index is None:
+        use_cache = getattr(args, "sdk_cache", True)
+        index = DirIndex(sdk_cache_path() if use_cache else None)
+    return index
+
+def version_key(version: str) -> tuple:
+    return tuple(int(x) for x in version.split("."))
+
+def discover_sdl(root: str, index: Optional[DirIndex] = None) -> dict:
+    """Ищет в root установленные SDL2/SDL2_image/SDL2_ttf/SDL2_mixer.
+
+    Возвращает {пакет: {"version", "dir", "include", "lib", "dll_dir"}};
+    при нескольких версиях берётся самая новая.
+    """
+    index = index or DirIndex()
+    canonical = {name.lower(): name for name in SDL_PACKAGES}
+    best = {}
+    for entry in index.listing(root) or []:
+        m = SDL_DIR_RE.match(entry)
+        if not m:
+            continue
+        package = canonical[m.group(1).lower()]
+        version = m.group(2)
+        if package not in best or version_key(version) > version_key(best[package][0]):
+            best[package] = (version, entry)
+
+    found = {}
+    for package, (version, entry) in sorted(best.items()):
+        base = str(Path(root, entry))
+        lib = str(Path(base, "lib", "x64"))
+        dll_dir = lib
+        # В VC-сборках SDL DLL лежат рядом с .lib; на всякий случай смотрим и bin\x64
+        if not index.glob(lib, "*.dll"):
+            bin_dir = str(Path(base, "bin", "x64"))
+            if index.glob(bin_dir, "*.dll"):
+                dll_dir = bin_dir
+        found[package] = {
+            "version": version,
+            "dir": base,
+            "include": str(Path(base, "include")),
+            "lib": lib,
+            "dll_dir": dll_dir,
+        }
+    return found
+
+def apply_discovered_sdl(args, found: dict, defaults: dict):
+    """Подставляет найденные пути в args там, где пользователь не задал свои."""
+    for package, prefix in SDL_PACKAGES.items():
+        info = found.get(package)
+        if not info:
+            continue
+        for suffix, key in (("inc", "include"), ("lib", "lib"), ("dll_dir", "dll_dir")):
+            attr = f"{prefix}_{suffix}"
+            if getattr(args, attr) == defaults.get(attr):
+                setattr(args, attr, info[key])
+        print(f"  sdl: {package} {info['version']} ({info['dir']})")
+
+def check_paths_and_files(
+    includes: list[str],
+    libdirs: list[str],
+    dll_dirs: list[str],
+    expected_libs: list[tuple[str, str]],
+    expected_dll_patterns: list[tuple[str, str]],
+    fail_on_missing: bool,
+    index: Optional[DirIndex] = None,
+    io_workers: int = 1,
+) -> None:
+    index = index or DirIndex()
+    if io_workers > 1:
+        # Все stat/scandir — одной пачкой; сами проверки ниже идут по кешу
+        # в прежнем порядке, так что вывод предупреждений не меняется
+        index.prefetch(
+            includes + libdirs + dll_dirs,
+            [base for base, _ in expected_libs] + [base for base, _ in expected_dll_patterns],
+            io_workers,
+        )
+    problems = []
+
+    for p in includes:
+        if not index.exists(p):
+            problems.append(f"[dir] include not found: {p}")
+    for p in libdirs:
+        if not index.exists(p):
+            problems.append(f"[dir] lib not found: {p}")
+    for p in dll_dirs:
+        if not index.exists(p):
+            problems.append(f"[dir] dll dir not found: {p}")
+
+    for base, fname in expected_libs:
+        if not index.has_file(base, fname):
+            msg = f"[lib] {fname} not found in: {base}"
+            if fname.endswith(STATIC_LIB_SUFFIX) and index.has_file(base, fname[:-len(STATIC_LIB_SUFFIX)] + ".lib"):
+                msg += " (there is only the DLL import library; --static needs a static SDL build)"
+            problems.append(msg)
+
+    for base, pattern in expected_dll_patterns:
+        if index.exists(base) and not index.glob(base, pattern):
+            problems.append(f"[dll] {pattern} not found in: {base}")
+
+    if problems:
+        print("\n=== CHECK WARNINGS ===")
+        for msg in problems:
+            print(" -", msg)
+        print("======================\n")
+        if fail_on_missing:
+            raise SystemExit("Missing required files/dirs. Aborting due to --fail-on-missing.")
+
+# ---- Импорты PE: какие DLL реально нужны ----
+
+def read_import_lib_dll(lib_path: Path) -> Optional[str]:
+    """Имя DLL из import-библиотеки (.lib, архив COFF): первый short import
+    object содержит "<символ>\\0<DLL>\\0". None — статическая библиотека."""
+    try:
+        data = lib_path.read_bytes()
+    except OSError:
+        return None
+    if not data.startswith(b"!<arch>\n"):
+        return None
+    pos = 8
+    while pos + 60 <= len(data):
+        try:
+            size = int(data[pos + 48:pos + 58].decode("ascii").strip())
+        except ValueError:
+            return None
+        body = data[pos + 60:pos + 60 + size]
+        # IMPORT_OBJECT_HEADER: Sig1 = 0, Sig2 = 0xFFFF, 20 байт
+        if len(body) > 20 and body[:4] == b"\0\0\xff\xff":
+            parts = body[20:].split(b"\0", 2)
+            if len(parts) >= 2 and parts[1]:
+                return parts[1].decode("ascii", "replace")
+        pos += 60 + size + (size & 1)
+    return None
+
+def pe_imports(path: Path) -> list[str]:
+    """Имена DLL из таблицы импорта и отложенного импорта PE-файла (PE32/PE32+)."""
+    data = path.read_bytes()
+    if data[:2] != b"MZ":
+        raise ValueError("not a PE file")
+    pe = struct.unpack_from("<I", data, 0x3C)[0]
+    if data[pe:pe + 4] != b"PE\0\0":
+        raise ValueError("no PE signature")
+    nsections, opt_size = struct.unpack_from("<H12xH", data, pe + 6)
+    opt = pe + 24
+    magic = struct.unpack_from("<H", data, opt)[0]
+    if magic == 0x20B:
+        image_base = struct.unpack_from("<Q", data, opt + 24)[0]
+        dirs = opt + 112
+    elif magic == 0x10B:
+        image_base = struct.unpack_from("<I", data, opt + 28)[0]
+        dirs = opt + 96
+    else:
+        raise ValueError(f"bad optional header magic {magic:#x}")
+    ndirs = struct.unpack_from("<I", data, dirs - 4)[0]
+    sections = [
+        struct.unpack_from("<8xIIII", data, opt + opt_size + i * 40)  # VirtualSize, VA, RawSize, RawPtr
+        for i in range(nsections)
+    ]
+
+    def offset(rva: int) -> int:
+        for vsize, va, raw_size, raw_ptr in sections:
+            if va <= rva < va + max(vsize, raw_size):
+                return rva - va + raw_ptr
+        raise ValueError(f"RVA {rva:#x} outside sections")
+
+    def cstr(rva: int) -> str:
+        at = offset(rva)
+        return data[at:data.index(b"\0", at)].decode("ascii", "replace")
+
+    def directory(index: int) -> tuple[int, int]:
+        return struct.unpack_from("<II", data, dirs + index * 8) if index < ndirs else (0, 0)
+
+    names = []
+    rva, size = directory(1)
+    if rva:
+        at = offset(rva)
+        # IMAGE_IMPORT_DESCRIPTOR, 20 байт, до нулевого
+        while True:
+            desc = struct.unpack_from("<IIIII", data, at)
+            if not any(desc):
+                break
+            names.append(cstr(desc[3]))
+            at += 20
+    rva, size = directory(13)
+    if rva:
+        at = offset(rva)
+        # ImgDelayDescr, 32 байта; Attributes = 0 — старый формат с VA вместо RVA
+        while True:
+            attrs, name = struct.unpack_from("<II", data, at)
+            if not name:
+                break
+            names.append(cstr(name if attrs & 1 else name - image_base))
+            at += 32
+    return names
+
+def ntpath_basename(path: str) -> str:
+    return path.replace("/", "\\").rsplit("\\", 1)[-1]
+
+# Разобранные импорты в резидентном процессе (serve): {входы: (mtime входов,
+# результат, mtime найденных DLL)}; любое изменение SDK сбрасывает запись
+_runtime_dll_cache: dict = {}
+
+def path_stamps(paths: list[str]) -> tuple:
+    stamps = []
+    for p in paths:
+        try:
+            stamps.append(os.stat(p).st_mtime_ns)
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+def resolve_runtime_dlls(
+    expected_libs: list[tuple[str, str]],
+    dll_dirs: list[str],
+) -> tuple[Optional[list[str]], list[str]]:
+    """DLL, которые реально загрузятся: DLL из import-библиотек (SDL2.lib -> SDL2.dll)
+    плюс их транзитивные импорты, найденные в dll_dirs (остальное — системные DLL).
+    Возвращает (пути или None, если что-то не удалось определить; пояснения)."""
+    key = (tuple(expected_libs), tuple(dll_dirs))
+    stamps = path_stamps(list(dll_dirs) + [os.path.join(base, lib) for base, lib in expected_libs])
+    cached = _runtime_dll_cache.get(key)
+    if cached is not None and cached[0] == stamps and path_stamps(cached[1][0] or []) == cached[2]:
+        found, notes = cached[1]
+        return (list(found) if found is not None else None), list(notes)
+    found, notes = scan_runtime_dlls(expected_libs, dll_dirs)
+    _runtime_dll_cache[key] = (stamps, (found, notes), path_stamps(found or []))
+    return (list(found) if found is not None else None), list(notes)
+
+def scan_runtime_dlls(
+    expected_libs: list[tuple[str, str]],
+    dll_dirs: list[str],
+) -> tuple[Optional[list[str]], list[str]]:
+    listing = {}
+    for d in dll_dirs:
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    if e.name.lower().endswith(".dll"):
+                        listing.setdefault(e.name.lower(), os.path.join(d, e.name))
+        except OSError:
+            continue
+
+    notes = []
+    queue = []
+    for base, lib in expected_libs:
+        dll = read_import_lib_dll(Path(base) / lib)
+        if dll is None:
+            if not (Path(base) / lib).exists():
+                notes.append(f"{lib} not found, cannot read its DLL name")
+                return None, notes
+            continue  # статическая (SDL2main.lib)
+        if dll.lower() not in listing:
+            notes.append(f"{dll} (from {lib}) not found in DLL dirs")
+            return None, notes
+        queue.append(dll.lower())
+
+    found = []
+    seen = set(queue)
+    while queue:
+        name = queue.pop(0)
+        path = listing[name]
+        found.append(path)
+        try:
+            imports = pe_imports(Path(path))
+        except (OSError, ValueError, struct.error) as e:
+            notes.append(f"cannot read imports of {path}: {e}")
+            return None, notes
+        for dep in imports:
+            key = dep.lower()
+            if key in listing and key not in seen:
+                seen.add(key)
+                queue.append(key)
+    return found, notes
+
+def build_config(full: bool, args) -> dict:
+    static = getattr(args, "static_link", False)
+
+    def lib(name: str) -> str:
+        return name + (STATIC_LIB_SUFFIX if static else ".lib")
+
+    includes = [args.sdl2_inc, args.sdl2img_inc]
+    libdirs  = [args.sdl2_lib, args.sdl2img_lib]
+    dll_dirs = [args.sdl2_dll_dir, args.sdl2img_dll_dir]
+
+    libs = [lib("SDL2"), "SDL2main.lib", lib("SDL2_image")]
+    headers = ["SDL.h", "SDL_image.h"]
+
+    expected_libs = [
+        (args.sdl2_lib, lib("SDL2")),
+        (args.sdl2_lib, "SDL2main.lib"),
+        (args.sdl2img_lib, lib("SDL2_image")),
+    ]
+    expected_dll_patterns = [
+        (args.sdl2_dll_dir, "SDL2.dll"),
+        (args.sdl2img_dll_dir, "SDL2_image*.dll"),
+    ]
+
+    if full:
+        includes += [args.sdl2ttf_inc, args.sdl2mixer_inc]
+        libdirs  += [args.sdl2ttf_lib, args.sdl2mixer_lib]
+        dll_dirs += [args.sdl2ttf_dll_dir, args.sdl2mixer_dll_dir]
+
+        libs += [lib("SDL2_ttf"), lib("SDL2_mixer")]
+        headers += ["SDL_ttf.h", "SDL_mixer.h"]
+
+        expected_libs += [
+            (args.sdl2ttf_lib, lib("SDL2_ttf")),
+            (args.sdl2mixer_lib, lib("SDL2_mixer")),
+        ]
+        expected_dll_patterns += [
+            (args.sdl2ttf_dll_dir, "SDL2_ttf*.dll"),
+            (args.sdl2mixer_dll_dir, "SDL2_mixer*.dll"),
+        ]
+
+    if static:
+        # DLL нет: ни папок, ни копирования
+        libs += STATIC_SYSTEM_LIBS
+        dll_dirs, expected_dll_patterns = [], []
+
+    # MSBuild <Copy> умеет wildcard'ы в Include
+    dll_globs = ";".join([f"{win_path(d)}\\*.dll" for d in dll_dirs])
+    # Точный список по таблицам импорта; не вышло (нет SDK и т.п.) — wildcard'ы
+    dlls, dll_notes = None, []
+    if not static and getattr(args, "dll_copy", "imports") == "imports":
+        dlls, dll_notes = resolve_runtime_dlls(expected_libs, dll_dirs)
+
+    return {
+        "includes": includes,
+        "libdirs": libdirs,
+        "dll_dirs": dll_dirs,
+        "libs": libs,
+        "headers": headers,
+        "expected_libs": expected_libs,
+        "expected_dll_patterns": expected_dll_patterns,
+        "dll_globs": dll_globs,
+        "dlls": dlls,
+        "dll_notes": dll_notes,
+        "static": static,
+    }
+
+def app_parts(project_name: str, spec: Optional["ProjectSpec"] = None) -> dict:
+    """Вставки в App (app.h/app.cpp) от варианта скелетона и включённых модулей."""
+    parts = {
+        "app_includes": [], "app_members": [], "app_init": [], "app_shutdown": [],
+        "app_methods": [], "app_frame": [],
+    }
+    game_loop = spec is not None and spec.skeleton == "game-loop"
+    if game_loop:
+        parts["app_includes"].append(f'#include "{project_name}/frame_profiler.h"\n')
+        parts["app_members"].append(APP_GAME_LOOP_MEMBERS)
+        parts["app_shutdown"].append(APP_GAME_LOOP_SHUTDOWN)
+        parts["app_methods"].append(APP_GAME_LOOP_METHODS.format(proj_name=project_name))
+    if spec is not None and spec.asset_pack:
+        parts["app_includes"].append(f'#include "{project_name}/asset_pack.h"\n')
+        parts["app_members"].append("    AssetPack assets_;\n")
+        parts["app_init"].append(APP_ASSET_PACK_INIT)
+        parts["app_shutdown"].append("    assets_.close();\n")
+    if spec is not None and spec.resource_cache:
+        source, note = (APP_RESOURCE_CACHE_PACK_SOURCE, APP_RESOURCE_CACHE_PACK_NOTE) if spec.asset_pack else ("", "")
+        parts["app_includes"].append(f'#include "{project_name}/resource_cache.h"\n')
+        parts["app_members"].append("    ResourceCache resources_;\n")
+        parts["app_init"].append(APP_RESOURCE_CACHE_INIT.format(budget_mb=spec.resource_cache, source=source, note=note))
+        # Потоки кеша читают assets_ и создают текстуры — останавливаем первыми
+        parts["app_shutdown"].insert(0, "    resources_.shutdown();\n")
+        parts["app_frame"].append("        resources_.pump();\n")
+    parts = {key: "".join(value) for key, value in parts.items()}
+    parts["app_run"] = (APP_RUN_GAME_LOOP if game_loop else APP_RUN_BASIC).format(app_frame=parts.pop("app_frame"))
+    return parts
+
+def render_skeleton(project_name: str, spec: Optional["ProjectSpec"] = None) -> dict:
+    parts = app_parts(project_name, spec)
+    files = {
+        f"include/{project_name}/app.h": APP_H.format(**parts),
+        "src/app.cpp": APP_CPP.format(proj_name=project_name, **parts),
+        "src/main.cpp": MAIN_CPP.format(proj_name=project_name),
+    }
+    if spec is not None and spec.skeleton == "game-loop":
+        files[f"include/{project_name}/frame_profiler.h"] = FRAME_PROFILER_H
+        files["src/frame_profiler.cpp"] = FRAME_PROFILER_CPP.format(proj_name=project_name)
+    return files
+
+def stable_guid(*parts: str) -> str:
+    return str(uuid.uuid5(GUID_NAMESPACE, "/".join(parts))).upper()
+
+def read_existing_guids(project_root: Path, project_name: str) -> dict:
+    """Достаёт GUID'ы из уже сгенерированных .sln/.vcxproj/.filters (если есть)."""
+    found = {}
+
+    def read(path: Path) -> str:
+        try:
+            return path.read_text(encoding="utf-8-sig")
+        except (OSError, UnicodeDecodeError):
+            return ""
+
+    sln = read(project_root / f"{project_name}.sln")
+    m = re.search(r"SolutionGuid\s*=\s*" + GUID_RE, sln)
+    if m:
+        found["sln"] = m.group(1).upper()
+    m = re.search(r'"' + re.escape(project_name) + r'\.vcxproj",\s*"' + GUID_RE + '"', sln)
+    if m:
+        found["proj"] = m.group(1).upper()
+
+    vcx = read(project_root / f"{project_name}.vcxproj")
+    m = re.search(r"<ProjectGuid>" + GUID_RE + "</ProjectGuid>", vcx)
+    if m:
+        # .vcxproj главнее: именно его GUID видит MSBuild
+        found["proj"] = m.group(1).upper()
+
+    filters = read(project_root / f"{project_name}.vcxproj.filters")
+    for m in re.finditer(r'<Filter Include="([^"]+)">\s*<UniqueIdentifier>' + GUID_RE, filters):
+        # Прочие фильтры (Unity Files, подпапки) — под ключом "filter:<имя>"
+        key = FILTER_GUID_KEYS.get(m.group(1), "filter:" + m.group(1))
+        found[key] = m.group(2).upper()
+    return found
+
+def project_guids(project_name: str, project_root: Optional[Path] = None) -> dict:
+    """GUID'ы проекта: берём из существующих файлов, иначе uuid5 от имени проекта."""
+    guids = {
+        "sln": stable_guid(project_name, "solution"),
+        "proj": stable_guid(project_name, "project"),
+        "source": stable_guid(project_name, "filter", "Source Files"),
+        "header": stable_guid(project_name, "filter", "Header Files"),
+        "asset": stable_guid(project_name, "filter", "Asset Files"),
+    }
+    if project_root is not None:
+        guids.update(read_existing_guids(project_root, project_name))
+    return guids
+
+def render_solution(
+    sln_guid: str,
+    projects: list[tuple[str, str, str]],
+    configs: list[str] = CONFIGURATIONS,
+) -> str:
+    """projects: [(имя, путь к .vcxproj относительно .sln, GUID проекта)]"""
+    return SLN_TEMPLATE.format(
+        sln_guid=sln_guid,
+        solution_configs="".join(f"        {c}|x64 = {c}|x64\n" for c in configs),
+        projects="".join(
+            SLN_PROJECT.format(proj_name=name, proj_path=path, proj_guid=guid)
+            for name, path, guid in projects
+        ),
+        project_configs="".join(
+            SLN_PROJECT_CONFIGS.format(proj_guid=guid, config=c)
+            for _, _, guid in projects
+            for c in configs
+        ),
+    )
+
+@dataclass
+class ProjectItem:
+    """Элемент .vcxproj: ClCompile / ClInclude / None."""
+    kind: str
+    path: str                                     # относительно проекта, через \\
+    metadata: dict = field(default_factory=dict)  # доп. метаданные элемента
+    filter: Optional[str] = None                  # None — по kind (FILTER_FOR_KIND)
+
+FILTER_FOR_KIND = {"ClCompile": "Source Files", "ClInclude": "Header Files", "None": "Asset Files"}
+
+def xml_attr(value: str) -> str:
+    return xml_escape(value, {'"': "&quot;"})
+
+def win_path(rel: str) -> str:
+    return rel.replace("/", "\\")
+
+def path_hash(path: str) -> int:
+    return int.from_bytes(hashlib.sha1(path.lower().encode("utf-8")).digest()[:4], "little")
+
+def plan_unity(sources: list[str], batch_size: int) -> list[tuple[str, list[str]]]:
+    """Делит .cpp (пути через \\) на пачки: [(rel unity-файла через /, [пути])].
+
+    Набрав min_len = ceil(N/2) файлов, пачка закрывается после файла, у которого
+    hash(путь) % period == 0, где period = N - min_len + 1 (но не длиннее 2*N):
+    длина пачки — min_len - 1 плюс геометрическое с средним period, в среднем N.
+    Границы определяются самими файлами, поэтому вставка или удаление файла
+    меняет свою пачку и изредка пару соседних, а не сдвигает все.
+    Имя пачки — по хешу первого файла, чтобы не зависеть от номера.
+    """
+    batch_size = max(1, batch_size)
+    min_len = (batch_size + 1) // 2
+    period = batch_size - min_len + 1
+    batches = []
+    current = []
+    for path in sorted(sources, key=str.lower):
+        current.append(path)
+        boundary = len(current) >= min_len and path_hash(path) % period == 0
+        if boundary or len(current) >= 2 * batch_size:
+            batches.append(current)
+            current = []
+    if current:
+        batches.append(current)
+    return [
+        (f"{UNITY_DIR}/unity_{path_hash(batch[0]):08x}.cpp", batch)
+        for batch in batches
+    ]
+
+def unity_sources(items: list[ProjectItem]) -> list[str]:
+    """ClCompile, которые можно склеивать (без pch.cpp с PrecompiledHeader=Create)."""
+    return [
+        item.path for item in items
+        if item.kind == "ClCompile"
+        and item.path.lower().endswith(CPP_EXTENSIONS)
+        and "PrecompiledHeader" not in item.metadata
+    ]
+
+def unity_configs(spec: "ProjectSpec") -> list[str]:
+    configs = project_configs(spec)
+    if spec.unity_configs is None:
+        return configs
+    return [c for c in configs if c in spec.unity_configs]
+
+def excluded_in(configs: list[str], all_configs: list[str]) -> dict:
+    """Метаданные ExcludedFromBuild для конфигураций configs."""
+    if not configs:
+        return {}
+    if configs == all_configs:
+        return {"ExcludedFromBuild": "true"}
+    return {
+        "ExcludedFromBuild " + VCXPROJ_CONDITION.format(config=c): "true"
+        for c in configs
+    }
+
+def project_items(project_name: str, spec: "ProjectSpec") -> list[ProjectItem]:
+    items = [
+        ProjectItem("ClCompile", "src\\main.cpp"),
+        ProjectItem("ClCompile", "src\\app.cpp"),
+        ProjectItem("ClInclude", f"include\\{project_name}\\app.h"),
+        ProjectItem("None", "assets\\.keep"),
+    ]
+    if spec.skeleton == "game-loop":
+        items.append(ProjectItem("ClCompile", "src\\frame_profiler.cpp"))
+        items.append(ProjectItem("ClInclude", f"include\\{project_name}\\frame_profiler.h"))
+    if spec.asset_pack:
+        items.append(ProjectItem("ClCompile", "src\\asset_pack.cpp"))
+        items.append(ProjectItem("ClInclude", f"include\\{project_name}\\asset_pack.h"))
+    if spec.resource_cache:
+        items.append(ProjectItem("ClCompile", "src\\resource_cache.cpp"))
+        items.append(ProjectItem("ClInclude", f"include\\{project_name}\\resource_cache.h"))
+    if spec.atlas:
+        items.append(ProjectItem("ClInclude", f"include\\{project_name}\\sprite_atlas.h"))
+    if spec.pch:
+        items.append(ProjectItem("ClCompile", "src\\pch.cpp", {"PrecompiledHeader": "Create"}))
+        items.append(ProjectItem("ClInclude", f"include\\{project_name}\\pch.h"))
+
+    known = {item.path.lower() for item in items}
+    for rel in sorted(spec.extra_files, key=str.lower):
+        path = win_path(rel)
+        if path.lower() not in known:
+            known.add(path.lower())
+            kind = classify_file(rel)
+            items.append(ProjectItem(kind, path, filter=item_filter(project_name, kind, rel)))
+    return add_unity_items(items, spec)
+
+def add_unity_items(items: list[ProjectItem], spec: "ProjectSpec") -> list[ProjectItem]:
+    """--unity: исключает .cpp из сборки там, где она включена, и добавляет unity-пачки."""
+    if spec.unity:
+        all_configs = project_configs(spec)
+        on = unity_configs(spec)
+        off = [c for c in all_configs if c not in on]
+        members = set(unity_sources(items))
+        # Оригиналы остаются в проекте (и в фильтрах), но не компилируются там,
+        # где включена unity-сборка; unity-файлы — наоборот
+        for item in items:
+            if item.path in members:
+                item.metadata.update(excluded_in(on, all_configs))
+        for rel, _ in plan_unity(sorted(members), spec.unity):
+            items.append(ProjectItem("ClCompile", win_path(rel), excluded_in(off, all_configs), UNITY_FILTER))
+    return items
+
+def render_unity_file(batch: list[str], batch_size: int) -> str:
+    lines = [f"// Unity-сборка (--unity {batch_size}): сгенерировано VS_build.py, не редактировать.\n"]
+    lines += [f'#include "../{path.replace(chr(92), "/")}"\n' for path in batch]
+    return "".join(lines)
+
+def render_unity(items: list[ProjectItem], spec: "ProjectSpec") -> dict:
+    return {
+        rel: render_unity_file(batch, spec.unity)
+        for rel, batch in plan_unity(unity_sources([i for i in items if i.filter != UNITY_FILTER]), spec.unity)
+    }
+
+def classify_file(rel: str) -> str:
+    """Тип элемента .vcxproj по пути (через /)."""
+    lower = rel.lower()
+    if lower.startswith("src/") and lower.endswith(SOURCE_EXTENSIONS):
+        return "ClCompile"
+    if lower.startswith(("src/", "include/")) and lower.endswith(HEADER_EXTENSIONS):
+        return "ClInclude"
+    return "None"
+
+def item_filter(project_name: str, kind: str, rel: str) -> Optional[str]:
+    """Фильтр, повторяющий структуру папок: src/render/gl.cpp -> "Source Files\\render".
+    Для include/<Project>/ префикс <Project> опускается. None — корневой фильтр."""
+    parts = rel.split("/")[:-1]
+    top = parts[0] if parts else ""
+    sub = parts[1:]
+    if top == "include" and sub and sub[0].lower() == project_name.lower():
+        sub = sub[1:]
+    if not sub:
+        return None
+    return "\\".join([FILTER_FOR_KIND[kind]] + sub)
+
+def scan_project_files(project_root: Path) -> list[str]:
+    """Все файлы src/include/assets существующего проекта: ["src/a.cpp", ...]."""
+    files = []
+    for top in SCAN_DIRS:
+        files += [rel for rel, _ in walk_files(project_root / top, top, SCAN_IGNORE)]
+    return files
+
+def render_vcx_item(item: ProjectItem) -> str:
+    kind = item.kind
+    if not item.metadata:
+        return f'    <{kind} Include="{xml_attr(item.path)}" />\n'
+    out = [f'    <{kind} Include="{xml_attr(item.path)}">\n']
+    for key, value in item.metadata.items():
+        # key может содержать атрибуты: 'ExcludedFromBuild Condition="..."'
+        tag = key.split(" ", 1)[0]
+        out.append(f"      <{key}>{xml_escape(str(value))}</{tag}>\n")
+    out.append(f"    </{kind}>\n")
+    return "".join(out)
+
+def render_vcx_items(items: list[ProjectItem], kind: str) -> str:
+    return "".join(render_vcx_item(item) for item in items if item.kind == kind)
+
+def render_filter_item(item: ProjectItem) -> str:
+    return (
+        f'    <{item.kind} Include="{xml_attr(item.path)}">\n'
+        f"      <Filter>{xml_escape(item.filter or FILTER_FOR_KIND[item.kind])}</Filter>\n"
+        f"    </{item.kind}>\n"
+    )
+
+def render_filter_items(items: list[ProjectItem], kind: str) -> str:
+    return "".join(render_filter_item(item) for item in items if item.kind == kind)
+
+def filter_names(items: list[ProjectItem]) -> list[str]:
+    """Фильтры помимо стандартных трёх (Unity Files, подпапки), с родительскими."""
+    names = set()
+    for item in items:
+        parts = (item.filter or "").split("\\")
+        # Вложенному фильтру нужны все родительские
+        for i in range(2, len(parts) + 1):
+            names.add("\\".join(parts[:i]))
+        if item.filter and item.filter not in FILTER_GUID_KEYS:
+            names.add(item.filter)
+    return sorted(names, key=str.lower)
+
+def render_filter_def(project_name: str, name: str, guids: dict) -> str:
+    guid = guids.get("filter:" + name) or stable_guid(project_name, "filter", name)
+    return (
+        f'    <Filter Include="{xml_attr(name)}">\n'
+        f"      <UniqueIdentifier>{{{guid}}}</UniqueIdentifier>\n"
+        f"    </Filter>\n"
+    )
+
+def render_extra_filters(project_name: str, items: list[ProjectItem], guids: dict) -> str:
+    """Определения фильтров помимо стандартных трёх (Unity Files, подпапки)."""
+    return "".join(render_filter_def(project_name, name, guids) for name in filter_names(items))
+
+def render_copy_dlls(cfg: dict) -> str:
+    if cfg.get("static"):
+        return ""
+    dlls = cfg.get("dlls")
+    if not dlls:
+        return COPY_DLLS_GLOB_TARGET.format(dll_globs=cfg["dll_globs"])
+    dlls = [win_path(p) for p in dlls]
+    names = [ntpath_basename(p) for p in dlls]
+    return COPY_DLLS_LIST_TARGET.format(
+        dll_inputs=xml_attr(";".join(dlls)),
+        dll_outputs=xml_attr(";".join(f"$(OutDir){n}" for n in names)),
+        dll_items="".join(f'      <SdlDlls Include="{xml_attr(p)}" />\n' for p in dlls),
+    )
+
+def render_extra_targets(spec: "ProjectSpec") -> str:
+    out = []
+    if spec.atlas:
+        out.append(ATLAS_TARGET.format(max_size=spec.atlas_max_size))
+    if spec.asset_pack:
+        pack_args = " --compress" if spec.asset_pack == "deflate" else ""
+        collect_depends = exclude_items = ""
+        if spec.atlas:
+            # В архив идут готовые атласы, а не исходные спрайты
+            pack_args += f" --exclude {ATLAS_SPRITES_DIR}"
+            collect_depends = ' DependsOnTargets="BuildAtlases"'
+            exclude_items = f";$(ProjectDir)assets\\{ATLAS_SPRITES_DIR}\\**"
+        out.append(ASSET_PACK_TARGET.format(
+            pack_args=pack_args, collect_depends=collect_depends, exclude_items=exclude_items,
+        ))
+    return "".join(out)
+
+def asset_tool_bytes() -> bytes:
+    """vsb_assets.py как есть — копия для tools/ проекта."""
+    path = Path(vsb_assets.__file__)
+    if path.suffix != ".py":
+        raise SystemExit(f"vsb_assets.py source is required for --asset-pack/--atlas, found only {path}")
+    return path.read_bytes()
+
+def render_asset_pack(project_name: str) -> dict:
+    return {
+        f"include/{project_name}/asset_pack.h": ASSET_PACK_H,
+        "src/asset_pack.cpp": ASSET_PACK_CPP.format(proj_name=project_name),
+    }
+
+def render_pch(project_name: str, cfg: dict) -> dict:
+    return {
+        f"include/{project_name}/pch.h": PCH_H.format(
+            sdl_includes="".join(f"#include <{h}>\n" for h in cfg["headers"]),
+            std_includes="".join(f"#include <{h}>\n" for h in PCH_STD_HEADERS),
+        ),
+        "src/pch.cpp": PCH_CPP.format(proj_name=project_name),
+    }
+
+def project_configs(spec: "ProjectSpec") -> list[str]:
+    return CONFIGURATIONS + ([PROFILE_CONFIG] if spec.profile_config else [])
+
+def config_settings(project_name: str, spec: "ProjectSpec", cfg: dict, config: str) -> dict:
+    """Итоговые настройки конфигурации: база + Profile + static + профиль сборки + PCH."""
+    base = CONFIG_SETTINGS["Debug" if config == "Debug" else "Release"]
+    settings = {key: dict(values) for key, values in base.items()}
+
+    def apply(overrides: dict):
+        for key, values in overrides.items():
+            settings[key].update(values)
+
+    if config == PROFILE_CONFIG:
+        apply(PROFILE_CONFIG_OVERRIDES)
+    if spec.static_link:
+        # До профиля: fast-iterate/balanced сознательно выключают LTCG (WPO и /LTCG)
+        apply(STATIC_LINK_OVERRIDES.get("debug" if config == "Debug" else "release", {}))
+    if spec.build_profile:
+        profile = BUILD_PROFILES[spec.build_profile]
+        apply(profile.get("all", {}))
+        if config == PROFILE_CONFIG and "profile" in profile:
+            apply(profile["profile"])
+        else:
+            apply(profile.get("debug" if config == "Debug" else "release", {}))
+    if config == PROFILE_CONFIG:
+        # /PROFILE несовместим с инкрементальной линковкой и /DEBUG:FASTLINK —
+        # профиль сборки их не переопределяет
+        apply({key: PROFILE_CONFIG_OVERRIDES[key] for key in ("link", "vars")})
+    if settings["props"].get("WholeProgramOptimization") != "true":
+        # /LTCG линкера без /GL (--static с fast-iterate/balanced) — LNK4075 и лишний проход
+        settings["link"].pop("LinkTimeCodeGeneration", None)
+    if spec.pch:
+        pch = f"{project_name}/pch.h"
+        settings["cl"].update({
+            "PrecompiledHeader": "Use",
+            "PrecompiledHeaderFile": pch,
+            "ForcedIncludeFiles": f"{pch};%(ForcedIncludeFiles)",
+        })
+
+    values = {
+        "includes": ";".join(win_path(d) for d in cfg["includes"]),
+        "libdirs": ";".join(win_path(d) for d in cfg["libdirs"]),
+        "libs": ";".join(cfg["libs"]),
+    }
+    for group in ("cl", "link"):
+        for key, value in settings[group].items():
+            settings[group][key] = value.replace("{includes}", values["includes"]) \
+                .replace("{libdirs}", values["libdirs"]).replace("{libs}", values["libs"])
+    return settings
+
+def render_properties(props: dict, indent: str) -> str:
+    return "".join(f"{indent}<{key}>{value}</{key}>\n" for key, value in props.items())
+
+def render_configurations(project_name: str, spec: "ProjectSpec", cfg: dict) -> dict:
+    """Поконфигурационные куски .vcxproj (подставляются в VCXPROJ_TEMPLATE)."""
+    parts = {
+        "project_configurations": "",
+        "configuration_props": "",
+        "property_sheets": "",
+        "config_properties": "",
+        "item_definitions": "",
+    }
+    for config in project_configs(spec):
+        settings = config_settings(project_name, spec, cfg, config)
+        cond = VCXPROJ_CONDITION.format(config=config)
+        parts["project_configurations"] += VCXPROJ_CONFIGURATION.format(config=config)
+        parts["configuration_props"] += (
+            f'  <PropertyGroup {cond} Label="Configuration">\n'
+            + render_properties(settings["props"], "    ")
+            + "  </PropertyGroup>\n\n"
+        )
+        parts["property_sheets"] += VCXPROJ_PROPERTY_SHEETS.format(config=config)
+        if settings["vars"]:
+            parts["config_properties"] += (
+                f"  <PropertyGroup {cond}>\n"
+                + render_properties(settings["vars"], "    ")
+                + "  </PropertyGroup>\n\n"
+            )
+        parts["item_definitions"] += (
+            f"  <ItemDefinitionGroup {cond}>\n"
+            "    <ClCompile>\n"
+            + render_properties(settings["cl"], "      ")
+            + "    </ClCompile>\n"
+            "    <Link>\n"
+            + render_properties(settings["link"], "      ")
+            + "    </Link>\n"
+            "  </ItemDefinitionGroup>\n\n"
+        )
+    return parts
+
+def render_project_files(
+    project_name: str,
+    cfg: dict,
+    guids: Optional[dict] = None,
+    spec: Optional["ProjectSpec"] = None,
+) -> dict:
+    """Рендерит все текстовые файлы проекта в память: {rel_path: text}."""
+    if guids is None:
+        guids = project_guids(project_name)
+    if spec is None:
+        spec = ProjectSpec(project_name)
+    items = project_items(project_name, spec)
+
+    files = render_skeleton(project_name, spec)
+    if spec.asset_pack:
+        files.update(render_asset_pack(project_name))
+    if spec.resource_cache:
+        files[f"include/{project_name}/resource_cache.h"] = RESOURCE_CACHE_H
+        files["src/resource_cache.cpp"] = RESOURCE_CACHE_CPP.format(proj_name=project_name)
+    if spec.atlas:
+        files[f"include/{project_name}/sprite_atlas.h"] = SPRITE_ATLAS_H
+    if spec.pch:
+        files.update(render_pch(project_name, cfg))
+    for backend in spec.backends:
+        files.update(BACKENDS[backend](project_name, cfg, guids, spec, items))
+    return files
+
+def render_msbuild(project_name: str, cfg: dict, guids: dict, spec: "ProjectSpec", items: list[ProjectItem]) -> dict:
+    """.sln + .vcxproj + .filters (+ unity-пачки)."""
+    sln_text = render_solution(
+        guids["sln"], [(project_name, f"{project_name}.vcxproj", guids["proj"])], project_configs(spec)
+    )
+
+    vcx_text = VCXPROJ_TEMPLATE.format(
+        proj_guid=guids["proj"],
+        proj_name=project_name,
+        copy_dlls_target=render_copy_dlls(cfg),
+        extra_targets=render_extra_targets(spec),
+        **render_configurations(project_name, spec, cfg),
+        compile_items=render_vcx_items(items, "ClCompile"),
+        include_items=render_vcx_items(items, "ClInclude"),
+        none_items=render_vcx_items(items, "None"),
+    )
+
+    filters_text = VCXPROJ_FILTERS.format(
+        proj_name=project_name,
+        SOURCE_GUID="{" + guids["source"] + "}",
+        HEADER_GUID="{" + guids["header"] + "}",
+        ASSET_GUID="{" + guids["asset"] + "}",
+        extra_filters=render_extra_filters(project_name, items, guids),
+        compile_items=render_filter_items(items, "ClCompile"),
+        include_items=render_filter_items(items, "ClInclude"),
+        none_items=render_filter_items(items, "None"),
+    )
+
+    files = {}
+    if spec.unity:
+        files.update(render_unity(items, spec))
+    files[f"{project_name}.sln"] = sln_text
+    files[f"{project_name}.vcxproj"] = vcx_text
+    files[f"{project_name}.vcxproj.filters"] = filters_text
+    return files
+
+def cmake_arg(value: str) -> str:
+    value = value.replace("\\", "/")
+    if re.fullmatch(r"[\w./:+-]+", value):
+        return value
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"').replace("$", "\\$") + '"'
+
+def cmake_list(values: list[str], indent: str = "    ") -> str:
+    return "".join(f"{indent}{cmake_arg(v)}\n" for v in values)
+
+def render_cmake(project_name: str, cfg: dict, guids: dict, spec: "ProjectSpec", items: list[ProjectItem]) -> dict:
+    """CMakeLists.txt + CMakePresets.json (Ninja) по той же модели проекта."""
+    # Свои unity-файлы и pch.cpp (Create) CMake не нужны: у него UNITY_BUILD и
+    # target_precompile_headers
+    sources = [
+        item.path.replace("\\", "/") for item in items
+        if item.kind == "ClCompile"
+        and not item.path.startswith(UNITY_DIR + "\\")
+        and "PrecompiledHeader" not in item.metadata
+    ]
+    headers = [item.path.replace("\\", "/") for item in items if item.kind == "ClInclude"]
+    languages = "C CXX" if any(p.lower().endswith(".c") for p in sources) else "CXX"
+
+    copy_dlls = ""
+    if not cfg.get("static"):
+        if cfg.get("dlls"):
+            dll_list = "set(VSB_SDL_DLLS " + " ".join(cmake_arg(p) for p in cfg["dlls"]) + ")"
+        else:
+            dll_list = "file(GLOB VSB_SDL_DLLS " + " ".join(cmake_arg(f"{d}/*.dll") for d in cfg["dll_dirs"]) + ")"
+        copy_dlls = CMAKE_COPY_DLLS.format(proj_name=project_name, dll_list=dll_list)
+
+    extras = []
+    if spec.pch:
+        extras.append(CMAKE_PCH.format(proj_name=project_name))
+    if spec.unity:
+        members = unity_sources([i for i in items if i.filter != UNITY_FILTER])
+        groups = "".join(
+            f"    set_source_files_properties({' '.join(cmake_arg(p) for p in batch)}"
+            f" PROPERTIES UNITY_GROUP {Path(rel).stem})\n"
+            for rel, batch in plan_unity(members, spec.unity)
+        )
+        extras.append(CMAKE_UNITY.format(proj_name=project_name, groups=groups))
+    if spec.build_profile not in ("fast-iterate", "balanced"):
+        extras.append(CMAKE_IPO.format(proj_name=project_name))
+    if spec.asset_pack:
+        pack_args = " --compress" if spec.asset_pack == "deflate" else ""
+        exclude_regex = "/\\\\.[^/]*$"
+        atlas = pack_depends = ""
+        if spec.atlas:
+            atlas = CMAKE_ATLAS.format(max_size=spec.atlas_max_size)
+            pack_args += f" --exclude {ATLAS_SPRITES_DIR}"
+            pack_depends = ' "${CMAKE_CURRENT_BINARY_DIR}/atlas.stamp"'
+            exclude_regex = f"/assets/{ATLAS_SPRITES_DIR}/|" + exclude_regex
+        extras.append(CMAKE_ASSETS.format(
+            proj_name=project_name, atlas=atlas, exclude_regex=exclude_regex,
+            pack_args=pack_args, pack_depends=pack_depends,
+        ))
+    elif spec.atlas:
+        extras.append(
+            "\nfind_package(Python3 COMPONENTS Interpreter REQUIRED)\n"
+            'set(VSB_TOOL "${CMAKE_CURRENT_SOURCE_DIR}/tools/vsb_assets.py")\n'
+            + CMAKE_ATLAS.format(max_size=spec.atlas_max_size)
+            + f'add_custom_target({project_name}_atlases ALL DEPENDS "${{CMAKE_CURRENT_BINARY_DIR}}/atlas.stamp")\n'
+        )
+
+    cmake_text = CMAKE_TEMPLATE.format(
+        cmake_min="3.18" if spec.unity else "3.16",
+        proj_name=project_name,
+        languages=languages,
+        unity_default="ON" if spec.unity else "OFF",
+        sources=cmake_list(sources),
+        headers=cmake_list(headers),
+        win_includes=cmake_list(cfg["includes"], "        "),
+        win_libdirs=cmake_list(cfg["libdirs"], "        "),
+        win_libs=" ".join(cmake_arg(lib[:-4] if lib.lower().endswith(".lib") else lib) for lib in cfg["libs"]),
+        copy_dlls=copy_dlls,
+        pkg_modules=" ".join(SDL_PKG_MODULES[h] for h in cfg["headers"]),
+        extras="".join(extras),
+    )
+
+    unity_on = set(unity_configs(spec)) if spec.unity else set()
+    configure, build = [
+        {
+            "name": "ninja-base",
+            "hidden": True,
+            "generator": "Ninja",
+            "binaryDir": "${sourceDir}/build/${presetName}",
+        }
+    ], []
+    for config in project_configs(spec):
+        variables = {"CMAKE_BUILD_TYPE": CMAKE_BUILD_TYPES[config]}
+        if spec.unity:
+            variables["VSB_UNITY"] = "ON" if config in unity_on else "OFF"
+        if config == PROFILE_CONFIG:
+            variables["VSB_PROFILE_BUILD"] = "ON"
+        name = config.lower()
+        configure.append({"name": name, "inherits": "ninja-base", "cacheVariables": variables})
+        build.append({"name": name, "configurePreset": name})
+    presets = {
+        "version": 3,
+        "cmakeMinimumRequired": {"major": 3, "minor": 21, "patch": 0},
+        "configurePresets": configure,
+        "buildPresets": build,
+    }
+    return {
+        "CMakeLists.txt": cmake_text,
+        "CMakePresets.json": json.dumps(presets, indent=2) + "\n",
+    }
+
+# Бэкенды сборки: имя -> рендер файлов по общей модели проекта (project_items)
+BACKENDS = {
+    "msbuild": render_msbuild,
+    "cmake": render_cmake,
+}
+def parse_backends(value: str) -> list[str]:
+    names = [x.strip().lower() for x in value.split(",") if x.strip()]
+    unknown = [n for n in names if n not in BACKENDS]
+    if unknown or not names:
+        raise argparse.ArgumentTypeError(f"unknown backend: {', '.join(unknown) or value!r} (known: {', '.join(BACKENDS)})")
+    return sorted(set(names), key=list(BACKENDS).index)
+
+def render_cmake_root(name: str, projects: list[str]) -> str:
+    """Общий CMakeLists.txt пакетного режима (аналог общего .sln)."""
+    lines = [
+        "# Сгенерировано VS_build.py (--batch --backend cmake).\n",
+        "cmake_minimum_required(VERSION 3.16)\n",
+        f"project({name} LANGUAGES CXX)\n\n",
+    ]
+    lines += [f"add_subdirectory({cmake_arg(p)})\n" for p in projects]
+    return "".join(lines)
+
+# Файлы бэкенда, которые переписывает sync (unity/ — у msbuild — отдельно)
+BACKEND_SYNC_FILES = {
+    "msbuild": lambda name: [f"{name}.vcxproj", f"{name}.vcxproj.filters"],
+    "cmake": lambda name: ["CMakeLists.txt"],
+}
+
+# ---- Библиотечный API ----
+#
+#   spec = ProjectSpec("Game", full=True)
+#   rendered = render(spec)                  # ничего не пишет на диск
+#   rendered.files["src/main.cpp"]           # bytes
+#   materialize(rendered, r"D:\Code\Again")  # запись (с --incremental-логикой)
+
+@dataclass
+class ProjectSpec:
+    """Входные параметры проекта (то же, что флаги командной строки)."""
+    name: str
+    full: bool = False
+
+    sdl2_inc: str = SDL2_INCLUDE
+    sdl2_lib: str = SDL2_LIB_X64
+    sdl2img_inc: str = SDL2_IMAGE_INCLUDE
+    sdl2img_lib: str = SDL2_IMAGE_LIB_X64
+    sdl2_dll_dir: str = SDL2_DLL_DIR
+    sdl2img_dll_dir: str = SDL2_IMAGE_DLL_DIR
+
+    sdl2ttf_inc: str = SDL2_TTF_INCLUDE
+    sdl2ttf_lib: str = SDL2_TTF_LIB_X64
+    sdl2ttf_dll_dir: str = SDL2_TTF_DLL_DIR
+    sdl2mixer_inc: str = SDL2_MIXER_INCLUDE
+    sdl2mixer_lib: str = SDL2_MIXER_LIB_X64
+    sdl2mixer_dll_dir: str = SDL2_MIXER_DLL_DIR
+
+    # None — dotFiles не копируются
+    dotfiles_dir: Optional[str] = DOTFILES_DIR
+    # Какие dotFiles брать (файлы/папки, "*" — все); None — DOTFILES
+    dotfiles: Optional[list[str]] = None
+
+    # Предкомпилированный заголовок include\<Project>\pch.h + src\pch.cpp
+    pch: bool = False
+    # Профиль скорости сборки (BUILD_PROFILES); None — настройки по умолчанию
+    build_profile: Optional[str] = None
+    # Вариант скелетона (SKELETONS): "basic" — цикл под VSync, "game-loop" —
+    # фиксированный шаг логики + FrameProfiler
+    skeleton: str = "basic"
+    # Доп. конфигурация Profile|x64 (оптимизация + PDB + /PROFILE)
+    profile_config: bool = False
+    # Unity-сборка: средний размер пачки (0 — выключена) и конфигурации,
+    # где она включена (None — все)
+    unity: int = 0
+    unity_configs: Optional[list[str]] = None
+    # Архив ассетов assets.pak + AssetPack в скелетоне: None, "store" или
+    # "deflate" (сжимать записи, где это выгодно)
+    asset_pack: Optional[str] = None
+    # Атласы assets/sprites/<атлас>/*.png -> assets/atlases/ + SpriteAtlas в скелетоне
+    atlas: bool = False
+    atlas_max_size: int = 2048
+    # ResourceCache в скелетоне (асинхронная загрузка текстур, LRU): бюджет
+    # памяти текстур в МБ, 0 — выключен
+    resource_cache: int = 0
+    # Статическая линковка SDL (<lib>-static.lib, без DLL и CopySdlDlls, LTCG)
+    static_link: bool = False
+    # DLL для CopySdlDlls: "imports" — только нужные по таблицам импорта,
+    # "glob" — все *.dll из папок SDK
+    dll_copy: str = "imports"
+    # Бэкенды сборки (BACKENDS): "msbuild" — .sln/.vcxproj, "cmake" —
+    # CMakeLists.txt + CMakePresets.json (Ninja); можно оба
+    backends: list[str] = field(default_factory=lambda: ["msbuild"])
+    # Доп. файлы проекта (пути через /, от корня проекта: src/, include/,
+    # assets/), помимо скелетона; тип элемента — по расширению
+    extra_files: list[str] = field(default_factory=list)
+    # None — GUID'ы через uuid5 от имени проекта
+    guids: Optional[dict] = None
+
+    @classmethod
+    def from_args(cls, project_name: str, args) -> "ProjectSpec":
+        kwargs = {
+            name: getattr(args, name)
+            for name in cls.__dataclass_fields__
+            if name not in ("name", "guids") and hasattr(args, name)
+        }
+        return cls(name=project_name, **kwargs)
+
+    # Не сохраняются в .vsbuild/project.json: GUID'ы читаются из самих
+    # файлов проекта, а список файлов — сканированием
+    _TRANSIENT = ("guids", "extra_files")
+
+    def to_json(self) -> str:
+        data = {
+            name: getattr(self, name)
+            for name in self.__dataclass_fields__
+            if name not in self._TRANSIENT
+        }
+        return json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+
+    @classmethod
+    def from_json(cls, text: str) -> "ProjectSpec":
+        data = json.loads(text)
+        if not isinstance(data, dict) or "name" not in data:
+            raise ValueError("not a project spec")
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__ and k not in cls._TRANSIENT})
+
+@dataclass
+class RenderedProject:
+    """Отрендеренный проект: {относительный путь (через /): байты} + метаданные."""
+    spec: ProjectSpec
+    files: dict[str, bytes]
+    guids: dict
+    config: dict
+    # Файлы, которые копируются (dotFiles): rel -> исходный путь
+    sources: dict[str, Path] = field(default_factory=dict)
+    warnings: list[str] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return self.spec.name
+
+    @property
+    def sln_path(self) -> str:
+        return f"{self.spec.name}.sln"
+
+    @property
+    def vcxproj_path(self) -> str:
+        return f"{self.spec.name}.vcxproj"
+
+def read_dotfiles(found: list[tuple[str, Path]], io_workers: int = 1) -> list[tuple[str, Path, bytes]]:
+    datas = parallel_map(Path.read_bytes, [src for _, src in found], io_workers)
+    for data in datas:
+        fs_op("read", len(data))
+    return [(fname, src, data) for (fname, src), data in zip(found, datas)]
+
+def load_dotfiles(
+    dotfiles_dir: str,
+    io_workers: int = 1,
+    names: Optional[list[str]] = None,
+) -> tuple[list[tuple[str, Path, bytes]], list[str]]:
+    found, problems = scan_dotfiles(dotfiles_dir, io_workers, names)
+    return read_dotfiles(found, io_workers), problems
+
+def render(
+    spec: ProjectSpec,
+    config: Optional[dict] = None,
+    dotfiles: Optional[list[tuple[str, Path, bytes]]] = None,
+) -> RenderedProject:
+    """Рендерит проект целиком в память. SDK не проверяется (см. validate()).
+
+    config/dotfiles можно передать заранее посчитанными, чтобы не повторять
+    build_config() и чтение dotFiles для каждого проекта в пакете.
+    """
+    with phase("render"):
+        return _render(spec, config, dotfiles)
+
+def _render(
+    spec: ProjectSpec,
+    config: Optional[dict],
+    dotfiles: Optional[list[tuple[str, Path, bytes]]],
+) -> RenderedProject:
+    cfg = config if config is not None else build_config(spec.full, spec)
+    guids = spec.guids if spec.guids is not None else project_guids(spec.name)
+
+    warnings = []
+    if dotfiles is None:
+        dotfiles = []
+        if spec.dotfiles_dir is not None:
+            dotfiles, warnings = load_dotfiles(spec.dotfiles_dir, names=spec.dotfiles)
+
+    files = {}
+    sources = {}
+    for fname, src, data in dotfiles:
+        files[fname] = data
+        sources[fname] = src
+    files["assets/.keep"] = b""
+    for rel, text in render_project_files(spec.name, cfg, guids, spec).items():
+        files[rel] = encode_text(text)
+    files[PROJECT_SPEC_PATH.as_posix()] = encode_text(spec.to_json())
+    files[VSBUILD_GITIGNORE_PATH.as_posix()] = encode_text(VSBUILD_GITIGNORE)
+    if spec.asset_pack or spec.atlas:
+        # Упаковщик едет вместе с проектом: MSBuild/CMake-цели зовут tools/vsb_assets.py
+        files[PACK_TOOL_PATH] = asset_tool_bytes()
+
+    return RenderedProject(
+        spec=spec,
+        files=files,
+        guids=guids,
+        config=cfg,
+        sources=sources,
+        warnings=warnings,
+    )
+
+def validate(
+    spec: ProjectSpec,
+    fail_on_missing: bool = False,
+    config: Optional[dict] = None,
+    index: Optional[DirIndex] = None,
+    io_workers: int = 1,
+):
+    cfg = config if config is not None else build_config(spec.full, spec)
+    check_paths_and_files(
+        includes=cfg["includes"],
+        libdirs=cfg["libdirs"],
+        dll_dirs=cfg["dll_dirs"],
+        expected_libs=cfg["expected_libs"],
+        expected_dll_patterns=cfg["expected_dll_patterns"],
+        fail_on_missing=fail_on_missing,
+        index=index,
+        io_workers=io_workers,
+    )
+    if cfg.get("dlls") is None and cfg.get("dll_notes"):
+        print(f"  DLL list: {'; '.join(cfg['dll_notes'])} -> CopySdlDlls copies all *.dll")
+
+def materialize(
+    rendered: RenderedProject,
+    out_dir: str,
+    incremental: bool = False,
+    quiet: bool = False,
+    io_workers: int = 1,
+    copy_mode: str = "copy",
+) -> dict:
+    """Пишет отрендеренный проект в <out_dir>\\<name>. dotFiles кладутся
+    способом copy_mode (см. DOTFILES_MODES) и не трогаются, если уже
+    совпадают; остальное пишется как есть."""
+    project_root = Path(out_dir) / rendered.name
+    with phase("write_files"):
+        writer = OutputWriter(project_root, incremental=incremental, quiet=quiet, copy_mode=copy_mode)
+        # Папки src/include/assets создаются вместе с файлами (assets/.keep)
+        writer.store_many(
+            [(rel, data, rendered.sources.get(rel)) for rel, data in rendered.files.items()],
+            io_workers,
+        )
+        writer.finish()
+
+    return {
+        "name": rendered.name,
+        "root": project_root,
+        "proj_guid": rendered.guids["proj"],
+        "written": writer.written,
+        "skipped": writer.skipped,
+    }
+
+def build_project(
+    spec: ProjectSpec,
+    out_dir: str,
+    cfg: dict,
+    dotfiles: list[tuple[str, Path, bytes]],
+    do_git: bool,
+    incremental: bool,
+    quiet: bool = False,
+    io_workers: int = 1,
+    copy_mode: str = "copy",
+    git_commit: bool = False,
+    git_author: Optional[str] = None,
+    git_message: str = GIT_COMMIT_MESSAGE,
+) -> dict:
+    """Всё, что после проверки SDK: рендер + запись одного проекта
+    (+ git init или первый коммит при git_commit)."""
+    project_root = Path(out_dir) / spec.name
+    with phase("scan_project"):
+        # GUID'ы существующего проекта сохраняем
+        spec = replace(spec, guids=project_guids(spec.name, project_root))
+        # Файлы, добавленные в src/include/assets руками, остаются в проекте
+        spec = replace(spec, extra_files=sorted(set(spec.extra_files) | set(scan_project_files(project_root))))
+    info = materialize(render(spec, cfg, dotfiles), out_dir, incremental, quiet, io_workers, copy_mode)
+
+    if git_commit:
+        git_commit_initial(project_root, git_author, git_message, quiet)
+    elif do_git:
+        with phase("git_init"):
+            git_init(project_root, quiet)
+    return info
+
+def generate(project_name: str, out_dir: str, full: bool, do_git: bool, fail_on_missing: bool, args):
+    spec = replace(ProjectSpec.from_args(project_name, args), full=full)
+    with phase("build_config"):
+        cfg = build_config(full, spec)
+    io_workers = getattr(args, "io_workers", IO_WORKERS)
+    with phase("check_paths_and_files"):
+        index = open_sdk_index(args)
+        validate(spec, fail_on_missing, cfg, index, io_workers)
+        index.save()
+
+    with phase("read_dotfiles"):
+        dotfiles = read_dotfiles(find_dotfiles(args.dotfiles_dir, fail_on_missing, io_workers, spec.dotfiles), io_workers)
+    info = build_project(
+        spec, out_dir, cfg, dotfiles, do_git,
+        incremental=getattr(args, "incremental", False),
+        io_workers=io_workers,
+        copy_mode=getattr(args, "dotfiles_mode", "copy"),
+        git_commit=getattr(args, "git_commit", False),
+        git_author=getattr(args, "git_author", None),
+        git_message=getattr(args, "git_message", GIT_COMMIT_MESSAGE),
+    )
+
+    sln_path = info["root"] / f"{project_name}.sln"
+    proj_path = info["root"] / f"{project_name}.vcxproj"
+
+    print("\nDone.")
+    if "msbuild" in spec.backends:
+        print(f"Solution: {sln_path}")
+        print(f"Project:  {proj_path}")
+    if "cmake" in spec.backends:
+        print(f"CMake:    {info['root'] / 'CMakeLists.txt'}")
+    print(f"Full:     {full}")
+    print(f"Git:      {do_git}")
+
+def read_batch_file(path: str) -> list[str]:
+    """Список проектов: .json (список имён/объектов с "name"), .toml ([[projects]])
+    или текстовый файл — одно имя на строку, # — комментарий."""
+    p = Path(path)
+    try:
+        text = p.read_text(encoding="utf-8")
+    except OSError as e:
+        raise SystemExit(f"Cannot read batch file {path}: {e}")
+
+    suffix = p.suffix.lower()
+    if suffix in (".json", ".toml"):
+        try:
+            if suffix == ".json":
+                data = json.loads(text)
+            else:
+                import tomllib  # Python 3.11+
+                data = tomllib.loads(text)
+        except ImportError:
+            raise SystemExit("TOML batch files need Python 3.11+ (tomllib). Use .json or a plain list.")
+        except ValueError as e:
+            raise SystemExit(f"Bad batch file {path}: {e}")
+        if isinstance(data, dict):
+            data = data.get("projects", [])
+        names = []
+        for item in data if isinstance(data, list) else []:
+            name = item.get("name") if isinstance(item, dict) else item
+            if not isinstance(name, str) or not name:
+                raise SystemExit(f"Bad project entry in {path}: {item!r}")
+            names.append(name)
+        return names
+
+    names = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            names.append(line)
+    return names
+
+def read_solution_guid(sln_path: Path) -> Optional[str]:
+    try:
+        m = re.search(r"SolutionGuid\s*=\s*" + GUID_RE, sln_path.read_text(encoding="utf-8-sig"))
+    except (OSError, UnicodeDecodeError):
+        return None
+    return m.group(1).upper() if m else None
+
+def generate_batch(
+    project_names: list[str],
+    out_dir: str,
+    full: bool,
+    do_git: bool,
+    fail_on_missing: bool,
+    args,
+    jobs: Optional[int] = None,
+    sln_name: str = BATCH_SLN_NAME,
+):
+    """Много проектов за один запуск: SDK и dotFiles проверяются один раз,
+    проекты пишутся пулом потоков, плюс общий <out>\\<sln_name>.sln."""
+    seen = set()
+    dupes = set()
+    for name in project_names:
+        key = name.lower()  # файловая система Windows регистронезависима
+        if key in seen:
+            dupes.add(name)
+        seen.add(key)
+    if dupes:
+        raise SystemExit(f"Duplicate project names in batch: {', '.join(sorted(dupes))}")
+    if not project_names:
+        raise SystemExit("Batch is empty.")
+
+    started = time.perf_counter()
+    base_spec = replace(ProjectSpec.from_args(project_names[0], args), full=full)
+    with phase("build_config"):
+        cfg = build_config(full, base_spec)
+    io_workers = getattr(args, "io_workers", IO_WORKERS)
+    with phase("check_paths_and_files"):
+        index = open_sdk_index(args)
+        validate(base_spec, fail_on_missing, cfg, index, io_workers)
+        index.save()
+    # dotFiles читаем один раз на весь пакет
+    with phase("read_dotfiles"):
+        dotfiles = read_dotfiles(find_dotfiles(args.dotfiles_dir, fail_on_missing, io_workers, base_spec.dotfiles), io_workers)
+    incremental = getattr(args, "incremental", False)
+    copy_mode = getattr(args, "dotfiles_mode", "copy")
+    git_commit = getattr(args, "git_commit", False)
+    # Автор один на весь пакет: конфиг git читается один раз
+    git_author = getattr(args, "git_author", None) or (default_git_author() if git_commit else None)
+    git_message = getattr(args, "git_message", GIT_COMMIT_MESSAGE)
+
+    def one(name: str) -> dict:
+        spec = replace(base_spec, name=name)
+        return build_project(
+            spec, out_dir, cfg, dotfiles, do_git, incremental, quiet=True, copy_mode=copy_mode,
+            git_commit=git_commit, git_author=git_author, git_message=git_message,
+        )
+
+    workers = jobs or min(32, (os.cpu_count() or 1) + 4)
+    # jobs=1 — без пула, в вызывающем потоке (нужно cProfile, см. --pyprofile)
+    results = parallel_map(one, project_names, workers)
+
+    sln_path = Path(out_dir) / f"{sln_name}.sln"
+    cmake_path = Path(out_dir) / "CMakeLists.txt"
+    aggregates = []
+    if "msbuild" in base_spec.backends:
+        sln_guid = read_solution_guid(sln_path) or stable_guid(sln_name, "batch-solution")
+        aggregates.append((sln_path, render_solution(
+            sln_guid,
+            [(r["name"], f"{r['name']}\\{r['name']}.vcxproj", r["proj_guid"]) for r in results],
+            project_configs(base_spec),
+        )))
+    if "cmake" in base_spec.backends:
+        aggregates.append((cmake_path, render_cmake_root(sln_name, [r["name"] for r in results])))
+    for path, text in aggregates:
+        data = encode_text(text)
+        try:
+            unchanged = incremental and path.read_bytes() == data
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            fs_op("write", len(data), path)
+            print(f"  wrote {path}")
+
+    elapsed = time.perf_counter() - started
+    written = sum(r["written"] for r in results)
+    skipped = sum(r["skipped"] for r in results)
 
     print("\nDone.")
-    print(f"Solution: {sln_path}")
-    print(f"Project:  {proj_path}")
+    print(f"Projects: {len(results)} ({elapsed:.2f}s, {len(results) / max(elapsed, 1e-9):.0f}/s, {workers} workers)")
+    print(f"Files:    written {written}, skipped {skipped}")
+    if "msbuild" in base_spec.backends:
+        print(f"Solution: {sln_path}")
+    if "cmake" in base_spec.backends:
+        print(f"CMake:    {cmake_path}")
     print(f"Full:     {full}")
     print(f"Git:      {do_git}")
 
-def main():
+def load_project_spec(project_root: Path) -> ProjectSpec:
+    path = project_root / PROJECT_SPEC_PATH
+    try:
+        return ProjectSpec.from_json(path.read_text(encoding="utf-8"))
+    except OSError:
+        raise SystemExit(f"{path} not found (fresh clone or project from an older VS_build.py): "
+                         f"regenerate it once with --incremental")
+    except (ValueError, TypeError) as e:
+        raise SystemExit(f"Bad {path}: {e}")
+
+def sync_project(
+    project_root: Path,
+    force: bool = False,
+    quiet: bool = False,
+    backends: Optional[list[str]] = None,
+) -> bool:
+    """Синхронизирует списки файлов проекта (.vcxproj/.filters, CMakeLists.txt)
+    с деревом src/include/assets. Пишет только если набор файлов изменился.
+    backends — только эти бэкенды (по умолчанию все из спецификации). True — что-то записано."""
+    spec = load_project_spec(project_root)
+    with phase("scan_project"):
+        files = scan_project_files(project_root)
+    partial = backends is not None
+    backends = [b for b in spec.backends if not partial or b in backends]
+
+    # Быстрый выход: тот же набор файлов и та же спецификация, XML на месте
+    signature = hashlib.sha1("\n".join(files + [spec.to_json()]).encode("utf-8")).hexdigest()
+    state_path = project_root / SYNC_STATE_PATH
+    outputs = [rel for b in backends for rel in BACKEND_SYNC_FILES[b](spec.name)]
+    if not force and all((project_root / rel).exists() for rel in outputs):
+        try:
+            if json.loads(state_path.read_text(encoding="utf-8")).get("signature") == signature:
+                if not quiet:
+                    print(f"  sync: up to date ({len(files)} files)")
+                return False
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    spec = replace(spec, guids=project_guids(spec.name, project_root), extra_files=files)
+    # Скелетон и dotFiles не трогаем. CMakeLists.txt целиком генерируемый — пишется
+    # заново; .vcxproj/.filters правятся на месте (sync_vcxproj_items), с нуля —
+    # только если их нет. Плюс unity-пачки и tools/vsb_assets.py (его зовут цели
+    # ассетов из тех же файлов проекта)
+    msbuild_files = BACKEND_SYNC_FILES["msbuild"](spec.name)
+    patch_msbuild = "msbuild" in backends and all((project_root / rel).exists() for rel in msbuild_files)
+    keep = {rel for rel in outputs if not (patch_msbuild and rel in msbuild_files)}
+    # Полный рендер — только для того, что пишется целиком
+    rendered = render(replace(spec, dotfiles_dir=None)) if keep or not patch_msbuild else None
+    if spec.asset_pack or spec.atlas:
+        keep.add(PACK_TOOL_PATH)
+    patched = 0
+    with phase("write_files"):
+        if patch_msbuild:
+            # Удалённые файлы скелетона (src/app.cpp и т.п.) тоже уходят из проекта
+            scanned = {win_path(rel).lower() for rel in files}
+            items = add_unity_items([
+                item for item in project_items(spec.name, replace(spec, unity=0))
+                if item.path.lower() in scanned
+            ], spec)
+            patched = sync_vcxproj_items(project_root, spec.name, items, quiet)
+            unity_files = {}
+            if spec.unity:
+                unity_files = {rel: encode_text(text) for rel, text in render_unity(items, spec).items()}
+        else:
+            unity_files = {rel: data for rel, data in rendered.files.items() if rel.startswith(UNITY_DIR + "/")}
+        if rendered is not None:
+            files_out = {rel: data for rel, data in rendered.files.items() if rel in keep}
+        else:
+            files_out = {PACK_TOOL_PATH: asset_tool_bytes()} if PACK_TOOL_PATH in keep else {}
+        writer = OutputWriter(project_root, incremental=True, quiet=quiet, partial=True)
+        writer.store_many([(rel, data, None) for rel, data in files_out.items()])
+        if "msbuild" in backends:
+            writer.store_many([(rel, data, None) for rel, data in unity_files.items()])
+        writer.finish()
+    if not partial:
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        state_path.write_text(json.dumps({"signature": signature}) + "\n", encoding="utf-8")
+    if not quiet:
+        print(f"  sync: {len(files)} files, written {writer.written}, patched {patched}, unchanged {writer.skipped}")
+    return writer.written + patched > 0
+
+def sync_vcxproj_items(project_root: Path, name: str, items: list[ProjectItem], quiet: bool = False) -> int:
+    """Приводит элементы .vcxproj/.filters из src/include/assets/unity к items на месте:
+    недостающие вставляются, исчезнувшие удаляются (и их unity\\*.cpp), остальной XML —
+    настройки, правки из VS, элементы вне этих папок — не трогается. Возвращает
+    число изменённых файлов проекта."""
+    keys = [(item.kind, xml_attr(item.path).lower()) for item in items]
+    wanted = set(keys)
+    managed = tuple(d + "\\" for d in SCAN_DIRS + (UNITY_DIR,))
+    removed = set()
+
+    def patch(text, render_item, anchor, filters=False):
+        present, stale = set(), {kind: [] for kind in FILTER_FOR_KIND}
+        for m in XML_ITEM_RE.finditer(text):
+            key = (m.group(1), m.group(2).lower())
+            present.add(key)
+            if key[0] in stale and key not in wanted and key[1].startswith(managed):
+                stale[key[0]].append(xml_unescape(m.group(2), {"&quot;": '"'}))
+        removed.update(stale["ClCompile"])
+        # Рендерятся только недостающие элементы: на больших проектах их единицы
+        missing = [item for item, key in zip(items, keys) if key not in present]
+        total = 0
+        if filters:
+            # Уже существующие фильтры не вставляются, так что новым хватает uuid5
+            defs = {
+                f: render_filter_def(name, f, {}) for f in filter_names(missing)
+                if ("Filter", xml_attr(f).lower()) not in present
+            }
+            if defs:
+                text, total = insert_xml_items(text, "Filter", defs, anchor)
+        for kind in FILTER_FOR_KIND:
+            if stale[kind]:
+                text, n = remove_xml_items(text, kind, stale[kind])
+                total += n
+            blocks = {item.path: render_item(item) for item in missing if item.kind == kind}
+            if blocks:
+                text, n = insert_xml_items(text, kind, blocks, anchor)
+                total += n
+        return text, total
+
+    targets_anchor = '<Import Project="$(VCTargetsPath)\\Microsoft.Cpp.targets"'
+    changed = bool(patch_file(
+        project_root / f"{name}.vcxproj", lambda text: patch(text, render_vcx_item, targets_anchor), quiet,
+    ))
+    changed += bool(patch_file(
+        project_root / f"{name}.vcxproj.filters", lambda text: patch(text, render_filter_item, "</Project>", True), quiet,
+    ))
+    for include in removed:
+        if include.lower().startswith(UNITY_DIR + "\\"):
+            with contextlib.suppress(OSError):
+                (project_root / include.replace("\\", "/")).unlink()
+    return changed
+
+def cmd_sync(argv: list[str]):
+    p = argparse.ArgumentParser(
+        prog="VS_build.py sync",
+        description="Синхронизировать списки файлов проекта (.vcxproj/.filters, CMakeLists.txt) с src/, include/, assets/",
+    )
+    p.add_argument("project", nargs="?", default=".", help="Папка проекта (по умолчанию текущая)")
+    p.add_argument("--force", action="store_true", help="Сверить элементы проекта, даже если набор файлов не менялся")
+    p.add_argument("-q", "--quiet", action="store_true")
+    args = p.parse_args(argv)
+    sync_project(Path(args.project), force=args.force, quiet=args.quiet)
+
+# Элемент проекта в уже существующем XML (в т.ч. сохранённом VS): <Kind Include="..." />
+# или <Kind Include="...">...</Kind>, вместе с отступом и переводом строки
+XML_ITEM_RE = re.compile(
+    r'^[ \t]*<(ClCompile|ClInclude|None|Filter) Include="([^"]*)"(?:\s*/>|>.*?</\1>)[ \t]*(?:\r?\n)?',
+    re.M | re.S,
+)
+CLASS_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+def insert_xml_items(text: str, kind: str, blocks: dict, anchor: str) -> tuple[str, int]:
+    """Вставляет элементы kind ({Include: xml}) в существующий XML, не трогая остальное.
+    Новый элемент встаёт после последнего с меньшим или равным Include — в отсортированном
+    списке порядок сохраняется. Если элементов kind нет, создаётся <ItemGroup> перед anchor.
+    Возвращает (текст, число вставленных)."""
+    newline = "\r\n" if "\r\n" in text else "\n"
+    found = [m for m in XML_ITEM_RE.finditer(text) if m.group(1) == kind]
+    existing = {m.group(2).lower() for m in found}
+    inserts = {}
+    for include in sorted(blocks, key=str.lower):
+        key = xml_attr(include).lower()
+        if key in existing:
+            continue
+        existing.add(key)
+        pos = found[0].start() if found else -1
+        for m in found:
+            if m.group(2).lower() <= key:
+                pos = m.end()
+        inserts.setdefault(pos, []).append(blocks[include].replace("\n", newline))
+    if not inserts:
+        return text, 0
+
+    count = sum(len(v) for v in inserts.values())
+    if -1 in inserts:
+        at = text.find(anchor)
+        if at < 0:
+            raise SystemExit(f"Cannot patch project: {anchor.strip()!r} not found")
+        at = text.rfind("\n", 0, at) + 1
+        group = "  <ItemGroup>" + newline + "".join(inserts.pop(-1)) + "  </ItemGroup>" + newline
+        inserts[at] = [group]
+    for pos in sorted(inserts, reverse=True):
+        text = text[:pos] + "".join(inserts[pos]) + text[pos:]
+    return text, count
+
+def remove_xml_items(text: str, kind: str, includes: list[str]) -> tuple[str, int]:
+    """Удаляет элементы kind с Include из includes (без учёта регистра) вместе
+    с их строками, не трогая остальное. Возвращает (текст, число удалённых)."""
+    keys = {xml_attr(include).lower() for include in includes}
+    out = []
+    pos = count = 0
+    for m in XML_ITEM_RE.finditer(text):
+        if m.group(1) == kind and m.group(2).lower() in keys:
+            out.append(text[pos:m.start()])
+            pos = m.end()
+            count += 1
+    out.append(text[pos:])
+    return "".join(out), count
+
+def patch_file(path: Path, patch, quiet: bool = False) -> int:
+    """Читает файл один раз, применяет patch(text) -> (text, n), пишет обратно
+    байт-в-байт (BOM, переводы строк), только если что-то вставлено или удалено."""
+    raw = path.read_bytes()
+    bom = b"\xef\xbb\xbf" if raw.startswith(b"\xef\xbb\xbf") else b""
+    text, count = patch(raw[len(bom):].decode("utf-8"))
+    if count:
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(bom + text.encode("utf-8"))
+        os.replace(tmp, path)
+        if not quiet:
+            print(f"  patched {path} ({count} items)")
+    return count
+
+def project_name_of(project_root: Path) -> str:
+    spec_path = project_root / PROJECT_SPEC_PATH
+    if spec_path.exists():
+        return load_project_spec(project_root).name
+    # Проект без .vsbuild/project.json (старый или переименованный): единственный .vcxproj
+    found = sorted(project_root.glob("*.vcxproj"))
+    if len(found) != 1:
+        raise SystemExit(f"Cannot determine project in {project_root}: expected one .vcxproj, found {len(found)}")
+    return found[0].stem
+
+def add_project_files(project_root: Path, files: dict, quiet: bool = False):
+    """Создаёт недостающие файлы ({путь через /: содержимое}) и дописывает их
+    в .vcxproj/.filters на месте, без перерендеринга остального проекта
+    (CMakeLists.txt при --backend cmake рендерится заново — он целиком генерируемый)."""
+    name = project_name_of(project_root)
+    for rel, content in files.items():
+        path = project_root / rel
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding="utf-8")
+            if not quiet:
+                print(f"  created {path}")
+
+    spec_path = project_root / PROJECT_SPEC_PATH
+    spec = load_project_spec(project_root) if spec_path.exists() else None
+    unity = spec is not None and spec.unity
+    backends = spec.backends if spec is not None else ["msbuild"]
+    items = []
+    for rel in files:
+        kind = classify_file(rel)
+        items.append(ProjectItem(kind, win_path(rel), filter=item_filter(name, kind, rel)))
+    if "cmake" in backends:
+        sync_project(project_root, force=True, quiet=quiet, backends=["cmake"])
+    if "msbuild" not in backends:
+        return
+
+    vcxproj_path = project_root / f"{name}.vcxproj"
+    unity_added, unity_removed = [], []
+    if unity and any(item.kind == "ClCompile" for item in items):
+        unity_added, unity_removed = patch_unity(project_root, vcxproj_path, spec, items, quiet)
+
+    targets_anchor = '<Import Project="$(VCTargetsPath)\\Microsoft.Cpp.targets"'
+
+    def patch_vcxproj(text):
+        text, total = remove_xml_items(text, "ClCompile", unity_removed)
+        for kind in FILTER_FOR_KIND:
+            blocks = {item.path: render_vcx_item(item) for item in items + unity_added if item.kind == kind}
+            text, n = insert_xml_items(text, kind, blocks, targets_anchor)
+            total += n
+        return text, total
+
+    def patch_filters(text):
+        text, total = remove_xml_items(text, "ClCompile", unity_removed)
+        # Уже существующие фильтры не вставляются, так что новым хватает uuid5
+        defs = {f: render_filter_def(name, f, {}) for f in filter_names(items + unity_added)}
+        text, n = insert_xml_items(text, "Filter", defs, "</Project>")
+        total += n
+        for kind in FILTER_FOR_KIND:
+            blocks = {item.path: render_filter_item(item) for item in items + unity_added if item.kind == kind}
+            text, n = insert_xml_items(text, kind, blocks, "</Project>")
+            total += n
+        return text, total
+
+    changed = patch_file(vcxproj_path, patch_vcxproj, quiet)
+    patch_file(project_root / f"{name}.vcxproj.filters", patch_filters, quiet)
+    if not changed and not quiet:
+        print("  already in project")
+
+def patch_unity(
+    project_root: Path,
+    vcxproj_path: Path,
+    spec: "ProjectSpec",
+    items: list[ProjectItem],
+    quiet: bool = False,
+) -> tuple[list[ProjectItem], list[str]]:
+    """Unity-проект: новым .cpp — ExcludedFromBuild там, где включена unity-сборка;
+    пачки пересчитываются по ClCompile из самого .vcxproj (plan_unity меняет
+    только затронутые). Переписывает изменившиеся unity\\*.cpp, удаляет исчезнувшие.
+    Возвращает (новые unity-элементы, Include исчезнувших) для правки XML."""
+    all_configs = project_configs(spec)
+    on = unity_configs(spec)
+    off = [c for c in all_configs if c not in on]
+    text = vcxproj_path.read_text(encoding="utf-8-sig")
+    members, old_unity = {}, {}
+    for m in XML_ITEM_RE.finditer(text):
+        if m.group(1) != "ClCompile":
+            continue
+        path = xml_unescape(m.group(2), {"&quot;": '"'})
+        if path.lower().startswith(UNITY_DIR + "\\"):
+            old_unity[path.lower()] = path
+        elif path.lower().endswith(CPP_EXTENSIONS) and "<PrecompiledHeader" not in m.group(0):
+            members[path.lower()] = path
+    for item in items:
+        if item.kind == "ClCompile" and item.path.lower().endswith(CPP_EXTENSIONS):
+            item.metadata.update(excluded_in(on, all_configs))
+            members.setdefault(item.path.lower(), item.path)
+
+    plan = plan_unity(list(members.values()), spec.unity)
+    new_unity = {win_path(rel).lower(): win_path(rel) for rel, _ in plan}
+    added = [
+        ProjectItem("ClCompile", path, excluded_in(off, all_configs), UNITY_FILTER)
+        for key, path in sorted(new_unity.items()) if key not in old_unity
+    ]
+    removed = [path for key, path in old_unity.items() if key not in new_unity]
+    rewritten = 0
+    for rel, batch in plan:
+        path = project_root / rel
+        data = encode_text(render_unity_file(batch, spec.unity))
+        try:
+            if path.read_bytes() == data:
+                continue
+        except OSError:
+            pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        rewritten += 1
+    for include in removed:
+        try:
+            (project_root / include.replace("\\", "/")).unlink()
+        except OSError:
+            pass
+    if not quiet:
+        print(f"  unity: {len(plan)} batches, written {rewritten}, removed {len(removed)}")
+    return added, removed
+
+def project_rel(project_root: Path, path: str) -> str:
+    """Путь файла относительно корня проекта (через /); должен быть внутри проекта.
+    Относительный путь считается от корня проекта; .. и симлинки раскрываются."""
+    root = project_root.resolve()
+    full = (root / path).resolve()
+    if full == root or not full.is_relative_to(root):
+        raise SystemExit(f"{path} is outside project {project_root}")
+    return full.relative_to(root).as_posix()
+
+def cmd_add_file(argv: list[str]):
+    p = argparse.ArgumentParser(
+        prog="VS_build.py add-file",
+        description="Добавить файлы в существующий проект (правка .vcxproj/.filters на месте)",
+    )
+    p.add_argument("files", nargs="+", help="Пути от корня проекта: src/render/batch.cpp, assets/ui.png")
+    p.add_argument("-C", "--project", default=".", help="Папка проекта (по умолчанию текущая)")
+    p.add_argument("-q", "--quiet", action="store_true")
+    args = p.parse_args(argv)
+    root = Path(args.project)
+    files = {}
+    for f in args.files:
+        rel = project_rel(root, f)
+        lower = rel.lower()
+        if lower.endswith(HEADER_EXTENSIONS):
+            files[rel] = HEADER_STUB
+        elif lower.endswith(SOURCE_EXTENSIONS) or (root / rel).is_file():
+            files[rel] = ""
+        else:
+            # Пустой .png/.wav — битый ассет: заготовки только для исходников и заголовков
+            raise SystemExit(f"{root / rel} not found: add-file creates only source and header stubs, "
+                             f"put other files in place first")
+    add_project_files(root, files, quiet=args.quiet)
+
+def cmd_add_class(argv: list[str]):
+    p = argparse.ArgumentParser(
+        prog="VS_build.py add-class",
+        description="Добавить класс: include/<Project>/<Name>.h + src/<Name>.cpp",
+    )
+    p.add_argument("classes", nargs="+", help="Имя класса, можно с подпапкой: Player, render/Batch")
+    p.add_argument("-C", "--project", default=".", help="Папка проекта (по умолчанию текущая)")
+    p.add_argument("-q", "--quiet", action="store_true")
+    args = p.parse_args(argv)
+    root = Path(args.project)
+    name = project_name_of(root)
+    files = {}
+    for spec in args.classes:
+        sub, _, cls_name = spec.replace("\\", "/").rpartition("/")
+        if not CLASS_NAME_RE.match(cls_name):
+            raise SystemExit(f"Bad class name: {cls_name!r}")
+        sub = sub + "/" if sub else ""
+        header = f"{name}/{sub}{cls_name}.h"
+        h_rel, cpp_rel = f"include/{header}", f"src/{sub}{cls_name}.cpp"
+        for rel in (h_rel, cpp_rel):
+            if (root / rel).exists():
+                raise SystemExit(f"{root / rel} already exists")
+        files[h_rel] = CLASS_H.format(cls_name=cls_name)
+        files[cpp_rel] = CLASS_CPP.format(cls_name=cls_name, header=header)
+    add_project_files(root, files, quiet=args.quiet)
+
+# Подкоманды: python VS_build.py <команда> ...
+# ---- Бенчмарк генератора (bench) ----
+
+# Базовые результаты по умолчанию — в текущей папке (пишутся только по --save-baseline)
+BENCH_BASELINE = "vsbuild-bench.json"
+BENCH_SCENARIOS = ("single", "batch", "large", "sync")
+# Сценарии с пулом потоков: фазы в них — сумма по потокам, а не время на часах,
+# поэтому сравнивается только общее время (total) и с бо́льшим порогом шума
+BENCH_THREADED = ("batch",)
+# Регрессия — медленнее базы больше чем на tolerance И больше чем на
+# BENCH_MIN_DELTA секунд (иначе миллисекундные фазы шумят)
+BENCH_TOLERANCE = 0.25
+BENCH_MIN_DELTA = 0.01
+BENCH_THREADED_MIN_DELTA = 0.05
+
+def bench_pe(imports: list[str]) -> bytes:
+    """Минимальная PE32+ DLL с таблицей импорта (для resolve_runtime_dlls)."""
+    sect_rva, sect_raw = 0x1000, 0x200
+    desc_size = 20 * (len(imports) + 1)
+    strtab = b""
+    body = b""
+    for name in imports:
+        body += struct.pack("<IIIII", 0, 0, 0, sect_rva + desc_size + len(strtab), 0)
+        strtab += name.encode("ascii") + b"\0"
+    body += b"\0" * 20 + strtab
+    body += b"\0" * (-len(body) % 0x200)
+    opt = bytearray(112 + 16 * 8)
+    struct.pack_into("<H", opt, 0, 0x20B)
+    struct.pack_into("<Q", opt, 24, 0x180000000)
+    struct.pack_into("<I", opt, 108, 16)
+    struct.pack_into("<II", opt, 120, sect_rva, desc_size)
+    head = (
+        b"MZ" + b"\0" * 58 + struct.pack("<I", 64)
+        + b"PE\0\0" + struct.pack("<HHIIIHH", 0x8664, 1, 0, 0, 0, len(opt), 0x2022)
+        + bytes(opt)
+        + b".idata\0\0" + struct.pack("<IIIIIIHHI", len(body), sect_rva, len(body), sect_raw, 0, 0, 0, 0, 0xC0000040)
+    )
+    return head + b"\0" * (sect_raw - len(head)) + body
+
+def bench_implib(dll: str) -> bytes:
+    """Import-библиотека (архив COFF) с одним short import object."""
+    payload = b"SDL_Init\0" + dll.encode("ascii") + b"\0"
+    member = struct.pack("<HHHHIIHH", 0, 0xFFFF, 0, 0x8664, 0, len(payload), 0, 0) + payload
+    header = f"{dll}/".ljust(16) + "0".ljust(12) + "0".ljust(6) * 2 + "644".ljust(8) + str(len(member)).ljust(10) + "`\n"
+    return b"!<arch>\n" + header.encode("ascii") + member + b"\n" * (len(member) & 1)
+
+def make_fake_sdk(root: Path) -> dict:
+    """Раскладка как у официальных VC-архивов SDL (include/ + lib/x64 с .lib и .dll)
+    и папка dotFiles. Возвращает значения полей ProjectSpec."""
+    libs = {
+        # папка: (заголовки, import-библиотеки, DLL: импорты)
+        "SDL2": (["SDL.h"], ["SDL2"], {"SDL2.dll": ["KERNEL32.dll", "USER32.dll"]}),
+        "SDL2_image": (["SDL_image.h"], ["SDL2_image"], {
+            "SDL2_image.dll": ["SDL2.dll", "KERNEL32.dll", "libpng16-16.dll"],
+            "libpng16-16.dll": ["zlib1.dll", "KERNEL32.dll"],
+            "zlib1.dll": ["KERNEL32.dll"],
+            "libwebp-7.dll": ["KERNEL32.dll"],
+        }),
+        "SDL2_ttf": (["SDL_ttf.h"], ["SDL2_ttf"], {"SDL2_ttf.dll": ["SDL2.dll", "KERNEL32.dll"]}),
+        "SDL2_mixer": (["SDL_mixer.h"], ["SDL2_mixer"], {"SDL2_mixer.dll": ["SDL2.dll", "KERNEL32.dll"]}),
+    }
+    paths = {}
+    for name, (headers, implibs, dlls) in libs.items():
+        inc = root / name / "include"
+        lib = root / name / "lib" / "x64"
+        inc.mkdir(parents=True, exist_ok=True)
+        lib.mkdir(parents=True, exist_ok=True)
+        for h in headers:
+            (inc / h).write_text("#pragma once\n", encoding="utf-8")
+        for stem in implibs:
+            (lib / f"{stem}.lib").write_bytes(bench_implib(f"{stem}.dll"))
+        for dll, imports in dlls.items():
+            (lib / dll).write_bytes(bench_pe(imports))
+        paths[name] = (str(inc), str(lib))
+    (root / "SDL2" / "lib" / "x64" / "SDL2main.lib").write_bytes(b"!<arch>\n")
+
+    dot = root / "dotFiles"
+    dot.mkdir(exist_ok=True)
+    for fname in DOTFILES:
+        (dot / fname).write_text(f"# {fname}\n" * 20, encoding="utf-8")
+
+    fields = {"dotfiles_dir": str(dot)}
+    for prefix, name in (("sdl2", "SDL2"), ("sdl2img", "SDL2_image"), ("sdl2ttf", "SDL2_ttf"), ("sdl2mixer", "SDL2_mixer")):
+        fields[f"{prefix}_inc"], fields[f"{prefix}_lib"] = paths[name]
+        fields[f"{prefix}_dll_dir"] = paths[name][1]
+    return fields
+
+def bench_args(sdk: dict, **overrides) -> argparse.Namespace:
+    """args как у CLI, но без кеша SDK на диске (каждый замер — холодный индекс)."""
+    values = dict(sdk, dotfiles=None, dotfiles_mode="copy", io_workers=IO_WORKERS,
+                  incremental=False, sdk_index=DirIndex(None))
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+def bench_sources(project_root: Path, count: int):
+    """count .cpp/.h в src/ и include/ по 50 штук на папку (как в крупном проекте)."""
+    for i in range(count):
+        sub = f"mod{i // 50:03d}"
+        src = project_root / "src" / sub
+        inc = project_root / "include" / project_root.name / sub
+        if i % 50 == 0:
+            src.mkdir(parents=True, exist_ok=True)
+            inc.mkdir(parents=True, exist_ok=True)
+        (src / f"unit{i:05d}.cpp").write_text(f'#include "{sub}/unit{i:05d}.h"\nint unit{i}() {{ return {i}; }}\n', encoding="utf-8")
+        (inc / f"unit{i:05d}.h").write_text(f"#pragma once\nint unit{i}();\n", encoding="utf-8")
+
+def bench_once(scenario: str, work: Path, sdk: dict, batch_size: int, files: int, git: bool) -> dict:
+    """Один прогон сценария: {"total": с, "phases": {фаза: с}}."""
+    out = work / f"out-{scenario}"
+    shutil.rmtree(out, ignore_errors=True)
+    out.mkdir(parents=True)
+    prepare = None
+    if scenario == "single":
+        run = lambda: generate("Bench", str(out), True, git, False, bench_args(sdk))
+    elif scenario == "batch":
+        names = [f"Bench{i:04d}" for i in range(batch_size)]
+        run = lambda: generate_batch(names, str(out), False, False, False, bench_args(sdk))
+    elif scenario == "large":
+        prepare = lambda: bench_sources(out / "Bench", files)
+        run = lambda: generate("Bench", str(out), False, False, False, bench_args(sdk, incremental=True))
+    else:  # sync: добавить файл в большой проект и синхронизировать
+        def prepare():
+            bench_sources(out / "Bench", files)
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate("Bench", str(out), False, False, False, bench_args(sdk, incremental=True))
+            (out / "Bench" / "src" / "added.cpp").write_text("int added() { return 0; }\n", encoding="utf-8")
+        run = lambda: sync_project(out / "Bench", quiet=True)
+
+    if prepare is not None:
+        prepare()
+    with contextlib.redirect_stdout(io.StringIO()), collect_phases() as totals:
+        started = time.perf_counter()
+        run()
+        total = time.perf_counter() - started
+    return {"total": total, "phases": {name: seconds for name, (seconds, _) in totals.phases.items()}}
+
+def median(values: list[float]) -> float:
+    values = sorted(values)
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
+
+def run_bench(
+    scenarios: list[str],
+    repeat: int = 3,
+    batch_size: int = 200,
+    files: int = 2000,
+    git: bool = True,
+    work_dir: Optional[str] = None,
+) -> dict:
+    """Прогоняет сценарии repeat раз на фейковом SDK во временной папке
+    (на tmpfs, если есть /dev/shm); результат — медианы по фазам."""
+    if work_dir is None and os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        work_dir = "/dev/shm"
+    git = git and shutil.which("git") is not None
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="vsbuild-bench-", dir=work_dir) as tmp:
+        work = Path(tmp)
+        sdk = make_fake_sdk(work / "sdk")
+        for scenario in scenarios:
+            runs = [bench_once(scenario, work, sdk, batch_size, files, git) for _ in range(repeat)]
+            names = sorted({name for r in runs for name in r["phases"]})
+            results[scenario] = {
+                "total": median([r["total"] for r in runs]),
+                "phases": {name: median([r["phases"].get(name, 0.0) for r in runs]) for name in names},
+            }
+            print(f"  {scenario}: {results[scenario]['total'] * 1000:.1f} ms")
+    return {
+        "version": 1,
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "params": {"repeat": repeat, "batch_size": batch_size, "files": files, "git": git},
+        "results": results,
+    }
+
+def compare_bench(current: dict, baseline: dict, tolerance: float = BENCH_TOLERANCE) -> list[str]:
+    """Печатает таблицу текущие/база; возвращает список регрессий."""
+    regressions = []
+    print(f"\n{'scenario':<8} {'phase':<22} {'baseline':>10} {'now':>10} {'delta':>8}")
+    for scenario, result in current["results"].items():
+        base = baseline.get("results", {}).get(scenario)
+        if base is None:
+            continue
+        threaded = scenario in BENCH_THREADED
+        min_delta = BENCH_THREADED_MIN_DELTA if threaded else BENCH_MIN_DELTA
+        rows = [("total", result["total"], base.get("total"))]
+        rows += [(name, t, base.get("phases", {}).get(name)) for name, t in result["phases"].items()]
+        for name, now, old in rows:
+            if old is None:
+                continue
+            delta = (now - old) / old if old > 0 else 0.0
+            mark = ""
+            if threaded and name != "total":
+                mark = "  (threaded: total only)"
+            elif now > old * (1 + tolerance) and now - old > min_delta:
+                mark = "  REGRESSION"
+                regressions.append(f"{scenario}/{name}: {old * 1000:.1f} -> {now * 1000:.1f} ms ({delta:+.0%})")
+            print(f"{scenario:<8} {name:<22} {old * 1000:>8.1f}ms {now * 1000:>8.1f}ms {delta:>+8.0%}{mark}")
+    # Число прогонов на сравнимость не влияет, размеры сценариев — влияют
+    params = {k: v for k, v in (current.get("params") or {}).items() if k != "repeat"}
+    base_params = {k: v for k, v in (baseline.get("params") or {}).items() if k != "repeat"}
+    if params != base_params:
+        print(f"\nNote: baseline params differ: {base_params}")
+    return regressions
+
+def cmd_bench(argv: list[str]):
+    p = argparse.ArgumentParser(
+        prog="VS_build.py bench",
+        description="Замер генерации на фейковом SDK: сценарии, фазы, сравнение с базой",
+    )
+    p.add_argument("--scenarios", type=lambda v: [x.strip() for x in v.split(",") if x.strip()],
+                   default=list(BENCH_SCENARIOS), help=f"Через запятую: {', '.join(BENCH_SCENARIOS)}")
+    p.add_argument("--repeat", type=int, default=3, help="Прогонов на сценарий (берётся медиана)")
+    p.add_argument("--batch-size", type=int, default=200, help="Проектов в сценарии batch")
+    p.add_argument("--files", type=int, default=2000, help="Пар .cpp/.h в сценариях large и sync")
+    p.add_argument("--no-git", action="store_true", help="Без git init в сценарии single")
+    p.add_argument("--work-dir", default=None, help="Где создавать временные файлы (по умолчанию /dev/shm, если есть)")
+    p.add_argument("--baseline", default=BENCH_BASELINE,
+                   help=f"Файл базовых результатов (по умолчанию {BENCH_BASELINE} в текущей папке)")
+    p.add_argument("--save-baseline", action="store_true", help="Записать результаты как новую базу")
+    p.add_argument("--tolerance", type=float, default=BENCH_TOLERANCE,
+                   help=f"Допустимое замедление фазы (доля, по умолчанию {BENCH_TOLERANCE})")
+    p.add_argument("--json", metavar="FILE", help="Сохранить результаты в JSON")
+    args = p.parse_args(argv)
+    unknown = [s for s in args.scenarios if s not in BENCH_SCENARIOS]
+    if unknown:
+        p.error(f"unknown scenario: {', '.join(unknown)}")
+    if args.repeat < 1:
+        p.error("--repeat должен быть >= 1")
+
+    current = run_bench(args.scenarios, args.repeat, args.batch_size, args.files, not args.no_git, args.work_dir)
+    if args.json:
+        Path(args.json).write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+        print(f"\nBaseline written: {baseline_path}")
+        return
+    if not baseline_path.exists():
+        raise SystemExit(f"\nNo baseline {baseline_path}: nothing to compare with (record one with --save-baseline)")
+    try:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Cannot read baseline {baseline_path}: {e}")
+    regressions = compare_bench(current, baseline, args.tolerance)
+    if regressions:
+        raise SystemExit("\nRegressions (over {:.0%}):\n  ".format(args.tolerance) + "\n  ".join(regressions))
+    print("\nNo regressions.")
+
+# ---- Граф include'ов (analyze-includes) ----
+
+# Кеш разбора: {"files": {путь: [mtime_ns, size, sha1]}, "parsed": {sha1: [[вид, имя], ...]}}
+INCLUDES_CACHE_PATH = Path(".vsbuild") / "includes.json"
+INCLUDES_CACHE_VERSION = 1
+INCLUDE_RE = re.compile(rb'^[ \t]*#[ \t]*include[ \t]*([<"])([^>"\r\n]+)[>"]', re.M)
+# Кандидат в PCH: подключается хотя бы в такую долю TU (и минимум в 2)
+PCH_CANDIDATE_MIN_SHARE = 0.25
+
+class IncludeGraph:
+    """Прямые include'ы файлов с разрешением путей как у cl.exe: "x" — сначала
+    рядом с подключающим файлом, потом include-директории; <x> — только они.
+    Неразрешённые (STL/Windows SDK без %INCLUDE%) — узлы "<имя>" без размера.
+    Разбор кешируется по sha1 содержимого (stat-совпадение — без чтения)."""
+
+    def __init__(self, include_dirs: list[tuple[str, str]], cache_path: Optional[Path] = None):
+        self.include_dirs = include_dirs  # [(папка, вид: project/sdk/system)]
+        self.cache_path = cache_path
+        self.stats = {}
+        self.parsed = {}
+        if cache_path is not None:
+            try:
+                data = json.loads(cache_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = None
+            if isinstance(data, dict) and data.get("version") == INCLUDES_CACHE_VERSION:
+                self.stats = data.get("files") or {}
+                self.parsed = data.get("parsed") or {}
+        self.sizes = {}
+        self.edges = {}
+        self.spellings = {}
+        self.kinds = {}
+        self.hits = 0
+        self._resolved = {}
+
+    def node(self, path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def _parse(self, node: str) -> list:
+        try:
+            st = os.stat(node)
+        except OSError:
+            return []
+        fs_op("stat")
+        entry = self.stats.get(node)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size and entry[2] in self.parsed:
+            self.hits += 1
+            self.sizes[node] = st.st_size
+            return self.parsed[entry[2]]
+        try:
+            data = Path(node).read_bytes()
+        except OSError:
+            return []
+        fs_op("read", len(data))
+        digest = hashlib.sha1(data).hexdigest()
+        self.stats[node] = [st.st_mtime_ns, st.st_size, digest]
+        self.sizes[node] = len(data)
+        if digest in self.parsed:
+            self.hits += 1
+        else:
+            self.parsed[digest] = [
+                [kind.decode("ascii"), name.decode("utf-8", "replace").strip()]
+                for kind, name in INCLUDE_RE.findall(data)
+            ]
+        return self.parsed[digest]
+
+    def _resolve(self, base: tuple[str, str], kind: str, name: str) -> str:
+        """base — (папка подключающего файла, его вид)."""
+        key = (base[0] if kind == '"' else "", kind, name)
+        if key in self._resolved:
+            return self._resolved[key]
+        dirs = ([base] if kind == '"' else []) + self.include_dirs
+        found = None
+        for d, dir_kind in dirs:
+            candidate = os.path.join(d, *name.split("/"))
+            if os.path.isfile(candidate):
+                found = self.node(candidate)
+                self.kinds.setdefault(found, dir_kind)
+                break
+        if found is None:
+            found = f"<{name}>"
+            self.kinds[found] = "unresolved"
+            self.sizes[found] = 0
+        self._resolved[key] = found
+        return found
+
+    def add(self, node: str):
+        """Разбирает node и всё, что он подключает (транзитивно)."""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current in self.edges:
+                continue
+            if current.startswith("<"):
+                self.edges[current] = []
+                continue
+            targets = []
+            base = (os.path.dirname(current), self.kinds.get(current, "project"))
+            for kind, name in self._parse(current):
+                target = self._resolve(base, kind, name)
+                spelled = kind + name + (">" if kind == "<" else '"')
+                counts = self.spellings.setdefault(target, {})
+                counts[spelled] = counts.get(spelled, 0) + 1
+                targets.append(target)
+            self.edges[current] = list(dict.fromkeys(targets))
+            stack.extend(t for t in self.edges[current] if t not in self.edges)
+
+    def closure(self, roots: list[str]) -> set:
+        seen = set()
+        stack = list(roots)
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            stack.extend(self.edges.get(current, ()))
+        return seen
+
+    def spelling(self, node: str) -> str:
+        """Как чаще всего пишут #include этого файла."""
+        counts = self.spellings.get(node)
+        return max(counts, key=lambda s: (counts[s], s)) if counts else node
+
+    def save(self):
+        if self.cache_path is None:
+            return
+        live = {node: entry for node, entry in self.stats.items() if node in self.edges}
+        digests = {entry[2] for entry in live.values()}
+        data = {
+            "version": INCLUDES_CACHE_VERSION,
+            "files": live,
+            "parsed": {d: v for d, v in self.parsed.items() if d in digests},
+        }
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            text = json.dumps(data)
+            self.cache_path.write_text(text, encoding="utf-8")
+            fs_op("write", len(text))
+        except OSError as e:
+            print(f"  includes cache: not saved ({e})")
+
+def analyze_includes(
+    project_root: Path,
+    extra_dirs: tuple[str, ...] = (),
+    env_include: bool = True,
+    use_cache: bool = True,
+) -> dict:
+    """Граф include'ов проекта: байты на каждый TU из src/, fan-in заголовков
+    и кандидаты в PCH (часто подключаемые и тяжёлые SDK/системные заголовки;
+    заголовки проекта не предлагаются — их правка пересобирает весь PCH)."""
+    spec = load_project_spec(project_root)
+    cfg = build_config(spec.full, spec)
+    root = os.path.abspath(project_root)
+    dirs = [(os.path.join(root, "include"), "project")]
+    dirs += [(d, "sdk") for d in dict.fromkeys(cfg["includes"])]
+    dirs += [(d, "system") for d in extra_dirs]
+    if env_include:
+        # %INCLUDE% из Developer Command Prompt: STL и Windows SDK
+        dirs += [(d, "system") for d in os.environ.get("INCLUDE", "").split(os.pathsep) if d]
+    missing = [d for d, _ in dirs if not os.path.isdir(d)]
+    graph = IncludeGraph([(d, k) for d, k in dirs if os.path.isdir(d)],
+                         project_root / INCLUDES_CACHE_PATH if use_cache else None)
+
+    with phase("scan_project"):
+        files = [rel for rel in scan_project_files(project_root) if rel.startswith(("src/", "include/"))]
+        tus = [rel for rel in files if rel.startswith("src/") and rel.lower().endswith(SOURCE_EXTENSIONS)
+               and rel != "src/pch.cpp"]
+    pch_node = graph.node(os.path.join(root, "include", spec.name, "pch.h")) if spec.pch else None
+    with phase("parse_includes"):
+        for rel in files:
+            node = graph.node(os.path.join(root, *rel.split("/")))
+            graph.kinds.setdefault(node, "project")
+            graph.add(node)
+        graph.save()
+
+    with phase("analyze"):
+        pch_set = graph.closure([pch_node]) if pch_node in graph.edges else set()
+        tu_rows = []
+        tu_fan_in = {}
+        for rel in tus:
+            node = graph.node(os.path.join(root, *rel.split("/")))
+            # .c не получают pch.h (ForcedIncludeFiles только у C++)
+            with_pch = bool(pch_set) and not rel.lower().endswith(".c")
+            seen = graph.closure([pch_node, node] if with_pch else [node])
+            for h in seen - {node}:
+                tu_fan_in[h] = tu_fan_in.get(h, 0) + 1
+            total = sum(graph.sizes.get(h, 0) for h in seen)
+            tu_rows.append({
+                "file": rel,
+                "headers": len(seen) - 1,
+                "bytes": total,
+                "bytes_after_pch": total - sum(graph.sizes.get(h, 0) for h in seen & pch_set) if with_pch else total,
+                "unresolved": sorted(h for h in seen if graph.kinds.get(h) == "unresolved"),
+            })
+        tu_rows.sort(key=lambda r: (-r["bytes"], r["file"]))
+
+        direct_fan_in = {}
+        for src, targets in graph.edges.items():
+            for t in targets:
+                direct_fan_in[t] = direct_fan_in.get(t, 0) + 1
+
+        def label(node: str) -> str:
+            if node.startswith("<"):
+                return node
+            rel = os.path.relpath(node, root)
+            return rel.replace(os.sep, "/") if not rel.startswith("..") else node
+
+        headers = []
+        for h in graph.edges:
+            if h not in direct_fan_in:
+                continue
+            below = graph.closure([h])
+            headers.append({
+                "file": label(h),
+                "include": graph.spelling(h),
+                "kind": graph.kinds.get(h, "project"),
+                "bytes": graph.sizes.get(h, 0),
+                "closure_bytes": sum(graph.sizes.get(x, 0) for x in below),
+                "fan_in": direct_fan_in[h],
+                "tus": tu_fan_in.get(h, 0),
+                "in_pch": h in pch_set,
+                "_node": h,
+            })
+        headers.sort(key=lambda r: (-r["tus"], -r["closure_bytes"], r["file"]))
+
+        # Кандидаты: тяжёлые по TU × байты с учётом вложенных; уже покрытые
+        # выбранным выше кандидатом (или текущим pch.h) пропускаются
+        min_tus = max(2, int(len(tus) * PCH_CANDIDATE_MIN_SHARE + 0.999))
+        ranked = sorted(
+            (r for r in headers if r["kind"] in ("sdk", "system", "unresolved") and r["tus"] >= min_tus),
+            # при равенстве (циклы вроде <map> <-> <debug/map>) — тот, что пишут чаще
+            key=lambda r: (-r["tus"] * max(r["closure_bytes"], 1), -r["fan_in"], r["file"]),
+        )
+        covered = set()
+        candidates = []
+        for r in ranked:
+            if r["_node"] in covered:
+                continue
+            covered |= graph.closure([r["_node"]])
+            candidates.append({
+                "include": r["include"],
+                "tus": r["tus"],
+                "closure_bytes": r["closure_bytes"],
+                "score": r["tus"] * r["closure_bytes"],
+                "in_pch": r["in_pch"],
+            })
+        for r in headers:
+            del r["_node"]
+
+    return {
+        "project": spec.name,
+        "include_dirs": [{"dir": d, "kind": k} for d, k in dirs],
+        "missing_dirs": missing,
+        "pch": label(pch_node) if pch_node else None,
+        "files": len(graph.edges),
+        "cache_hits": graph.hits,
+        "tus": tu_rows,
+        "headers": headers,
+        "pch_candidates": candidates,
+    }
+
+def print_include_report(report: dict, top: int = 15):
+    for d in report["missing_dirs"]:
+        print(f"  include dir not found: {d}")
+    tus = report["tus"]
+    print(f"\n{report['project']}: {len(tus)} TU, {report['files']} files in graph "
+          f"({report['cache_hits']} from cache)")
+    if report["pch"]:
+        print(f"PCH: {report['pch']}")
+
+    print(f"\n{'TU':<40} {'headers':>8} {'KiB':>9} {'KiB w/o PCH':>12}")
+    for r in tus[:top]:
+        print(f"{r['file']:<40} {r['headers']:>8} {r['bytes'] / 1024:>9.1f} {r['bytes_after_pch'] / 1024:>12.1f}")
+    if tus:
+        total = sum(r["bytes"] for r in tus)
+        print(f"{'total':<40} {'':>8} {total / 1024:>9.1f} {sum(r['bytes_after_pch'] for r in tus) / 1024:>12.1f}")
+
+    print(f"\n{'header':<40} {'kind':<10} {'fan-in':>7} {'TUs':>5} {'KiB+deps':>9}")
+    for r in report["headers"][:top]:
+        print(f"{r['include']:<40} {r['kind']:<10} {r['fan_in']:>7} {r['tus']:>5} {r['closure_bytes'] / 1024:>9.1f}")
+
+    print("\nPCH candidates (TUs x KiB with deps):")
+    if not report["pch_candidates"]:
+        print("  (none)")
+    for r in report["pch_candidates"][:top]:
+        note = "  (already in pch.h)" if r["in_pch"] else ""
+        print(f"  #include {r['include']:<32} {r['tus']:>4} x {r['closure_bytes'] / 1024:>8.1f}{note}")
+    unresolved = sorted({h for r in tus for h in r["unresolved"]})
+    if unresolved:
+        print(f"\nUnresolved ({len(unresolved)}, no size; run from a VS Developer Prompt "
+              f"for %INCLUDE% or pass -I): {' '.join(unresolved[:top])}"
+              + (" ..." if len(unresolved) > top else ""))
+
+def cmd_analyze_includes(argv: list[str]):
+    p = argparse.ArgumentParser(
+        prog="VS_build.py analyze-includes",
+        description="Граф #include проекта: байты на TU, fan-in заголовков, кандидаты в PCH",
+    )
+    p.add_argument("project", nargs="?", default=".", help="Папка проекта (по умолчанию текущая)")
+    p.add_argument("-I", "--include-dir", dest="include_dirs", action="append", default=[], metavar="DIR",
+                   help="Доп. include-директория (STL, Windows SDK и т.п.), можно несколько")
+    p.add_argument("--no-env-include", dest="env_include", action="store_false",
+                   help="Не брать директории из переменной INCLUDE")
+    p.add_argument("--json", metavar="FILE", help="Полный отчёт в JSON")
+    p.add_argument("--top", type=int, default=15, metavar="N", help="Строк в каждой таблице (по умолчанию 15)")
+    p.add_argument("--no-cache", dest="cache", action="store_false",
+                   help=f"Не использовать кеш разбора {INCLUDES_CACHE_PATH.as_posix()}")
+    args = p.parse_args(argv)
+    report = analyze_includes(Path(args.project), tuple(args.include_dirs), args.env_include, args.cache)
+    print_include_report(report, args.top)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\nReport:   {args.json}")
+
+# ---- Резидентный режим (serve / client) ----
+
+SERVE_SOCKET_NAME = "vsbuild.sock"
+SERVE_PIPE_PREFIX = "\\\\.\\pipe\\vsbuild-"
+# Команды, которые демон не выполняет (рекурсия)
+SERVE_LOCAL_COMMANDS = ("serve", "client")
+
+def serve_address() -> str:
+    """Адрес демона по умолчанию: именованный канал на Windows, Unix-сокет в остальных ОС
+    (тот же адрес вычисляет vsb_client.py)."""
+    if sys.platform == "win32":
+        import getpass
+        try:
+            user = getpass.getuser()
+        except (ImportError, KeyError, OSError):
+            user = "default"
+        return SERVE_PIPE_PREFIX + user
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    return str(Path(base) / SERVE_SOCKET_NAME if base else sdk_cache_path().parent / SERVE_SOCKET_NAME)
+
+def serve_connect(address: str):
+    """Соединение с демоном (multiprocessing.connection: AF_PIPE на Windows, AF_UNIX
+    в остальных ОС); OSError — демона нет."""
+    from multiprocessing.connection import Client
+    return Client(address)
+
+def serve_exchange(conn, request: dict, timeout: Optional[float] = None) -> dict:
+    """Запрос и ответ — по одному сообщению JSON (send_bytes/recv_bytes, без pickle)."""
+    with conn:
+        conn.send_bytes(json.dumps(request).encode("utf-8"))
+        if timeout is not None and not conn.poll(timeout):
+            raise OSError("daemon did not reply")
+        try:
+            data = conn.recv_bytes()
+        except EOFError:
+            raise ValueError("daemon closed the connection")
+    return json.loads(data)
+
+def serve_run(request: dict, index: Optional[DirIndex] = None) -> dict:
+    """Выполняет {"argv": [...], "cwd": ...} как запуск VS_build.py в этом процессе:
+    вывод перехватывается, записанные файлы и фазы берутся из collect_phases()."""
+    argv = request.get("argv")
+    if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+        return {"ok": False, "exit_code": 2, "output": "bad request: argv must be a list of strings\n"}
+    if argv and argv[0] in SERVE_LOCAL_COMMANDS:
+        return {"ok": False, "exit_code": 2, "output": f"bad request: '{argv[0]}' cannot run inside the daemon\n"}
+
+    out = io.StringIO()
+    code = 0
+    saved_cwd = os.getcwd()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out), collect_phases() as timings:
+        try:
+            os.chdir(request.get("cwd") or saved_cwd)
+            if index is not None:
+                index.invalidate()  # stat'ы заново: изменения SDK видны по mtime директорий
+            main(argv)
+        except SystemExit as e:
+            if isinstance(e.code, str):
+                print(e.code, file=sys.stderr)
+                code = 1
+            else:
+                code = e.code or 0
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            code = 1
+        finally:
+            os.chdir(saved_cwd)
+    elapsed = time.perf_counter() - started
+    return {
+        "ok": code == 0,
+        "exit_code": code,
+        "output": out.getvalue(),
+        "files": list(dict.fromkeys(timings.files)),
+        "timings": dict(timings.to_json(), total=elapsed),
+    }
+
+def cmd_serve(argv: list[str]):
+    p = argparse.ArgumentParser(
+        prog="VS_build.py serve",
+        description="Держит генератор в памяти на локальном сокете: кеш SDK, разобранные импорты DLL "
+                    "и шаблоны не перечитываются между запросами (клиент — VS_build.py client ...).",
+    )
+    p.add_argument("--socket", default=None, metavar="ADDR",
+                   help=f"Путь к Unix-сокету или \\\\.\\pipe\\имя (по умолчанию {serve_address()})")
+    p.add_argument("--idle-timeout", type=float, default=0, metavar="SEC",
+                   help="Завершиться после SEC секунд без запросов (0 — не завершаться)")
+    args = p.parse_args(argv)
+
+    from multiprocessing.connection import Listener
+    address = args.socket or serve_address()
+    try:
+        serve_exchange(serve_connect(address), {"cmd": "ping"}, timeout=2)
+    except (OSError, ValueError):
+        if not address.startswith("\\\\") and os.path.lexists(address):
+            os.unlink(address)  # остался от упавшего демона
+    else:
+        raise SystemExit(f"serve: daemon already running on {address}")
+    if not address.startswith("\\\\"):
+        Path(address).parent.mkdir(parents=True, exist_ok=True)
+
+    global _resident_sdk_index
+    index = _resident_sdk_index = DirIndex(sdk_cache_path())
+    started = time.time()
+    served = [0]
+    # stopping/busy/last — общие с потоком --idle-timeout, под lock
+    state = {"stopping": False, "busy": False, "last": time.monotonic()}
+    lock = threading.Lock()
+
+    def handle(conn):
+        try:
+            request = json.loads(conn.recv_bytes())
+        except (EOFError, OSError, ValueError):
+            request = None
+        cmd = request.get("cmd", "run") if isinstance(request, dict) else None
+        if cmd == "ping":
+            reply = {"ok": True, "pid": os.getpid()}
+        elif cmd == "stats":
+            reply = {
+                "ok": True,
+                "pid": os.getpid(),
+                "requests": served[0],
+                "uptime": time.time() - started,
+                "sdk_dirs": len(index.entries),
+                "runtime_dll_sets": len(_runtime_dll_cache),
+            }
+        elif cmd == "shutdown":
+            reply = {"ok": True}
+            state["stopping"] = True
+        elif cmd == "run":
+            served[0] += 1
+            reply = serve_run(request, index)
+            print(f"  [{served[0]}] {' '.join(request.get('argv') or [])}: "
+                  f"exit {reply['exit_code']}, {reply.get('timings', {}).get('total', 0):.3f}s")
+        else:
+            reply = {"ok": False, "exit_code": 2, "output": "bad request\n"}
+        conn.send_bytes(json.dumps(reply).encode("utf-8"))
+
+    def watch_idle():
+        while True:
+            time.sleep(min(args.idle_timeout, 0.5))
+            with lock:
+                if state["stopping"]:
+                    return
+                if state["busy"] or time.monotonic() - state["last"] < args.idle_timeout:
+                    continue
+                state["stopping"] = True
+            print(f"serve: idle for {args.idle_timeout:g}s, exiting")
+            with contextlib.suppress(OSError):
+                serve_connect(address).close()  # разбудить accept()
+            return
+
+    old_umask = os.umask(0o177)  # сокет только для владельца
+    try:
+        listener = Listener(address)
+    finally:
+        os.umask(old_umask)
+    if args.idle_timeout > 0:
+        threading.Thread(target=watch_idle, daemon=True).start()
+    print(f"serve: listening on {address} (pid {os.getpid()})")
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except OSError:
+                continue
+            with lock:
+                if state["stopping"]:
+                    conn.close()
+                    break
+                state["busy"] = True
+            try:
+                with conn:
+                    handle(conn)
+            except (OSError, EOFError):
+                pass  # клиент ушёл, не дождавшись ответа
+            with lock:
+                state["busy"] = False
+                state["last"] = time.monotonic()
+                if state["stopping"]:
+                    break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        with lock:
+            state["stopping"] = True
+        listener.close()  # Unix-сокет удаляется вместе с ним
+    print(f"serve: stopped after {served[0]} requests")
+
+def cmd_client(argv: list[str]):
+    """client [--socket ADDR] [--json] [--no-fallback] [--] <аргументы VS_build.py>:
+    отправляет запуск демону serve; без демона выполняет его в этом процессе.
+    Клиент без импорта генератора (для плагинов редактора) — vsb_client.py."""
+    address = serve_address()
+    as_json = False
+    fallback = True
+    rest = list(argv)
+    while rest:
+        if rest[0] == "--socket" and len(rest) > 1:
+            address = rest[1]
+            rest = rest[2:]
+        elif rest[0] == "--json":
+            as_json = True
+            rest = rest[1:]
+        elif rest[0] == "--no-fallback":
+            fallback = False
+            rest = rest[1:]
+        elif rest[0] == "--":
+            rest = rest[1:]
+            break
+        else:
+            break
+    if not rest:
+        raise SystemExit("Usage: VS_build.py client [--socket ADDR] [--json] [--no-fallback] [--] <args...>")
+    request = {"cmd": "run", "argv": rest, "cwd": os.getcwd()}
+
+    try:
+        conn = serve_connect(address)
+    except OSError as e:
+        if not fallback:
+            raise SystemExit(f"client: no daemon on {address} ({e})")
+        if not as_json:
+            main(rest)
+            return
+        reply = serve_run(request)
+    else:
+        try:
+            reply = serve_exchange(conn, request)
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"client: daemon failed: {e}")
+
+    if as_json:
+        print(json.dumps(reply, indent=2))
+    else:
+        sys.stdout.write(reply.get("output", ""))
+    code = reply.get("exit_code", 1)
+    if code:
+        raise SystemExit(code)
+
+COMMANDS = {
+    "sync": cmd_sync,
+    "add-file": cmd_add_file,
+    "add-class": cmd_add_class,
+    "pack-assets": cmd_pack_assets,
+    "build-atlas": cmd_build_atlas,
+    "bench": cmd_bench,
+    "analyze-includes": cmd_analyze_includes,
+    "serve": cmd_serve,
+    "client": cmd_client,
+}
+
+def run_instrumented(
+    fn,
+    table: bool = True,
+    json_path: Optional[str] = None,
+    pstats_path: Optional[str] = None,
+    argv: Optional[list[str]] = None,
+) -> Timings:
+    """Выполняет fn() с замером фаз: таблица в stdout, JSON и/или дамп cProfile
+    (смотреть: python -m pstats FILE или snakeviz). cProfile видит только
+    вызывающий поток — пулы потоков в fn() надо отключать (jobs/io_workers = 1).
+    argv — аргументы запуска для JSON (по умолчанию sys.argv[1:])."""
+    profiler = None
+    if pstats_path:
+        import cProfile
+        profiler = cProfile.Profile()
+    with collect_phases() as timings:
+        started = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            fn()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            total = time.perf_counter() - started
+    if table:
+        timings.print_table(total)
+    if json_path:
+        data = dict(timings.to_json(), total=total, argv=sys.argv[1:] if argv is None else argv)
+        Path(json_path).write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+        print(f"Timings:  {json_path}")
+    if profiler is not None:
+        profiler.dump_stats(pstats_path)
+        print(f"Profile:  {pstats_path}")
+    return timings
+
+def main(argv: Optional[list[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        COMMANDS[argv[0]](argv[1:])
+        return
+
     p = argparse.ArgumentParser(
         description="VS2022 SDL2 project generator (minimal v2). SDL2 + SDL2_image, optional SDL2_ttf+SDL2_mixer. DLL copy via MSBuild <Copy>."
     )
-    p.add_argument("name", nargs="?", help="Имя проекта (и папки)")
+    p.add_argument("name", nargs="*", help="Имя проекта (и папки); несколько имён — пакетный режим")
     p.add_argument("-n", "--name", dest="name_opt", help="Имя проекта (альтернатива позиционному)")
     p.add_argument("--out", default=DEFAULT_OUT_DIR, help=f"Папка вывода (по умолчанию {DEFAULT_OUT_DIR})")
 
@@ -566,6 +5235,12 @@ def main():
     p.add_argument("--sdl2-dll-dir", default=SDL2_DLL_DIR)
     p.add_argument("--sdl2img-dll-dir", default=SDL2_IMAGE_DLL_DIR)
 
+    p.add_argument("--sdl-root", default=None,
+                   help=f"Найти SDL2/SDL2_image/SDL2_ttf/SDL2_mixer в папке (например {SDL_ROOT}); "
+                        "явно заданные --sdl2*-пути имеют приоритет")
+    p.add_argument("--no-sdk-cache", dest="sdk_cache", action="store_false",
+                   help="Не использовать кеш листингов SDK")
+
     p.add_argument("--full", action="store_true", help="Добавить SDL2_ttf + SDL2_mixer")
     p.add_argument("--sdl2ttf-inc", default=SDL2_TTF_INCLUDE)
     p.add_argument("--sdl2ttf-lib", default=SDL2_TTF_LIB_X64)
@@ -576,13 +5251,115 @@ def main():
     p.add_argument("--sdl2mixer-dll-dir", default=SDL2_MIXER_DLL_DIR)
 
     p.add_argument("--dotfiles-dir", default=DOTFILES_DIR)
+    p.add_argument("--dotfiles", type=lambda v: [x.strip() for x in v.split(",") if x.strip()], default=None,
+                   help=f"Какие dotFiles брать, через запятую (файлы и папки; \"{DOTFILES_ALL}\" — вся папка). "
+                        f"По умолчанию: {','.join(DOTFILES)}")
+    p.add_argument("--dotfiles-mode", choices=DOTFILES_MODES, default="copy",
+                   help="Как класть dotFiles: copy, link (hardlink), reflink (CoW), auto")
+    p.add_argument("--skeleton", choices=SKELETONS, default="basic",
+                   help="Скелетон App: basic — цикл под VSync; game-loop — фиксированный шаг, "
+                        "интерполяция и профайлер кадров (F3 — оверлей, FRAME_CSV=<файл> — CSV)")
+    p.add_argument("--pch", action="store_true",
+                   help="Предкомпилированный заголовок include\\<Project>\\pch.h (SDL + STL)")
+    p.add_argument("--build-profile", choices=sorted(BUILD_PROFILES), default=None,
+                   help="Профиль скорости сборки: /MP, формат отладочной информации, инкрементальная линковка, LTCG, /Ob /Oi")
+    p.add_argument("--profile-config", action="store_true",
+                   help="Добавить конфигурацию Profile|x64 в .sln и .vcxproj")
+    p.add_argument("--unity", type=int, default=0, metavar="N",
+                   help="Unity-сборка: склеивать src\\*.cpp пачками примерно по N файлов")
+    p.add_argument("--asset-pack", action="store_const", const="store", default=None,
+                   help="Архив ассетов assets.pak (MSBuild-цель + AssetPack в скелетоне)")
+    p.add_argument("--asset-pack-compress", dest="asset_pack", action="store_const", const="deflate",
+                   help="То же со сжатием записей (deflate), где это выгодно")
+    p.add_argument("--atlas", action="store_true",
+                   help="Атласы спрайтов из assets/sprites (MSBuild-цель build-atlas + SpriteAtlas)")
+    p.add_argument("--atlas-max-size", type=int, default=2048, help="Максимальная сторона страницы атласа")
+    p.add_argument("--resource-cache", action="store_const", const=RESOURCE_CACHE_DEFAULT_MB, default=0,
+                   help="ResourceCache в скелетоне: декодирование текстур в фоне, загрузка в GPU "
+                        f"с бюджетом на кадр, LRU в пределах {RESOURCE_CACHE_DEFAULT_MB} МБ")
+    p.add_argument("--resource-cache-mb", type=int, default=None, metavar="MB",
+                   help="То же с другим бюджетом памяти текстур, МБ")
+    p.add_argument("--static", dest="static_link", action="store_true",
+                   help="Статическая линковка SDL (*-static.lib, системные .lib, LTCG, без копирования DLL)")
+    p.add_argument("--dll-copy", choices=["imports", "glob"], default="imports",
+                   help="Какие DLL копировать в bin: нужные по таблицам импорта (по умолчанию) или все *.dll")
+    p.add_argument("--backend", dest="backends", type=parse_backends, default=["msbuild"],
+                   help=f"Бэкенды сборки через запятую: {', '.join(BACKENDS)} (по умолчанию msbuild)")
+    p.add_argument("--unity-configs", type=lambda v: [x.strip() for x in v.split(",") if x.strip()], default=None,
+                   help="Конфигурации с unity-сборкой, через запятую (по умолчанию все)")
     p.add_argument("--git", action="store_true")
+    p.add_argument("--git-commit", action="store_true",
+                   help="git init + первый коммит всех файлов проекта (git add -A + git commit)")
+    p.add_argument("--git-author", default=None, metavar="'NAME <EMAIL>'",
+                   help="Автор первого коммита (по умолчанию из GIT_AUTHOR_* или конфига git)")
+    p.add_argument("--git-message", default=GIT_COMMIT_MESSAGE,
+                   help=f"Сообщение первого коммита (по умолчанию \"{GIT_COMMIT_MESSAGE}\")")
     p.add_argument("--fail-on-missing", action="store_true")
+    p.add_argument("--incremental", action="store_true",
+                   help="Перезаписывать только изменившиеся файлы (манифест .vsbuild/manifest.json)")
+
+    p.add_argument("--batch", metavar="FILE",
+                   help="Файл со списком проектов (.json, .toml или по имени на строку)")
+    p.add_argument("--batch-sln", default=BATCH_SLN_NAME,
+                   help=f"Имя общего .sln для пакетного режима (по умолчанию {BATCH_SLN_NAME})")
+    p.add_argument("-j", "--jobs", type=int, default=None, help="Потоков в пакетном режиме")
+    p.add_argument("--timings", action="store_true",
+                   help="Таблица времени по фазам и счётчики файловых операций в конце")
+    p.add_argument("--timings-json", metavar="FILE", help="То же в JSON (фазы, файловые операции, total)")
+    p.add_argument("--pyprofile", metavar="FILE",
+                   help="Дамп cProfile (pstats) всего запуска, без пулов потоков (-j 1, --io-workers 1); "
+                        "--profile-* уже заняты конфигурацией Profile")
+    p.add_argument("--io-workers", type=int, default=IO_WORKERS,
+                   help=f"Параллельных stat/копирований при проверке SDK и записи (по умолчанию {IO_WORKERS}; 1 — последовательно)")
 
-    args = p.parse_args()
-    proj_name = args.name or args.name_opt
-    if not proj_name:
+    args = p.parse_args(argv)
+    names = list(args.name)
+    if args.name_opt:
+        names.append(args.name_opt)
+    if args.batch:
+        names += read_batch_file(args.batch)
+    if not names:
         p.error("Не указано имя проекта. Пример: python3 VS_build.py TestProject")
+    if args.jobs is not None and args.jobs < 1:
+        p.error("--jobs должен быть >= 1")
+    if args.io_workers < 1:
+        p.error("--io-workers должен быть >= 1")
+    if args.pyprofile:
+        # cProfile профилирует только текущий поток: всё — последовательно
+        args.jobs = args.io_workers = 1
+    if args.unity < 0:
+        p.error("--unity должен быть >= 0")
+    if args.unity_configs is not None:
+        known = CONFIGURATIONS + [PROFILE_CONFIG]
+        for name in args.unity_configs:
+            if name not in known:
+                hint = next((c for c in known if c.lower() == name.lower()), None)
+                p.error(f"--unity-configs: неизвестная конфигурация {name!r}"
+                        + (f" (имеется в виду {hint!r}?)" if hint else f", допустимы: {', '.join(known)}"))
+        if PROFILE_CONFIG in args.unity_configs and not args.profile_config:
+            p.error(f"--unity-configs: {PROFILE_CONFIG} есть только с --profile-config")
+    if args.resource_cache_mb is not None:
+        if args.resource_cache_mb < 1:
+            p.error("--resource-cache-mb должен быть >= 1")
+        args.resource_cache = args.resource_cache_mb
+    if args.git_author is not None:
+        try:
+            parse_git_author(args.git_author)
+        except ValueError as e:
+            p.error(f"--git-author: {e}")
+    args.git = args.git or args.git_commit
+
+    args.sdk_index = open_sdk_index(args)
+    if args.sdl_root:
+        found = discover_sdl(args.sdl_root, args.sdk_index)
+        if not found:
+            print(f"  sdl: nothing found in {args.sdl_root}")
+        defaults = {
+            f"{prefix}_{suffix}": p.get_default(f"{prefix}_{suffix}")
+            for prefix in SDL_PACKAGES.values()
+            for suffix in ("inc", "lib", "dll_dir")
+        }
+        apply_discovered_sdl(args, found, defaults)
 
     # normalize
     args.out = norm(args.out)
@@ -604,14 +5381,33 @@ def main():
 
     args.dotfiles_dir = norm(args.dotfiles_dir)
 
-    generate(
-        project_name=proj_name,
-        out_dir=args.out,
-        full=args.full,
-        do_git=args.git,
-        fail_on_missing=args.fail_on_missing,
-        args=args,
-    )
+    def run():
+        if len(names) > 1 or args.batch:
+            generate_batch(
+                project_names=names,
+                out_dir=args.out,
+                full=args.full,
+                do_git=args.git,
+                fail_on_missing=args.fail_on_missing,
+                args=args,
+                jobs=args.jobs,
+                sln_name=args.batch_sln,
+            )
+            return
+
+        generate(
+            project_name=names[0],
+            out_dir=args.out,
+            full=args.full,
+            do_git=args.git,
+            fail_on_missing=args.fail_on_missing,
+            args=args,
+        )
+
+    if not (args.timings or args.timings_json or args.pyprofile):
+        run()
+        return
+    run_instrumented(run, args.timings, args.timings_json, args.pyprofile, argv)
 
 if __name__ == "__main__":
     main()
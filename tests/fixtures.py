@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# Фикстуры тестов: PE-DLL, архивы COFF (import- и статические .lib), фейковый SDK.
+# Собираются здесь по спецификации PE/COFF, а не берутся из генератора (bench_* в
+# VS_build.py — свои, для замеров), чтобы ошибка в одном не пряталась другим.
+
+import argparse
+import struct
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import VS_build as vsb  # noqa: E402
+
+FILE_ALIGN = 0x200
+SECTION_ALIGN = 0x1000
+IMAGE_BASE = 0x180000000
+IMAGE_BASE_PE32 = 0x10000000
+SECTION = struct.Struct("<8sIIIIIIHHI")
+IMPORT_DESCRIPTOR = struct.Struct("<IIIII")
+DELAY_DESCRIPTOR = struct.Struct("<8I")
+
+def align(n: int, to: int) -> int:
+    return (n + to - 1) // to * to
+
+def pe_dll(imports: list[str], delay_imports: list[str] = (), pe32: bool = False, delay_va: bool = False) -> bytes:
+    """DLL из двух секций (.text и .rdata): таблица импорта и, если задано, отложенного
+    импорта (delay_va — старый формат ImgDelayDescr с VA вместо RVA, только PE32)."""
+    rdata_rva = 2 * SECTION_ALIGN
+    names_at = IMPORT_DESCRIPTOR.size * (len(imports) + 1) + DELAY_DESCRIPTOR.size * (len(delay_imports) + 1)
+    names = b""
+
+    def name_rva(dll: str) -> int:
+        nonlocal names
+        rva = rdata_rva + names_at + len(names)
+        names += dll.encode("ascii") + b"\0"
+        return rva
+
+    rdata = b"".join(IMPORT_DESCRIPTOR.pack(0, 0, 0, name_rva(dll), 0) for dll in imports)
+    rdata += b"\0" * IMPORT_DESCRIPTOR.size
+    delay_rva = rdata_rva + len(rdata)
+    base = IMAGE_BASE_PE32 if pe32 else IMAGE_BASE
+    for dll in delay_imports:
+        rva = name_rva(dll)
+        rdata += DELAY_DESCRIPTOR.pack(0 if delay_va else 1, rva + base if delay_va else rva, 0, 0, 0, 0, 0, 0)
+    rdata += b"\0" * DELAY_DESCRIPTOR.size + names
+    text = b"\xc3"  # ret
+
+    dirs = [(0, 0)] * 16
+    dirs[1] = (rdata_rva, IMPORT_DESCRIPTOR.size * (len(imports) + 1))
+    if delay_imports:
+        dirs[13] = (delay_rva, DELAY_DESCRIPTOR.size * (len(delay_imports) + 1))
+    if pe32:
+        opt = struct.pack("<HBBIIIIII", 0x10B, 14, 0, FILE_ALIGN, FILE_ALIGN, 0, 0, SECTION_ALIGN, 0)
+        opt += struct.pack("<III", base, SECTION_ALIGN, FILE_ALIGN)
+    else:
+        opt = struct.pack("<HBBIIIII", 0x20B, 14, 0, FILE_ALIGN, FILE_ALIGN, 0, 0, SECTION_ALIGN)
+        opt += struct.pack("<QII", base, SECTION_ALIGN, FILE_ALIGN)
+    # Версии, размеры образа и заголовков, стек/куча — нулями; затем NumberOfRvaAndSizes
+    opt += b"\0" * ((92 if pe32 else 108) - len(opt)) + struct.pack("<I", len(dirs))
+    opt += b"".join(struct.pack("<II", *d) for d in dirs)
+
+    pe_at = 0x80
+    headers_size = align(pe_at + 24 + len(opt) + 2 * SECTION.size, FILE_ALIGN)
+    text_raw = headers_size
+    rdata_raw = text_raw + FILE_ALIGN
+    coff = struct.pack("<HHIIIHH", 0x14C if pe32 else 0x8664, 2, 0, 0, 0, len(opt), 0x2102 if pe32 else 0x2022)
+    sections = (
+        SECTION.pack(b".text", len(text), SECTION_ALIGN, FILE_ALIGN, text_raw, 0, 0, 0, 0, 0x60000020)
+        + SECTION.pack(b".rdata", len(rdata), rdata_rva, align(len(rdata), FILE_ALIGN), rdata_raw, 0, 0, 0, 0, 0x40000040)
+    )
+    dos = bytearray(pe_at)
+    dos[:2] = b"MZ"
+    struct.pack_into("<I", dos, 0x3C, pe_at)
+    image = bytes(dos) + b"PE\0\0" + coff + opt + sections
+    image += b"\0" * (text_raw - len(image)) + text
+    image += b"\0" * (rdata_raw - len(image)) + rdata
+    return image + b"\0" * (align(len(image), FILE_ALIGN) - len(image))
+
+def ar_member(name: str, body: bytes) -> bytes:
+    header = f"{name:<16}{0:<12}{0:<6}{0:<6}{644:<8}{len(body):<10}`\n".encode("ascii")
+    return header + body + (b"\n" if len(body) % 2 else b"")
+
+def import_lib(dll: str, symbols: list[str] = ("SDL_Init", "SDL_Quit")) -> bytes:
+    """Import-библиотека: компоновочный член "/" и по short import object на символ."""
+    linker = struct.pack(">I", len(symbols)) + b"\0" * 4 * len(symbols)
+    linker += b"".join(f"__imp_{s}\0".encode("ascii") for s in symbols)
+    out = [b"!<arch>\n", ar_member("/", linker)]
+    for hint, symbol in enumerate(symbols):
+        payload = f"{symbol}\0{dll}\0".encode("ascii")
+        # IMPORT_OBJECT_HEADER: Sig1, Sig2, Version, Machine, TimeDateStamp, SizeOfData, Hint, Type
+        out.append(ar_member(f"{dll}/", struct.pack("<HHHHIIHH", 0, 0xFFFF, 0, 0x8664, 0, len(payload), hint, 0) + payload))
+    return b"".join(out)
+
+def static_lib() -> bytes:
+    """Статическая библиотека: архив с обычным COFF-объектом, без import objects."""
+    obj = struct.pack("<HHIIIHH", 0x8664, 0, 0, 0, 0, 0, 0)
+    return b"!<arch>\n" + ar_member("/", struct.pack(">I", 0)) + ar_member("main.obj/", obj)
+
+# папка: (заголовки, import-библиотеки, {DLL: импорты})
+SDK_LAYOUT = {
+    "SDL2": (["SDL.h"], ["SDL2"], {"SDL2.dll": ["KERNEL32.dll", "USER32.dll"]}),
+    "SDL2_image": (["SDL_image.h"], ["SDL2_image"], {
+        "SDL2_image.dll": ["SDL2.dll", "KERNEL32.dll", "libpng16-16.dll"],
+        "libpng16-16.dll": ["zlib1.dll", "KERNEL32.dll"],
+        "zlib1.dll": ["KERNEL32.dll"],
+        "libwebp-7.dll": ["KERNEL32.dll"],
+    }),
+    "SDL2_ttf": (["SDL_ttf.h"], ["SDL2_ttf"], {"SDL2_ttf.dll": ["SDL2.dll", "KERNEL32.dll"]}),
+    "SDL2_mixer": (["SDL_mixer.h"], ["SDL2_mixer"], {"SDL2_mixer.dll": ["SDL2.dll", "KERNEL32.dll"]}),
+}
+SDK_PREFIXES = (("sdl2", "SDL2"), ("sdl2img", "SDL2_image"), ("sdl2ttf", "SDL2_ttf"), ("sdl2mixer", "SDL2_mixer"))
+
+def fake_sdk(root: Path) -> dict:
+    """SDK как в VC-архивах SDL (include/ + lib/x64 с .lib и .dll) и папка dotFiles.
+    Возвращает значения полей ProjectSpec."""
+    fields = {}
+    for prefix, name in SDK_PREFIXES:
+        headers, implibs, dlls = SDK_LAYOUT[name]
+        inc = root / name / "include"
+        lib = root / name / "lib" / "x64"
+        inc.mkdir(parents=True, exist_ok=True)
+        lib.mkdir(parents=True, exist_ok=True)
+        for header in headers:
+            (inc / header).write_text("#pragma once\n", encoding="utf-8")
+        for stem in implibs:
+            (lib / f"{stem}.lib").write_bytes(import_lib(f"{stem}.dll"))
+        for dll, imports in dlls.items():
+            (lib / dll).write_bytes(pe_dll(imports))
+        fields[f"{prefix}_inc"], fields[f"{prefix}_lib"], fields[f"{prefix}_dll_dir"] = str(inc), str(lib), str(lib)
+    (root / "SDL2" / "lib" / "x64" / "SDL2main.lib").write_bytes(static_lib())
+
+    dot = root / "dotFiles"
+    dot.mkdir(exist_ok=True)
+    for name in vsb.DOTFILES:
+        (dot / name).write_text(f"# {name}\n", encoding="utf-8")
+    fields["dotfiles_dir"] = str(dot)
+    return fields
+
+def cli_args(sdk: dict, **overrides) -> argparse.Namespace:
+    """args как у CLI для fake_sdk, кеш SDK только в памяти."""
+    values = dict(sdk, dotfiles=None, dotfiles_mode="copy", io_workers=1,
+                  incremental=False, sdk_index=vsb.DirIndex(None))
+    values.update(overrides)
+    return argparse.Namespace(**values)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# add-file: пути только внутри проекта, заготовки — только для исходников и заголовков.
+#
+#   python -m pytest -q tests
+#   python -m unittest discover tests
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import VS_build as vsb  # noqa: E402
+
+class AddFileTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        spec = vsb.ProjectSpec(name="Demo", dotfiles_dir=None)
+        vsb.materialize(vsb.render(spec), tmp.name, quiet=True)
+        self.root = Path(tmp.name) / "Demo"
+
+    def vcxproj(self) -> str:
+        return (self.root / "Demo.vcxproj").read_text(encoding="utf-8-sig")
+
+    def test_project_rel(self):
+        root = self.root
+        self.assertEqual(vsb.project_rel(root, "src/render/gl.cpp"), "src/render/gl.cpp")
+        self.assertEqual(vsb.project_rel(root, "src/./x/../gl.cpp"), "src/gl.cpp")
+        self.assertEqual(vsb.project_rel(root, str(root / "include" / "a.h")), "include/a.h")
+        for bad in ("../x.cpp", "src/../../x.cpp", "src/a/../../../x.cpp", ".", "src/..", str(root.parent / "x.cpp")):
+            with self.subTest(path=bad), self.assertRaises(SystemExit):
+                vsb.project_rel(root, bad)
+
+    def test_escaping_path_writes_nothing(self):
+        before = self.vcxproj()
+        with self.assertRaises(SystemExit):
+            vsb.cmd_add_file(["src/../../evil.cpp", "-C", str(self.root), "-q"])
+        self.assertFalse((self.root.parent / "evil.cpp").exists())
+        self.assertEqual(self.vcxproj(), before)
+
+    def test_creates_code_stubs(self):
+        vsb.cmd_add_file(["src/render/batch.cpp", "include/Demo/batch.h", "-C", str(self.root), "-q"])
+        self.assertEqual((self.root / "src/render/batch.cpp").read_text(encoding="utf-8"), "")
+        self.assertEqual((self.root / "include/Demo/batch.h").read_text(encoding="utf-8"), vsb.HEADER_STUB)
+        text = self.vcxproj()
+        self.assertIn('<ClCompile Include="src\\render\\batch.cpp"', text)
+        self.assertIn('<ClInclude Include="include\\Demo\\batch.h"', text)
+
+    def test_missing_binary_asset_is_rejected(self):
+        before = self.vcxproj()
+        with self.assertRaises(SystemExit):
+            vsb.cmd_add_file(["src/extra.cpp", "assets/ui.png", "-C", str(self.root), "-q"])
+        self.assertFalse((self.root / "assets/ui.png").exists())
+        # Проверка до записи: и .cpp из того же вызова не создан
+        self.assertFalse((self.root / "src/extra.cpp").exists())
+        self.assertEqual(self.vcxproj(), before)
+
+    def test_existing_asset_is_registered(self):
+        png = self.root / "assets" / "ui.png"
+        png.write_bytes(b"\x89PNG\r\n\x1a\n")
+        vsb.cmd_add_file(["assets/ui.png", "-C", str(self.root), "-q"])
+        self.assertEqual(png.read_bytes(), b"\x89PNG\r\n\x1a\n")
+        self.assertIn('<None Include="assets\\ui.png"', self.vcxproj())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+# Ассеты: архив VSPK (через копию tools/vsb_assets.py в проекте, отдельным процессом),
+# упаковщик MaxRects и PNG. Архив, PNG и индекс атласа читаются здесь независимо
+# от vsb_assets — по описанию форматов в README.
+#
+#   python -m pytest -q tests
+#   python -m unittest discover tests
+
+import json
+import random
+import struct
+import subprocess
+import sys
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import VS_build as vsb  # noqa: E402
+import vsb_assets  # noqa: E402
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def read_pack(data: bytes) -> dict:
+    """VSPK: заголовок <4sIII>, записи <QIIIHHII> по байтам имени, имена, данные по 16 байт."""
+    magic, version, count, names_size = struct.unpack_from("<4sIII", data, 0)
+    assert (magic, version) == (b"VSPK", 1), (magic, version)
+    names_at = 16 + 32 * count
+    data_start = names_at + names_size
+    out, prev_name, prev_end = {}, None, data_start
+    for i in range(count):
+        offset, size, raw_size, name_offset, name_len, flags, crc, zero = struct.unpack_from("<QIIIHHII", data, 16 + 32 * i)
+        assert zero == 0 and offset % 16 == 0 and offset >= prev_end, (i, offset)
+        name = data[names_at + name_offset:names_at + name_offset + name_len]
+        assert prev_name is None or prev_name < name, (prev_name, name)
+        stored = data[offset:offset + size]
+        if flags == 1:
+            body = zlib.decompressobj(-15).decompress(stored)
+        else:
+            assert flags == 0 and size == raw_size, (name, flags)
+            body = stored
+        assert len(body) == raw_size and zlib.crc32(body) == crc, name
+        out[name.decode("utf-8")] = (body, flags)
+        prev_name, prev_end = name, offset + size
+    return out
+
+def paeth(a: int, b: int, c: int) -> int:
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    return a if pa <= pb and pa <= pc else b if pb <= pc else c
+
+def png_chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+def encode_png(width: int, height: int, rgba: bytes) -> bytes:
+    """RGBA8 PNG, у каждой строки свой фильтр (0..4 по кругу)."""
+    stride, bpp = width * 4, 4
+    rows, prev = [], bytes(stride)
+    for y in range(height):
+        line, ftype = rgba[y * stride:(y + 1) * stride], y % 5
+        out = bytearray()
+        for i, x in enumerate(line):
+            a = line[i - bpp] if i >= bpp else 0
+            b = prev[i]
+            c = prev[i - bpp] if i >= bpp else 0
+            pred = (0, a, b, (a + b) >> 1, paeth(a, b, c))[ftype]
+            out.append((x - pred) & 0xFF)
+        rows.append(bytes([ftype]) + bytes(out))
+        prev = line
+    return (PNG_SIGNATURE + png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+            + png_chunk(b"IDAT", zlib.compress(b"".join(rows))) + png_chunk(b"IEND", b""))
+
+def decode_png(data: bytes) -> tuple[int, int, bytes]:
+    """RGBA8 PNG -> (w, h, пиксели) с проверкой CRC всех чанков."""
+    assert data.startswith(PNG_SIGNATURE)
+    pos, idat, ihdr = 8, b"", None
+    while pos < len(data):
+        length, kind = struct.unpack_from(">I4s", data, pos)
+        body = data[pos + 8:pos + 8 + length]
+        assert struct.unpack_from(">I", data, pos + 8 + length)[0] == zlib.crc32(kind + body), kind
+        if kind == b"IHDR":
+            ihdr = struct.unpack(">IIBBBBB", body)
+        elif kind == b"IDAT":
+            idat += body
+        pos += 12 + length
+    width, height, depth, ctype, _, _, interlace = ihdr
+    assert (depth, ctype, interlace) == (8, 6, 0), ihdr
+    raw, stride, bpp = zlib.decompress(idat), width * 4, 4
+    out, prev = bytearray(), bytearray(stride)
+    for y in range(height):
+        ftype, line = raw[y * (stride + 1)], bytearray(raw[y * (stride + 1) + 1:(y + 1) * (stride + 1)])
+        for i in range(stride):
+            a = line[i - bpp] if i >= bpp else 0
+            b = prev[i]
+            c = prev[i - bpp] if i >= bpp else 0
+            line[i] = (line[i] + (0, a, b, (a + b) >> 1, paeth(a, b, c))[ftype]) & 0xFF
+        out += line
+        prev = line
+    return width, height, bytes(out)
+
+def noise(rng: random.Random, n: int) -> bytes:
+    return bytes(rng.randrange(256) for _ in range(n))
+
+class AssetPackToolTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        spec = vsb.ProjectSpec(name="Demo", dotfiles_dir=None, asset_pack="deflate")
+        vsb.materialize(vsb.render(spec), tmp.name, quiet=True)
+        self.root = Path(tmp.name) / "Demo"
+        self.tool = self.root / vsb.PACK_TOOL_PATH
+        rng = random.Random(1)
+        self.files = {
+            "config.json": json.dumps({"volume": 0.5, "keys": list(range(200))}).encode("utf-8"),
+            "levels/01.txt": b"#....#\n" * 200,
+            "levels/02.txt": b"",
+            "sprites/hero.png": PNG_SIGNATURE + b"\0" * 600,
+            "sounds/шаг.wav": noise(rng, 3000),
+            "Z_upper.txt": b"upper\n",
+            "a/b/c/deep.bin": bytes(range(256)) * 4,
+        }
+        for rel, data in self.files.items():
+            path = self.root / "assets" / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        (self.root / "assets" / "levels" / ".hidden").write_bytes(b"skip me")
+
+    def pack(self, *extra: str) -> dict:
+        out = self.root / "bin" / "assets.pak"
+        subprocess.run(
+            [sys.executable, str(self.tool), "pack-assets", str(self.root / "assets"), str(out), "-q", *extra],
+            check=True, capture_output=True, cwd=str(self.root),
+        )
+        return read_pack(out.read_bytes())
+
+    def expected(self) -> dict:
+        # .keep скелетона тоже уходит в архив; скрытые файлы — нет
+        found = {rel: data for rel, data in self.files.items()}
+        for path in (self.root / "assets").rglob("*"):
+            rel = path.relative_to(self.root / "assets").as_posix()
+            if path.is_file() and not path.name.startswith(".") and rel not in found:
+                found[rel] = path.read_bytes()
+        return found
+
+    def test_tool_is_verbatim_copy(self):
+        self.assertEqual(self.tool.read_bytes(), Path(vsb_assets.__file__).read_bytes())
+
+    def test_round_trip(self):
+        entries = self.pack()
+        self.assertEqual({rel: body for rel, (body, _) in entries.items()}, self.expected())
+        self.assertTrue(all(flags == 0 for _, flags in entries.values()))
+
+    def test_round_trip_compressed_and_incremental(self):
+        entries = self.pack("--compress")
+        self.assertEqual({rel: body for rel, (body, _) in entries.items()}, self.expected())
+        self.assertEqual(entries["levels/01.txt"][1], 1)
+        # Уже сжатые форматы и несжимаемые данные хранятся как есть
+        self.assertEqual(entries["sprites/hero.png"][1], 0)
+        self.assertEqual(entries["sounds/шаг.wav"][1], 0)
+
+        # Второй проход берёт неизменившиеся записи из старого архива
+        (self.root / "assets" / "levels" / "01.txt").write_bytes(b"changed\n" * 100)
+        (self.root / "assets" / "config.json").unlink()
+        (self.root / "assets" / "levels" / "03.txt").write_bytes(b"new level\n" * 50)
+        self.files["levels/01.txt"] = b"changed\n" * 100
+        self.files["levels/03.txt"] = b"new level\n" * 50
+        del self.files["config.json"]
+        entries = self.pack("--compress")
+        self.assertEqual({rel: body for rel, (body, _) in entries.items()}, self.expected())
+
+    def test_exclude(self):
+        entries = self.pack("--exclude", "sprites")
+        self.assertNotIn("sprites/hero.png", entries)
+        self.assertIn("levels/01.txt", entries)
+
+class MaxRectsTest(unittest.TestCase):
+    def assert_disjoint(self, rects: list, width: int, height: int):
+        for i, (x, y, w, h) in enumerate(rects):
+            self.assertTrue(0 <= x and 0 <= y and x + w <= width and y + h <= height, (x, y, w, h))
+            for x2, y2, w2, h2 in rects[:i]:
+                self.assertTrue(x + w <= x2 or x2 + w2 <= x or y + h <= y2 or y2 + h2 <= y,
+                                ((x, y, w, h), (x2, y2, w2, h2)))
+
+    def test_insert_never_overlaps(self):
+        rng = random.Random(7)
+        bins = vsb_assets.MaxRects(256, 256)
+        placed, misses = [], 0
+        for _ in range(300):
+            w, h = rng.randint(1, 48), rng.randint(1, 48)
+            pos = bins.insert(w, h)
+            if pos is None:
+                misses += 1
+            else:
+                placed.append((pos[0], pos[1], w, h))
+        self.assertGreater(len(placed), 40)
+        self.assertGreater(misses, 0)
+        self.assert_disjoint(placed, 256, 256)
+
+    def test_exact_fit(self):
+        bins = vsb_assets.MaxRects(64, 64)
+        spots = {bins.insert(32, 32) for _ in range(4)}
+        self.assertEqual(spots, {(0, 0), (32, 0), (0, 32), (32, 32)})
+        self.assertIsNone(bins.insert(1, 1))
+
+    def test_pack_rects_pages(self):
+        rng = random.Random(3)
+        sizes = {f"s{i:03d}": (rng.randint(4, 120), rng.randint(4, 120)) for i in range(150)}
+        pages = vsb_assets.pack_rects(sizes, 256, 2)
+        self.assertGreater(len(pages), 1)
+        seen = set()
+        for width, height, placed in pages:
+            self.assertLessEqual(max(width, height), 256)
+            self.assertEqual(width & (width - 1), 0)
+            self.assertEqual(height & (height - 1), 0)
+            # С отступом padding справа и снизу спрайты тоже не соприкасаются
+            self.assert_disjoint([(x, y, sizes[n][0] + 2, sizes[n][1] + 2) for n, (x, y) in placed.items()],
+                                 width + 2, height + 2)
+            self.assertFalse(seen & set(placed))
+            seen |= set(placed)
+        self.assertEqual(seen, set(sizes))
+
+    def test_small_set_fits_smallest_page(self):
+        pages = vsb_assets.pack_rects({"a": (16, 16), "b": (16, 16), "c": (16, 16), "d": (16, 16)}, 1024, 0)
+        self.assertEqual([(w, h) for w, h, _ in pages], [(32, 32)])
+
+    def test_oversized_sprite_fails(self):
+        with self.assertRaises(SystemExit):
+            vsb_assets.pack_rects({"big": (300, 10)}, 256, 0)
+
+class PngTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.rng = random.Random(5)
+
+    def test_write_is_valid_png(self):
+        for width, height in ((1, 1), (7, 3), (33, 17)):
+            with self.subTest(size=(width, height)):
+                rgba = noise(self.rng, width * height * 4)
+                self.assertEqual(decode_png(vsb_assets.png_write(width, height, rgba)), (width, height, rgba))
+
+    def test_read_all_filters(self):
+        width, height = 13, 11
+        rgba = noise(self.rng, width * height * 4)
+        path = self.dir / "filters.png"
+        path.write_bytes(encode_png(width, height, rgba))
+        self.assertEqual(vsb_assets.png_read(path), (width, height, bytearray(rgba)))
+
+    def test_write_read_round_trip(self):
+        rgba = noise(self.rng, 20 * 9 * 4)
+        path = self.dir / "rt.png"
+        path.write_bytes(vsb_assets.png_write(20, 9, rgba))
+        self.assertEqual(vsb_assets.png_read(path), (20, 9, bytearray(rgba)))
+
+    def test_atlas_pages_hold_sprites(self):
+        sprites = self.dir / "sprites" / "ui"
+        sprites.mkdir(parents=True)
+        images = {}
+        for i in range(12):
+            w, h = self.rng.randint(3, 40), self.rng.randint(3, 40)
+            images[f"icon{i:02d}"] = (w, h, noise(self.rng, w * h * 4))
+            (sprites / f"icon{i:02d}.png").write_bytes(encode_png(*images[f"icon{i:02d}"]))
+        out = self.dir / "atlases"
+        self.assertEqual(vsb_assets.build_atlases(self.dir / "sprites", out, max_size=64, quiet=True, io_workers=1), ["ui"])
+
+        data = (out / "ui.atlas").read_bytes()
+        magic, version, npages, nsprites, names_size = struct.unpack_from("<4sIIII", data, 0)
+        self.assertEqual((magic, version, nsprites), (b"VSAT", 1, len(images)))
+        names_at = 20 + 16 * npages + 20 * nsprites
+        names = data[names_at:names_at + names_size]
+        pages = []
+        for i in range(npages):
+            off, length, width, height = struct.unpack_from("<IIII", data, 20 + 16 * i)
+            page = decode_png((out / names[off:off + length].decode("utf-8")).read_bytes())
+            self.assertEqual(page[:2], (width, height))
+            pages.append(page)
+        for i in range(nsprites):
+            off, length, page_no, x, y, w, h, _ = struct.unpack_from("<IIHHHHHH", data, 20 + 16 * npages + 20 * i)
+            name = names[off:off + length].decode("utf-8")
+            self.assertEqual((w, h), images[name][:2])
+            width, _, px = pages[page_no]
+            for row in range(h):
+                at = ((y + row) * width + x) * 4
+                self.assertEqual(px[at:at + w * 4], images[name][2][row * w * 4:(row + 1) * w * 4], name)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# Настройки конфигураций .vcxproj: профили сборки (--build-profile) вместе со --static.
+#
+#   python -m pytest -q tests
+
+import sys
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import VS_build as vsb  # noqa: E402
+
+NS = {"m": "http://schemas.microsoft.com/developer/msbuild/2003"}
+
+def vcxproj(**fields) -> ET.Element:
+    spec = vsb.ProjectSpec(name="Demo", dotfiles_dir=None, profile_config=True, **fields)
+    return ET.fromstring(vsb.render(spec).files["Demo.vcxproj"])
+
+def config_group(root: ET.Element, tag: str, config: str, label: str = None) -> dict:
+    """Свойства группы tag с условием для config|x64: {имя: значение}."""
+    for group in root.iterfind(f"m:{tag}", NS):
+        if f"'{config}|x64'" in group.get("Condition", "") and group.get("Label") == label:
+            return {child.tag.split("}")[1]: child for child in group}
+    raise AssertionError(f"no {tag} for {config}")
+
+class ReleaseLtcgTest(unittest.TestCase):
+    def check(self, profile, static: bool):
+        root = vcxproj(build_profile=profile, static_link=static)
+        for config in ("Release", vsb.PROFILE_CONFIG):
+            with self.subTest(profile=profile, static=static, config=config):
+                props = config_group(root, "PropertyGroup", config, "Configuration")
+                items = config_group(root, "ItemDefinitionGroup", config)
+                wpo = props["WholeProgramOptimization"].text == "true"
+                link = {child.tag.split("}")[1]: child.text for child in items["Link"]}
+                ltcg = link.get("LinkTimeCodeGeneration") == "UseLinkTimeCodeGeneration"
+                # fast-iterate/balanced выключают LTCG и со --static
+                self.assertEqual(wpo, profile not in ("fast-iterate", "balanced"))
+                # /LTCG линкера — только вместе с /GL
+                if ltcg:
+                    self.assertTrue(wpo)
+                if static and wpo:
+                    self.assertTrue(ltcg)
+
+    def test_profiles(self):
+        for profile in [None] + sorted(vsb.BUILD_PROFILES):
+            for static in (False, True):
+                self.check(profile, static)
+
+    def test_fast_iterate_static_release_links_incrementally(self):
+        root = vcxproj(build_profile="fast-iterate", static_link=True)
+        items = config_group(root, "ItemDefinitionGroup", "Release")
+        self.assertNotIn("LinkTimeCodeGeneration", {c.tag.split("}")[1] for c in items["Link"]})
+        props = config_group(root, "PropertyGroup", "Release")
+        self.assertEqual(props["LinkIncremental"].text, "true")
+        # Статические библиотеки SDL при этом остаются
+        deps = {c.tag.split("}")[1]: c.text for c in items["Link"]}["AdditionalDependencies"]
+        self.assertIn("SDL2" + vsb.STATIC_LIB_SUFFIX, deps)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# --git-commit: первый коммит через git add -A + git commit, рабочее дерево после него чистое.
+# Конфиг git изолирован (HOME/XDG_CONFIG_HOME во временной папке); без git тесты пропускаются.
+#
+#   python -m pytest -q tests
+#   python -m unittest discover tests
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import VS_build as vsb  # noqa: E402
+
+AUTHOR = "Test Author <test@example.com>"
+
+@unittest.skipIf(shutil.which("git") is None, "git not found in PATH")
+class GitCommitInitialTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        home = Path(tmp.name) / "home"
+        home.mkdir()
+        self.gitconfig = home / ".gitconfig"
+        env = mock.patch.dict(os.environ, {
+            "HOME": str(home), "XDG_CONFIG_HOME": str(home / ".config"), "GIT_CONFIG_NOSYSTEM": "1",
+        })
+        env.start()
+        self.addCleanup(env.stop)
+        for key in ("GIT_DIR", "GIT_WORK_TREE", "GIT_INDEX_FILE", "GIT_AUTHOR_NAME", "GIT_AUTHOR_EMAIL"):
+            os.environ.pop(key, None)
+        self.root = Path(tmp.name) / "Demo"
+        self.write("src/main.cpp", b"int main() {}\n")
+        self.write("src/win.cpp", b"// CRLF\r\nint f() { return 0; }\r\n")
+        self.write(".gitignore", b"x64/\n*.user\n")
+        self.write("x64/Debug/Demo.exe", b"MZ")
+        self.write("Demo.vcxproj.user", b"<Project />\n")
+        self.write("assets/.gitignore", b"*.tmp\n!keep.tmp\n")
+        self.write("assets/a.tmp", b"tmp")
+        self.write("assets/keep.tmp", b"keep")
+
+    def write(self, rel: str, data: bytes):
+        path = self.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    def git(self, *args: str) -> str:
+        return subprocess.run(["git", *args], cwd=str(self.root), check=True, capture_output=True, text=True).stdout
+
+    def commit(self) -> bool:
+        return vsb.git_commit_initial(self.root, AUTHOR, "Initial import", quiet=True)
+
+    def test_commit_is_clean_and_respects_gitignore(self):
+        self.assertTrue(self.commit())
+        self.assertEqual(self.git("status", "--porcelain", "--untracked-files=all"), "")
+        self.assertEqual(self.git("ls-files").split(), [
+            ".gitignore", "assets/.gitignore", "assets/keep.tmp", "src/main.cpp", "src/win.cpp",
+        ])
+        self.assertEqual(self.git("log", "--format=%an <%ae>|%cn <%ce>|%s").strip(),
+                         f"{AUTHOR}|{AUTHOR}|Initial import")
+
+    def test_info_exclude_and_excludes_file(self):
+        self.git("init", "-q")
+        (self.root / ".git" / "info").mkdir(exist_ok=True)
+        (self.root / ".git" / "info" / "exclude").write_text("secret.txt\n", encoding="utf-8")
+        global_ignore = self.gitconfig.parent / "ignore"
+        global_ignore.write_text("*.log\n", encoding="utf-8")
+        self.gitconfig.write_text(f"[core]\n\texcludesFile = {global_ignore.as_posix()}\n", encoding="utf-8")
+        self.write("secret.txt", b"token")
+        self.write("build.log", b"log")
+        self.assertTrue(self.commit())
+        files = self.git("ls-files").split()
+        self.assertNotIn("secret.txt", files)
+        self.assertNotIn("build.log", files)
+        self.assertEqual(self.git("status", "--porcelain"), "")
+
+    def test_autocrlf_normalizes_line_endings(self):
+        self.git("init", "-q")
+        self.git("config", "core.autocrlf", "true")
+        self.assertTrue(self.commit())
+        self.assertEqual(self.git("status", "--porcelain"), "")
+        blob = subprocess.run(["git", "cat-file", "-p", "HEAD:src/win.cpp"], cwd=str(self.root),
+                              check=True, capture_output=True).stdout
+        self.assertEqual(blob, b"// CRLF\nint f() { return 0; }\n")
+
+    def test_skips_when_branch_has_commits(self):
+        self.assertTrue(self.commit())
+        self.write("src/extra.cpp", b"\n")
+        self.assertFalse(self.commit())
+        self.assertEqual(len(self.git("log", "--format=%H").split()), 1)
+
+if __name__ == "__main__":
+    unittest.main()
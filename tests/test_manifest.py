@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# --incremental: манифест .vsbuild/manifest.json, неизменившиеся файлы не перезаписываются,
+# изменённые руками или удалённые — перезаписываются.
+#
+#   python -m pytest -q tests
+#   python -m unittest discover tests
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import VS_build as vsb  # noqa: E402
+
+class ManifestTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.out = tmp.name
+        self.rendered = vsb.render(vsb.ProjectSpec(name="Demo", dotfiles_dir=None))
+        self.root = Path(tmp.name) / "Demo"
+        self.first = self.generate(incremental=True)
+
+    def generate(self, incremental: bool = True) -> dict:
+        return vsb.materialize(self.rendered, self.out, incremental=incremental, quiet=True)
+
+    def stamps(self) -> dict:
+        return {rel: (self.root / rel).stat().st_mtime_ns for rel in self.rendered.files}
+
+    def age(self, rel: str):
+        """Сдвигает mtime в прошлое: перезапись файла будет видна по mtime."""
+        path = self.root / rel
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - 10 ** 9))
+
+    def test_manifest_lists_every_file(self):
+        manifest = vsb.load_manifest(self.root)
+        self.assertEqual(set(manifest), set(self.rendered.files))
+        for rel, data in self.rendered.files.items():
+            self.assertEqual(manifest[rel]["sha256"], vsb.file_digest(data))
+            self.assertEqual(manifest[rel]["size"], len(data))
+        self.assertEqual(self.first["written"], len(self.rendered.files))
+
+    def test_unchanged_files_are_skipped(self):
+        for rel in self.rendered.files:
+            self.age(rel)
+        stamps = self.stamps()
+        info = self.generate()
+        self.assertEqual((info["written"], info["skipped"]), (0, len(self.rendered.files)))
+        self.assertEqual(self.stamps(), stamps)
+
+    def test_hand_edited_file_is_rewritten(self):
+        rel = "Demo.vcxproj"
+        data = (self.root / rel).read_bytes()
+        for edited in (data.replace(b"Level3", b"Level4"), data + b"\n"):
+            with self.subTest(same_size=len(edited) == len(data)):
+                (self.root / rel).write_bytes(edited)
+                info = self.generate()
+                self.assertEqual(info["written"], 1)
+                self.assertEqual((self.root / rel).read_bytes(), data)
+
+    def test_deleted_file_is_restored(self):
+        (self.root / "src" / "main.cpp").unlink()
+        info = self.generate()
+        self.assertEqual(info["written"], 1)
+        self.assertEqual((self.root / "src" / "main.cpp").read_bytes(), self.rendered.files["src/main.cpp"])
+
+    def test_touched_file_with_same_content_is_skipped(self):
+        rel = "Demo.sln"
+        self.age(rel)
+        stamp = (self.root / rel).stat().st_mtime_ns
+        info = self.generate()
+        self.assertEqual(info["written"], 0)
+        self.assertEqual((self.root / rel).stat().st_mtime_ns, stamp)
+        # Манифест запомнил новый mtime: следующий прогон сверит по нему, не читая файл
+        self.assertEqual(vsb.load_manifest(self.root)[rel]["mtime_ns"], stamp)
+
+    def test_bad_manifest_falls_back_to_content(self):
+        for text in ("not json", json.dumps({"version": vsb.MANIFEST_VERSION + 1, "files": {}})):
+            with self.subTest(manifest=text[:10]):
+                (self.root / vsb.MANIFEST_PATH).write_text(text, encoding="utf-8")
+                self.assertEqual(vsb.load_manifest(self.root), {})
+                for rel in self.rendered.files:
+                    self.age(rel)
+                stamps = self.stamps()
+                self.assertEqual(self.generate()["written"], 0)
+                self.assertEqual(self.stamps(), stamps)
+                self.assertEqual(set(vsb.load_manifest(self.root)), set(self.rendered.files))
+
+    def test_full_mode_rewrites_everything(self):
+        for rel in self.rendered.files:
+            self.age(rel)
+        stamps = self.stamps()
+        info = self.generate(incremental=False)
+        self.assertEqual(info["written"], len(self.rendered.files))
+        self.assertTrue(all(self.stamps()[rel] != stamps[rel] for rel in stamps))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# Точечная правка .vcxproj/.filters (add-class/add-file): insert_xml_items,
+# remove_xml_items и пересчёт unity-пачек patch_unity.
+#
+#   python -m pytest -q tests
+#   python -m unittest discover tests
+
+import re
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import VS_build as vsb  # noqa: E402
+
+NS = {"m": "http://schemas.microsoft.com/developer/msbuild/2003"}
+
+PROJECT = (
+    '<?xml version="1.0" encoding="utf-8"?>\r\n'
+    '<Project ToolsVersion="4.0" xmlns="http://schemas.microsoft.com/developer/msbuild/2003">\r\n'
+    "  <ItemGroup>\r\n"
+    '    <ClCompile Include="src\\App.cpp" />\r\n'
+    '    <ClCompile Include="src\\main.cpp">\r\n'
+    "      <!-- правка руками -->\r\n"
+    "      <WarningLevel>Level4</WarningLevel>\r\n"
+    "    </ClCompile>\r\n"
+    '    <ClCompile Include="src\\render\\gl.cpp" />\r\n'
+    "  </ItemGroup>\r\n"
+    '  <Import Project="$(VCTargetsPath)\\Microsoft.Cpp.targets" />\r\n'
+    "</Project>\r\n"
+)
+ANCHOR = '<Import Project="$(VCTargetsPath)\\Microsoft.Cpp.targets"'
+
+def block(path: str) -> str:
+    return vsb.render_vcx_item(vsb.ProjectItem("ClCompile", path))
+
+def includes(text: str, kind: str) -> list[str]:
+    return [m.group(2) for m in vsb.XML_ITEM_RE.finditer(text) if m.group(1) == kind]
+
+class XmlItemsTest(unittest.TestCase):
+    def test_insert_keeps_order_and_line_endings(self):
+        paths = ["src\\audio.cpp", "src\\b.cpp", "src\\zz.cpp"]
+        text, count = vsb.insert_xml_items(PROJECT, "ClCompile", {p: block(p) for p in paths}, ANCHOR)
+        self.assertEqual(count, 3)
+        self.assertEqual(
+            includes(text, "ClCompile"),
+            ["src\\App.cpp", "src\\audio.cpp", "src\\b.cpp", "src\\main.cpp", "src\\render\\gl.cpp", "src\\zz.cpp"],
+        )
+        self.assertNotIn("\n", text.replace("\r\n", ""))
+        self.assertIn("<WarningLevel>Level4</WarningLevel>", text)
+        ET.fromstring(text.encode("utf-8"))
+
+    def test_insert_skips_existing_case_insensitive(self):
+        text, count = vsb.insert_xml_items(PROJECT, "ClCompile", {"SRC\\MAIN.CPP": block("SRC\\MAIN.CPP")}, ANCHOR)
+        self.assertEqual((text, count), (PROJECT, 0))
+
+    def test_insert_creates_group_before_anchor(self):
+        text, count = vsb.insert_xml_items(
+            PROJECT, "ClInclude", {"include\\Demo\\a.h": '    <ClInclude Include="include\\Demo\\a.h" />\n'}, ANCHOR,
+        )
+        self.assertEqual(count, 1)
+        group = '  <ItemGroup>\r\n    <ClInclude Include="include\\Demo\\a.h" />\r\n  </ItemGroup>\r\n'
+        self.assertIn(group + "  " + ANCHOR, text)
+        self.assertEqual(text.replace(group, ""), PROJECT)
+
+    def test_insert_without_anchor_fails(self):
+        with self.assertRaises(SystemExit):
+            vsb.insert_xml_items(PROJECT, "None", {"assets\\a.txt": '    <None Include="assets\\a.txt" />\n'}, "<Nope")
+
+    def test_remove_whole_elements(self):
+        text, count = vsb.remove_xml_items(PROJECT, "ClCompile", ["src\\MAIN.cpp", "src\\missing.cpp"])
+        self.assertEqual(count, 1)
+        self.assertEqual(includes(text, "ClCompile"), ["src\\App.cpp", "src\\render\\gl.cpp"])
+        self.assertNotIn("WarningLevel", text)
+        self.assertEqual(vsb.remove_xml_items(PROJECT, "ClInclude", ["src\\main.cpp"]), (PROJECT, 0))
+
+    def test_insert_then_remove_round_trips(self):
+        paths = ["src\\a.cpp", "src\\render\\b.cpp"]
+        text, _ = vsb.insert_xml_items(PROJECT, "ClCompile", {p: block(p) for p in paths}, ANCHOR)
+        self.assertEqual(vsb.remove_xml_items(text, "ClCompile", paths), (PROJECT, 2))
+
+class PatchUnityTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.spec = vsb.ProjectSpec(name="Demo", dotfiles_dir=None, unity=4, profile_config=True,
+                                    unity_configs=["Release", vsb.PROFILE_CONFIG])
+        vsb.materialize(vsb.render(self.spec), tmp.name, quiet=True)
+        self.root = Path(tmp.name) / "Demo"
+        self.vcxproj_path = self.root / "Demo.vcxproj"
+
+    def add(self, *rels: str):
+        vsb.cmd_add_file([*rels, "-C", str(self.root), "-q"])
+
+    def unity_files(self) -> dict:
+        return {p.name: p.read_text(encoding="utf-8") for p in (self.root / vsb.UNITY_DIR).glob("*.cpp")}
+
+    def check_consistent(self):
+        text = self.vcxproj_path.read_text(encoding="utf-8-sig")
+        root = ET.fromstring(text.encode("utf-8"))
+        compiles = {e.get("Include"): e for e in root.iterfind("m:ItemGroup/m:ClCompile", NS)}
+        unity = sorted(p for p in compiles if p.startswith(vsb.UNITY_DIR + "\\"))
+        self.assertEqual(unity, sorted(f"{vsb.UNITY_DIR}\\{name}" for name in self.unity_files()))
+        # Каждый .cpp — ровно в одной пачке и исключён из сборки в unity-конфигурациях
+        included = re.findall(r'#include "\.\./(src/[^"]+)"', "".join(self.unity_files().values()))
+        sources = sorted(p.replace("\\", "/") for p in compiles if p.startswith("src\\"))
+        self.assertEqual(sorted(included), sources)
+        for path in sources:
+            excluded = {
+                e.get("Condition") for e in compiles[path.replace("/", "\\")].iterfind("m:ExcludedFromBuild", NS)
+                if e.text == "true"
+            }
+            self.assertEqual(len(excluded), 2, path)
+            self.assertTrue(all("Release" in c or vsb.PROFILE_CONFIG in c for c in excluded), path)
+        filters = (self.root / "Demo.vcxproj.filters").read_text(encoding="utf-8-sig")
+        self.assertEqual(sorted(includes(filters, "ClCompile")), sorted(compiles))
+
+    def test_add_rebatches_and_keeps_hand_edits(self):
+        text = self.vcxproj_path.read_text(encoding="utf-8-sig")
+        edited = text.replace("<WarningLevel>Level3</WarningLevel>", "<WarningLevel>Level4</WarningLevel>", 1)
+        self.assertNotEqual(edited, text)
+        self.vcxproj_path.write_text(edited, encoding="utf-8")
+
+        self.add(*[f"src/mod/unit{i:02d}.cpp" for i in range(24)])
+        self.check_consistent()
+        self.assertIn("<WarningLevel>Level4</WarningLevel>", self.vcxproj_path.read_text(encoding="utf-8-sig"))
+
+        before = self.unity_files()
+        self.add("src/mod/unit07b.cpp")
+        self.check_consistent()
+        after = self.unity_files()
+        changed = {name for name in set(before) | set(after) if before.get(name) != after.get(name)}
+        self.assertTrue(changed)
+        self.assertLessEqual(len(changed), 4)
+        self.assertLess(len(changed), len(after))
+
+    def test_header_only_leaves_unity_alone(self):
+        before = self.unity_files()
+        self.add("include/Demo/only.h")
+        self.assertEqual(self.unity_files(), before)
+        self.check_consistent()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# Точный список DLL для CopySdlDlls: import-библиотеки + таблицы импорта PE.
+# Фикстуры — маленькие PE и архивы COFF из tests/fixtures.py (работают и на Linux).
+#
+#   python -m pytest -q tests
+#   python -m unittest discover tests
+
+import os
+import struct
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import VS_build as vsb  # noqa: E402
+from fixtures import cli_args, fake_sdk, pe_dll  # noqa: E402
+
+def names(paths) -> list[str]:
+    return sorted(Path(p).name for p in paths)
+
+class PeFixturesTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.sdk = fake_sdk(self.root)
+        vsb._runtime_dll_cache.clear()
+        self.addCleanup(vsb._runtime_dll_cache.clear)
+
+    def implibs(self, *prefixes: str) -> list[tuple[str, str]]:
+        return [(self.sdk[f"{p}_lib"], f"{lib}.lib") for p, lib in prefixes]
+
+    def dll_dirs(self, *prefixes: str) -> list[str]:
+        return [self.sdk[f"{p}_dll_dir"] for p, _ in prefixes]
+
+    def test_pe_imports(self):
+        path = self.root / "test.dll"
+        path.write_bytes(pe_dll(["SDL2.dll", "KERNEL32.dll"]))
+        self.assertEqual(vsb.pe_imports(path), ["SDL2.dll", "KERNEL32.dll"])
+
+    def test_pe_imports_pe32_and_delay_load(self):
+        path = self.root / "test.dll"
+        for pe32, delay_va in ((False, False), (True, False), (True, True)):
+            with self.subTest(pe32=pe32, delay_va=delay_va):
+                path.write_bytes(pe_dll(["KERNEL32.dll"], ["SDL2_mixer.dll"], pe32=pe32, delay_va=delay_va))
+                self.assertEqual(vsb.pe_imports(path), ["KERNEL32.dll", "SDL2_mixer.dll"])
+
+    def test_pe_imports_rejects_non_pe(self):
+        path = self.root / "bogus.dll"
+        path.write_bytes(b"not a dll")
+        with self.assertRaises(ValueError):
+            vsb.pe_imports(path)
+
+    def test_import_lib_dll_name(self):
+        lib = Path(self.sdk["sdl2img_lib"])
+        self.assertEqual(vsb.read_import_lib_dll(lib / "SDL2_image.lib"), "SDL2_image.dll")
+        # SDL2main.lib — статическая, DLL у неё нет
+        self.assertIsNone(vsb.read_import_lib_dll(Path(self.sdk["sdl2_lib"]) / "SDL2main.lib"))
+
+    def test_transitive_imports_skip_optional_codecs(self):
+        libs = (("sdl2", "SDL2"), ("sdl2img", "SDL2_image"))
+        found, notes = vsb.resolve_runtime_dlls(
+            self.implibs(*libs) + [(self.sdk["sdl2_lib"], "SDL2main.lib")], self.dll_dirs(*libs),
+        )
+        self.assertEqual(notes, [])
+        self.assertEqual(names(found), ["SDL2.dll", "SDL2_image.dll", "libpng16-16.dll", "zlib1.dll"])
+        # libwebp-7.dll лежит рядом, но его никто не импортирует
+        self.assertTrue((Path(self.sdk["sdl2img_dll_dir"]) / "libwebp-7.dll").exists())
+        self.assertNotIn("libwebp-7.dll", names(found))
+
+    def test_missing_dll_falls_back(self):
+        libs = (("sdl2", "SDL2"), ("sdl2img", "SDL2_image"))
+        os.remove(Path(self.sdk["sdl2img_dll_dir"]) / "SDL2_image.dll")
+        found, notes = vsb.resolve_runtime_dlls(self.implibs(*libs), self.dll_dirs(*libs))
+        self.assertIsNone(found)
+        self.assertIn("SDL2_image.dll (from SDL2_image.lib) not found in DLL dirs", notes)
+
+    def test_missing_import_lib_falls_back(self):
+        found, notes = vsb.resolve_runtime_dlls([(self.sdk["sdl2_lib"], "SDL3.lib")], self.dll_dirs(("sdl2", "SDL2")))
+        self.assertIsNone(found)
+        self.assertEqual(notes, ["SDL3.lib not found, cannot read its DLL name"])
+
+    def test_cache_sees_changed_imports(self):
+        libs = (("sdl2", "SDL2"), ("sdl2img", "SDL2_image"))
+        found, _ = vsb.resolve_runtime_dlls(self.implibs(*libs), self.dll_dirs(*libs))
+        self.assertNotIn("libwebp-7.dll", names(found))
+        # Новая сборка SDL2_image тянет libwebp: mtime DLL меняется — кеш сбрасывается
+        dll = Path(self.sdk["sdl2img_dll_dir"]) / "SDL2_image.dll"
+        dll.write_bytes(pe_dll(["SDL2.dll", "libpng16-16.dll", "libwebp-7.dll"]))
+        st = dll.stat()
+        os.utime(dll, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        found, _ = vsb.resolve_runtime_dlls(self.implibs(*libs), self.dll_dirs(*libs))
+        self.assertIn("libwebp-7.dll", names(found))
+
+    def test_broken_pe_falls_back(self):
+        libs = (("sdl2", "SDL2"),)
+        (Path(self.sdk["sdl2_dll_dir"]) / "SDL2.dll").write_bytes(b"MZ" + b"\0" * 62 + struct.pack("<I", 0))
+        found, notes = vsb.resolve_runtime_dlls(self.implibs(*libs), self.dll_dirs(*libs))
+        self.assertIsNone(found)
+        self.assertTrue(notes[0].startswith("cannot read imports of "))
+
+    def test_copy_target_lists_only_needed_dlls(self):
+        cfg = vsb.build_config(True, cli_args(self.sdk))
+        self.assertEqual(
+            names(cfg["dlls"]),
+            ["SDL2.dll", "SDL2_image.dll", "SDL2_mixer.dll", "SDL2_ttf.dll", "libpng16-16.dll", "zlib1.dll"],
+        )
+        target = vsb.render_copy_dlls(cfg)
+        self.assertIn('Outputs="$(OutDir)SDL2.dll;', target)
+        self.assertNotIn("*.dll", target)
+        self.assertNotIn("libwebp", target)
+
+    def test_glob_mode_copies_everything(self):
+        cfg = vsb.build_config(False, cli_args(self.sdk, dll_copy="glob"))
+        self.assertIsNone(cfg["dlls"])
+        self.assertIn("\\*.dll", vsb.render_copy_dlls(cfg))
+
+if __name__ == "__main__":
+    unittest.main()
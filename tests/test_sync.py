@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# sync: элементы .vcxproj/.filters сверяются с деревом src/include/assets на месте,
+# правки руками остаются; unity-пачки и CMakeLists.txt следуют за файлами.
+#
+#   python -m pytest -q tests
+#   python -m unittest discover tests
+
+import re
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import VS_build as vsb  # noqa: E402
+
+NS = {"m": "http://schemas.microsoft.com/developer/msbuild/2003"}
+
+class SyncTest(unittest.TestCase):
+    def make(self, **fields) -> Path:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        spec = vsb.ProjectSpec(name="Demo", dotfiles_dir=None, **fields)
+        vsb.materialize(vsb.render(spec), tmp.name, quiet=True)
+        return Path(tmp.name) / "Demo"
+
+    def write(self, root: Path, rel: str, text: str = ""):
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+    def items(self, root: Path, name: str = "Demo.vcxproj") -> dict:
+        tree = ET.fromstring((root / name).read_bytes())
+        return {
+            kind: sorted(e.get("Include") for e in tree.iterfind(f"m:ItemGroup/m:{kind}", NS))
+            for kind in ("ClCompile", "ClInclude", "None")
+        }
+
+    def test_adds_and_removes_items(self):
+        root = self.make()
+        before = self.items(root)
+        self.write(root, "src/render/gl.cpp")
+        self.write(root, "include/Demo/render/gl.h", "#pragma once\n")
+        self.write(root, "assets/shaders/basic.glsl")
+        self.assertTrue(vsb.sync_project(root, quiet=True))
+        after = self.items(root)
+        self.assertIn("src\\render\\gl.cpp", after["ClCompile"])
+        self.assertIn("include\\Demo\\render\\gl.h", after["ClInclude"])
+        self.assertIn("assets\\shaders\\basic.glsl", after["None"])
+        self.assertEqual(self.items(root, "Demo.vcxproj.filters"), after)
+        filters = (root / "Demo.vcxproj.filters").read_text(encoding="utf-8-sig")
+        self.assertIn("<Filter>Source Files\\render</Filter>", filters)
+
+        (root / "src" / "render" / "gl.cpp").unlink()
+        self.assertTrue(vsb.sync_project(root, quiet=True))
+        after = self.items(root)
+        self.assertNotIn("src\\render\\gl.cpp", after["ClCompile"])
+        self.assertEqual(after["ClCompile"], before["ClCompile"])
+
+    def test_keeps_hand_edits(self):
+        root = self.make()
+        vcxproj = root / "Demo.vcxproj"
+        text = vcxproj.read_text(encoding="utf-8-sig")
+        custom = '  <ItemGroup>\n    <None Include="docs\\notes.md" />\n  </ItemGroup>\n'
+        text = text.replace("<WarningLevel>Level3</WarningLevel>", "<WarningLevel>Level4</WarningLevel>")
+        text = text.replace("</Project>", custom + "</Project>")
+        vcxproj.write_text(text, encoding="utf-8")
+        self.write(root, "src/extra.cpp")
+        self.assertTrue(vsb.sync_project(root, quiet=True))
+        synced = vcxproj.read_text(encoding="utf-8-sig")
+        self.assertIn("<WarningLevel>Level4</WarningLevel>", synced)
+        self.assertNotIn("<WarningLevel>Level3</WarningLevel>", synced)
+        # Элементы вне src/include/assets/unity не трогаются, даже если файла нет
+        self.assertIn(custom, synced)
+        self.assertEqual(synced.replace('    <ClCompile Include="src\\extra.cpp" />\n', ""), text)
+
+    def test_unchanged_tree_writes_nothing(self):
+        root = self.make()
+        self.write(root, "src/extra.cpp")
+        self.assertTrue(vsb.sync_project(root, quiet=True))
+        stamps = {p: p.stat().st_mtime_ns for p in root.glob("Demo.*")}
+        self.assertFalse(vsb.sync_project(root, quiet=True))
+        # --force сверяет элементы заново, но при совпадении тоже ничего не пишет
+        self.assertFalse(vsb.sync_project(root, force=True, quiet=True))
+        self.assertEqual({p: p.stat().st_mtime_ns for p in root.glob("Demo.*")}, stamps)
+
+    def test_unity_batches_follow_files(self):
+        root = self.make(unity=4)
+        for i in range(20):
+            self.write(root, f"src/mod/unit{i:02d}.cpp")
+        self.assertTrue(vsb.sync_project(root, quiet=True))
+        self.check_unity(root)
+        for i in range(0, 20, 3):
+            (root / "src" / "mod" / f"unit{i:02d}.cpp").unlink()
+        self.assertTrue(vsb.sync_project(root, quiet=True))
+        self.check_unity(root)
+
+    def check_unity(self, root: Path):
+        compiles = self.items(root)["ClCompile"]
+        unity = [p for p in compiles if p.startswith(vsb.UNITY_DIR + "\\")]
+        on_disk = sorted(f"{vsb.UNITY_DIR}\\{p.name}" for p in (root / vsb.UNITY_DIR).glob("*.cpp"))
+        self.assertEqual(unity, on_disk)
+        included = []
+        for path in on_disk:
+            text = (root / path.replace("\\", "/")).read_text(encoding="utf-8")
+            included += re.findall(r'#include "\.\./(src/[^"]+)"', text)
+        sources = sorted(p.replace("\\", "/") for p in compiles if p.startswith("src\\"))
+        self.assertEqual(sorted(included), sources)
+
+    def test_no_unity_files_without_unity(self):
+        root = self.make()
+        self.write(root, "src/extra.cpp")
+        vsb.sync_project(root, quiet=True)
+        self.assertFalse((root / vsb.UNITY_DIR).exists())
+
+    def test_cmake_lists_follow_files(self):
+        root = self.make(backends=["msbuild", "cmake"])
+        self.write(root, "src/net/socket.cpp")
+        self.assertTrue(vsb.sync_project(root, quiet=True))
+        self.assertIn("src/net/socket.cpp", (root / "CMakeLists.txt").read_text(encoding="utf-8"))
+        self.assertIn("src\\net\\socket.cpp", self.items(root)["ClCompile"])
+
+if __name__ == "__main__":
+    unittest.main()
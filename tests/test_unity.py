@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# Разбиение .cpp на unity-пачки: средний размер пачки и устойчивость к вставке файла.
+#
+#   python -m pytest -q tests
+#   python -m unittest discover tests
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import VS_build as vsb  # noqa: E402
+
+def sources(count: int, prefix: str = "unit") -> list[str]:
+    return [f"src\\mod{i // 40}\\{prefix}{i:05d}.cpp" for i in range(count)]
+
+def batches(paths: list[str], size: int) -> list[list[str]]:
+    return [batch for _, batch in vsb.plan_unity(paths, size)]
+
+class PlanUnityTest(unittest.TestCase):
+    def test_mean_batch_size_matches_request(self):
+        paths = sources(4000)
+        for size in (2, 3, 4, 5, 8, 16, 32):
+            with self.subTest(size=size):
+                lengths = [len(batch) for batch in batches(paths, size)]
+                mean = sum(lengths) / len(lengths)
+                # Раньше --unity 2/3 давали пачки по одному файлу, а N — в среднем ~N-1
+                self.assertGreater(mean, size * 0.85)
+                self.assertLess(mean, size * 1.1)
+                # Короче минимума бывает только хвост
+                self.assertGreaterEqual(min(lengths[:-1]), (size + 1) // 2)
+                self.assertLessEqual(max(lengths), 2 * size)
+
+    def test_small_sizes_actually_merge(self):
+        for size in (2, 3):
+            with self.subTest(size=size):
+                self.assertLess(len(batches(sources(200), size)), 200 * 0.7)
+
+    def test_covers_all_files_in_order(self):
+        paths = sources(500)
+        planned = vsb.plan_unity(list(reversed(paths)), 8)
+        self.assertEqual([p for _, batch in planned for p in batch], sorted(paths, key=str.lower))
+        names = [name for name, _ in planned]
+        self.assertEqual(len(names), len(set(names)))
+        self.assertTrue(all(name.startswith(f"{vsb.UNITY_DIR}/unity_") for name in names))
+
+    def test_insert_touches_few_batches(self):
+        paths = sources(800)
+        for size in (2, 3, 4, 8, 16):
+            with self.subTest(size=size):
+                before = dict((name, batch) for name, batch in vsb.plan_unity(paths, size))
+                counts = []
+                for path in paths[::7]:
+                    after = vsb.plan_unity(paths + [path[:-4] + "_new.cpp"], size)
+                    counts.append(sum(1 for name, batch in after if before.get(name) != batch))
+                # Пачка с новым файлом и изредка пара соседних, пока границы не совпадут снова
+                self.assertLess(sum(counts) / len(counts), 2.0)
+                self.assertLessEqual(max(counts), 10)
+                self.assertLess(max(counts), len(before) // 4)
+
+    def test_size_one_is_file_per_batch(self):
+        paths = sources(20)
+        self.assertEqual(batches(paths, 1), [[p] for p in sorted(paths, key=str.lower)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,614 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vsb_assets.py — упаковщик ассетов (pack-assets) и сборщик атласов (build-atlas).
+# Только stdlib. VS_build.py берёт отсюда тот же код и копирует файл как есть
+# в проекты с --asset-pack/--atlas (tools/vsb_assets.py, его зовут цели сборки).
+#
+#   python vsb_assets.py pack-assets assets bin/Release/assets.pak [--compress]
+#   python vsb_assets.py build-atlas assets/sprites assets/atlases [--max-size N]
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+IO_WORKERS = 8
+SCAN_IGNORE = (".git", ".vs", "Thumbs.db", "desktop.ini", ".DS_Store")
+
+# Архив ассетов (pack-assets): заголовок, отсортированный индекс, имена, данные.
+# Числа little-endian, данные записей выровнены на PACK_ALIGN (см. ASSET_PACK_H в VS_build.py)
+PACK_MAGIC = b"VSPK"
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct("<4sIII")        # magic, version, count, names_size
+PACK_ENTRY = struct.Struct("<QIIIHHII")      # offset, size, raw_size, name_offset, name_len, flags, crc32, 0
+PACK_ALIGN = 16
+PACK_DEFLATE = 1
+# Уже сжатые форматы не пережимаются
+PACK_STORED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".ogg", ".mp3", ".flac", ".opus", ".zip", ".gz", ".pak")
+PACK_MIN_COMPRESS = 256
+PACK_CACHE_VERSION = 1
+
+# Атласы (build-atlas): каждая папка assets/sprites/<атлас>/ — свой атлас,
+# PNG прямо в sprites/ — атлас "sprites". Индекс <атлас>.atlas — см. SPRITE_ATLAS_H в VS_build.py
+ATLAS_MAGIC = b"VSAT"
+ATLAS_VERSION = 1
+ATLAS_HEADER = struct.Struct("<4sIIII")      # magic, version, pages, sprites, names_size
+ATLAS_PAGE = struct.Struct("<IIII")          # name_offset, name_len, width, height
+ATLAS_SPRITE = struct.Struct("<IIHHHHHH")    # name_offset, name_len, page, x, y, w, h, 0
+ATLAS_CACHE_NAME = ".atlas-cache.json"
+ATLAS_CACHE_VERSION = 1
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def parallel_map(fn, items, workers: int = IO_WORKERS) -> list:
+    """map() пулом потоков (порядок результатов сохраняется); workers<=1 — обычный map."""
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        return list(pool.map(fn, items))
+
+def walk_files(root: Path, rel_prefix: str = "", skip: tuple[str, ...] = (".git",)) -> list[tuple[str, Path]]:
+    """Рекурсивный обход через os.scandir: [(rel через /, путь)], отсортировано."""
+    found = []
+    stack = [(root, rel_prefix)]
+    while stack:
+        d, rel = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for e in entries:
+            if e.name in skip:
+                continue
+            erel = f"{rel}/{e.name}" if rel else e.name
+            if e.is_dir(follow_symlinks=False):
+                stack.append((Path(e.path), erel))
+            elif e.is_file():
+                found.append((erel, Path(e.path)))
+    found.sort()
+    return found
+
+# ---- Упаковка ассетов ----
+
+def pack_cache_path(out_path: Path) -> Path:
+    return out_path.with_name(out_path.name + ".cache.json")
+
+def deflate(data: bytes) -> bytes:
+    # raw deflate (без zlib-заголовка) — его и распаковывает AssetPack
+    c = zlib.compressobj(9, zlib.DEFLATED, -15)
+    return c.compress(data) + c.flush()
+
+def pack_align(n: int) -> int:
+    return (n + PACK_ALIGN - 1) // PACK_ALIGN * PACK_ALIGN
+
+def pack_assets(
+    assets_dir,
+    out_path,
+    compress: bool = False,
+    quiet: bool = False,
+    io_workers: int = IO_WORKERS,
+    exclude: tuple[str, ...] = (),
+) -> bool:
+    """Упаковывает assets_dir в один архив (exclude — папки верхнего уровня, которые
+    не упаковываются, например исходные спрайты атласов). Инкрементально: хеши файлов и
+    положение записей хранятся в <out>.cache.json; неизменившиеся записи
+    (и уже сжатые данные) берутся из старого архива. True — архив переписан."""
+    started = time.perf_counter()
+    assets_dir, out_path = Path(assets_dir), Path(out_path)
+    if not assets_dir.is_dir():
+        raise SystemExit(f"Assets folder not found: {assets_dir}")
+    files = [
+        (rel, path) for rel, path in walk_files(assets_dir, "", SCAN_IGNORE)
+        if not rel.rsplit("/", 1)[-1].startswith(".") and rel.split("/", 1)[0] not in exclude
+    ]
+    # Индекс сортируется по байтам UTF-8 — в таком порядке ищет AssetPack::find
+    files.sort(key=lambda f: f[0].encode("utf-8"))
+
+    cache_path = pack_cache_path(out_path)
+    try:
+        cache = json.loads(cache_path.read_text(encoding="utf-8"))
+        if cache.get("version") != PACK_CACHE_VERSION or cache.get("compress") != compress:
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    old_entries = cache.get("entries", {})
+
+    def hash_file(item):
+        rel, path = item
+        st = path.stat()
+        old = old_entries.get(rel)
+        if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+            return rel, path, st, old["sha256"], None
+        data = path.read_bytes()
+        return rel, path, st, hashlib.sha256(data).hexdigest(), data
+
+    hashed = parallel_map(hash_file, files, io_workers)
+    try:
+        pak_size = out_path.stat().st_size
+    except OSError:
+        pak_size = -1
+    old_pak_valid = pak_size == cache.get("pak_size")
+    if old_pak_valid and [(rel, sha) for rel, _, _, sha, _ in hashed] == [
+        (rel, e["sha256"]) for rel, e in old_entries.items()
+    ]:
+        # Содержимое то же: только обновить mtime, чтобы MSBuild считал цель актуальной
+        os.utime(out_path)
+        if not quiet:
+            print(f"  pack: {out_path} up to date ({len(hashed)} files)")
+        return False
+
+    # Неизменившиеся записи (в т.ч. уже сжатые) копируются из старого архива как есть
+    jobs, reused = [], 0
+    old_pak = open(out_path, "rb") if old_pak_valid else None
+    try:
+        for rel, path, st, sha, data in hashed:
+            old = old_entries.get(rel)
+            if old_pak is not None and old and old["sha256"] == sha:
+                old_pak.seek(old["offset"])
+                jobs.append((rel, path, data, (old_pak.read(old["stored"]), old["raw_size"], old["flags"], old["crc32"])))
+                reused += 1
+            else:
+                jobs.append((rel, path, data, None))
+    finally:
+        if old_pak is not None:
+            old_pak.close()
+
+    def encode_entry(job):
+        rel, path, data, ready = job
+        if ready is not None:
+            return ready
+        if data is None:
+            data = path.read_bytes()
+        crc = zlib.crc32(data)
+        if compress and len(data) >= PACK_MIN_COMPRESS and not rel.lower().endswith(PACK_STORED_EXTENSIONS):
+            packed = deflate(data)
+            # Сжатие должно окупать распаковку
+            if len(packed) <= len(data) * 0.9:
+                return packed, len(data), PACK_DEFLATE, crc
+        return data, len(data), 0, crc
+
+    encoded = parallel_map(encode_entry, jobs, io_workers)
+
+    names = [rel.encode("utf-8") for rel, *_ in hashed]
+    names_size = sum(len(n) for n in names)
+    offset = pack_align(PACK_HEADER.size + PACK_ENTRY.size * len(names) + names_size)
+    index, name_offset, entries = [], 0, {}
+    for (rel, path, st, sha, _), name, (stored, raw_size, flags, crc) in zip(hashed, names, encoded):
+        index.append(PACK_ENTRY.pack(offset, len(stored), raw_size, name_offset, len(name), flags, crc, 0))
+        entries[rel] = {
+            "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha,
+            "offset": offset, "stored": len(stored), "raw_size": raw_size, "flags": flags, "crc32": crc,
+        }
+        name_offset += len(name)
+        offset = pack_align(offset + len(stored))
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(names), names_size))
+        f.write(b"".join(index))
+        f.write(b"".join(names))
+        for (stored, *_), entry in zip(encoded, entries.values()):
+            f.write(b"\0" * (entry["offset"] - f.tell()))
+            f.write(stored)
+    os.replace(tmp, out_path)
+    cache = {
+        "version": PACK_CACHE_VERSION, "compress": compress,
+        "pak_size": out_path.stat().st_size, "entries": entries,
+    }
+    cache_path.write_text(json.dumps(cache, indent=1) + "\n", encoding="utf-8")
+
+    if not quiet:
+        raw_total = sum(e["raw_size"] for e in entries.values())
+        stored_total = sum(e["stored"] for e in entries.values())
+        print(f"  pack: {out_path}: {len(entries)} files, {raw_total} -> {stored_total} bytes, "
+              f"reused {reused}, {time.perf_counter() - started:.2f}s")
+    return True
+
+def cmd_pack_assets(argv: list[str]):
+    p = argparse.ArgumentParser(
+        prog="vsb_assets.py pack-assets",
+        description="Упаковать папку ассетов в один индексированный архив (для AssetPack)",
+    )
+    p.add_argument("assets", help="Папка ассетов (assets/ проекта)")
+    p.add_argument("output", help="Файл архива, например bin/Release/assets.pak")
+    p.add_argument("--compress", action="store_true", help="Сжимать записи deflate, где это выгодно")
+    p.add_argument("--exclude", action="append", default=[], help="Не упаковывать папку верхнего уровня (можно несколько)")
+    p.add_argument("--io-workers", type=int, default=IO_WORKERS, help="Потоков для хеширования/сжатия")
+    p.add_argument("-q", "--quiet", action="store_true")
+    args = p.parse_args(argv)
+    pack_assets(
+        args.assets, args.output, compress=args.compress, quiet=args.quiet,
+        io_workers=args.io_workers, exclude=tuple(args.exclude),
+    )
+
+# ---- Атласы спрайтов ----
+
+def png_chunks(data: bytes):
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("not a PNG file")
+    pos = len(PNG_SIGNATURE)
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        yield kind, data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+
+def png_unfilter(raw: bytes, width: int, height: int, bpp: int) -> bytearray:
+    """Снимает построчные фильтры PNG (None/Sub/Up/Average/Paeth); bpp — байт на пиксель (>= 1)."""
+    stride = width * bpp
+    out = bytearray()
+    prev = bytearray(stride)
+    pos = 0
+    step = bpp
+    for _ in range(height):
+        ftype = raw[pos]
+        line = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += 1 + stride
+        if ftype == 1:
+            for i in range(step, stride):
+                line[i] = (line[i] + line[i - step]) & 0xFF
+        elif ftype == 2:
+            line = bytearray((a + b) & 0xFF for a, b in zip(line, prev))
+        elif ftype == 3:
+            for i in range(stride):
+                left = line[i - step] if i >= step else 0
+                line[i] = (line[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif ftype == 4:
+            for i in range(stride):
+                a = line[i - step] if i >= step else 0
+                b = prev[i]
+                c = prev[i - step] if i >= step else 0
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                line[i] = (line[i] + (a if pa <= pb and pa <= pc else b if pb <= pc else c)) & 0xFF
+        elif ftype != 0:
+            raise ValueError(f"bad PNG filter {ftype}")
+        out += line
+        prev = line
+    return out
+
+def png_read(path: Path) -> tuple[int, int, bytearray]:
+    """Декодирует PNG в RGBA8: (ширина, высота, пиксели). Без чересстрочных (Adam7)."""
+    data = path.read_bytes()
+    idat, palette, trns = [], b"", b""
+    for kind, chunk in png_chunks(data):
+        if kind == b"IHDR":
+            width, height, depth, ctype, _, _, interlace = struct.unpack(">IIBBBBB", chunk)
+        elif kind == b"PLTE":
+            palette = chunk
+        elif kind == b"tRNS":
+            trns = chunk
+        elif kind == b"IDAT":
+            idat.append(chunk)
+        elif kind == b"IEND":
+            break
+    if interlace:
+        raise ValueError("interlaced PNG is not supported (re-save without interlacing)")
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}.get(ctype)
+    if channels is None or depth not in (1, 2, 4, 8, 16) or (depth < 8 and ctype not in (0, 3)):
+        raise ValueError(f"unsupported PNG format (color type {ctype}, depth {depth})")
+
+    row_bits = width * channels * depth
+    stride = (row_bits + 7) // 8
+    raw = zlib.decompress(b"".join(idat))
+    # Для фильтров < 8 бит строка — просто stride байт по одному
+    if depth < 8:
+        px = png_unfilter(raw, stride, height, 1)
+    else:
+        px = png_unfilter(raw, width, height, channels * depth // 8)
+    if depth == 16:
+        px = px[0::2]
+    elif depth < 8:
+        # Распаковка 1/2/4-битных индексов/градаций серого по байту на пиксель
+        mask, per_byte = (1 << depth) - 1, 8 // depth
+        values = bytearray()
+        for y in range(height):
+            row = px[y * stride:(y + 1) * stride]
+            values += bytes(
+                (row[i // per_byte] >> (8 - depth * (i % per_byte + 1))) & mask for i in range(width)
+            )
+        if ctype == 0:
+            scale = 255 // mask
+            values = bytearray(v * scale for v in values)
+        px = values
+
+    n = width * height
+    if ctype == 6:
+        return width, height, px
+    rgba = bytearray(n * 4)
+    if ctype == 3:
+        alpha = trns + b"\xff" * (256 - len(trns))
+        lut = [palette[i * 3:i * 3 + 3] + alpha[i:i + 1] for i in range(len(palette) // 3)]
+        return width, height, bytearray(b"".join(lut[i] for i in px))
+    if ctype == 2:
+        rgba[0::4], rgba[1::4], rgba[2::4] = px[0::3], px[1::3], px[2::3]
+        rgba[3::4] = b"\xff" * n
+    elif ctype == 0:
+        rgba[0::4] = rgba[1::4] = rgba[2::4] = px
+        rgba[3::4] = b"\xff" * n
+    else:
+        rgba[0::4] = rgba[1::4] = rgba[2::4] = px[0::2]
+        rgba[3::4] = px[1::2]
+    return width, height, rgba
+
+def png_write(width: int, height: int, rgba: bytes) -> bytes:
+    """RGBA8 -> PNG (фильтр None: атласы в основном прозрачные, zlib справляется)."""
+    stride = width * 4
+    raw = b"".join(b"\0" + rgba[y * stride:(y + 1) * stride] for y in range(height))
+
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    return (
+        PNG_SIGNATURE
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 9))
+        + chunk(b"IEND", b"")
+    )
+
+class MaxRects:
+    """Упаковщик прямоугольников MaxRects, эвристика Best Short Side Fit, без поворотов."""
+
+    def __init__(self, width: int, height: int):
+        self.free = [(0, 0, width, height)]
+
+    def insert(self, w: int, h: int) -> Optional[tuple[int, int]]:
+        best, best_score = None, None
+        for fx, fy, fw, fh in self.free:
+            if w <= fw and h <= fh:
+                score = (min(fw - w, fh - h), max(fw - w, fh - h), fy, fx)
+                if best_score is None or score < best_score:
+                    best, best_score = (fx, fy), score
+        if best is None:
+            return None
+        x, y = best
+        free = []
+        for f in self.free:
+            fx, fy, fw, fh = f
+            if x >= fx + fw or x + w <= fx or y >= fy + fh or y + h <= fy:
+                free.append(f)
+                continue
+            # Свободный прямоугольник, задетый новым, режется на до 4 максимальных
+            if x > fx:
+                free.append((fx, fy, x - fx, fh))
+            if x + w < fx + fw:
+                free.append((x + w, fy, fx + fw - x - w, fh))
+            if y > fy:
+                free.append((fx, fy, fw, y - fy))
+            if y + h < fy + fh:
+                free.append((fx, y + h, fw, fy + fh - y - h))
+        # Убрать вложенные друг в друга
+        free.sort(key=lambda r: r[2] * r[3], reverse=True)
+        pruned = []
+        for r in free:
+            if not any(
+                r[0] >= q[0] and r[1] >= q[1] and r[0] + r[2] <= q[0] + q[2] and r[1] + r[3] <= q[1] + q[3]
+                for q in pruned
+            ):
+                pruned.append(r)
+        self.free = pruned
+        return x, y
+
+def pow2_sizes(min_w: int, min_h: int, area: int, max_size: int) -> list[tuple[int, int]]:
+    """Размеры страниц (степени двойки), в которые может влезть area, по возрастанию площади."""
+    sizes = []
+    w = 1
+    while w <= max_size:
+        h = 1
+        while h <= max_size:
+            if w >= min_w and h >= min_h and w * h >= area:
+                sizes.append((w, h))
+            h *= 2
+        w *= 2
+    # При равной площади — ближе к квадрату
+    return sorted(sizes, key=lambda s: (s[0] * s[1], abs(s[0] - s[1]), -s[0]))
+
+def pack_rects(sizes: dict, max_size: int, padding: int) -> list[tuple[int, int, dict]]:
+    """Раскладывает {имя: (w, h)} по страницам: [(ширина, высота, {имя: (x, y)})].
+    Страница — наименьшая степень двойки, куда влезает всё оставшееся; иначе
+    max_size x max_size и сколько влезет."""
+    order = sorted(sizes, key=lambda n: (-max(sizes[n]), -sizes[n][0] * sizes[n][1], n.encode("utf-8")))
+    for name in order:
+        w, h = sizes[name]
+        if w > max_size or h > max_size:
+            raise SystemExit(f"Sprite {name} ({w}x{h}) does not fit into {max_size}x{max_size} atlas")
+
+    def try_pack(width, height, names, partial):
+        # Страница шире на padding: у правого/нижнего края отступ не нужен
+        bins = MaxRects(width + padding, height + padding)
+        placed = {}
+        for name in names:
+            w, h = sizes[name]
+            pos = bins.insert(w + padding, h + padding)
+            if pos is None:
+                if not partial:
+                    return None
+                continue
+            placed[name] = pos
+        return placed
+
+    pages = []
+    remaining = order
+    while remaining:
+        area = sum((sizes[n][0] + padding) * (sizes[n][1] + padding) for n in remaining)
+        min_w = max(sizes[n][0] for n in remaining)
+        min_h = max(sizes[n][1] for n in remaining)
+        for width, height in pow2_sizes(min_w, min_h, area, max_size):
+            placed = try_pack(width, height, remaining, partial=False)
+            if placed is not None:
+                break
+        else:
+            width = height = max_size
+            placed = try_pack(width, height, remaining, partial=True)
+        pages.append((width, height, placed))
+        remaining = [n for n in remaining if n not in placed]
+    return pages
+
+def atlas_index(pages: list, rects: dict) -> bytes:
+    """Бинарный индекс: pages — [(файл, w, h)], rects — {имя: (страница, x, y, w, h)}."""
+    names = bytearray()
+
+    def name_ref(text: str) -> tuple[int, int]:
+        data = text.encode("utf-8")
+        names.extend(data)
+        return len(names) - len(data), len(data)
+
+    page_rows = [ATLAS_PAGE.pack(*name_ref(f), w, h) for f, w, h in pages]
+    sprite_rows = [
+        ATLAS_SPRITE.pack(*name_ref(name), *rects[name], 0)
+        for name in sorted(rects, key=lambda n: n.encode("utf-8"))
+    ]
+    header = ATLAS_HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, len(pages), len(rects), len(names))
+    return header + b"".join(page_rows) + b"".join(sprite_rows) + bytes(names)
+
+def build_atlas(name: str, sprites: list[tuple[str, Path]], out_dir: Path, max_size: int, padding: int) -> dict:
+    """Собирает один атлас; возвращает описание для кеша и отчёта."""
+    images = {}
+    for sprite_name, path in sprites:
+        try:
+            images[sprite_name] = png_read(path)
+        except (ValueError, zlib.error, struct.error) as e:
+            raise SystemExit(f"Cannot read {path}: {e}")
+    sizes = {n: (img[0], img[1]) for n, img in images.items()}
+    layout = pack_rects(sizes, max_size, padding)
+
+    outputs, pages, rects = [], [], {}
+    for page_no, (width, height, placed) in enumerate(layout):
+        canvas = bytearray(width * height * 4)
+        for sprite_name, (x, y) in placed.items():
+            w, h, px = images[sprite_name]
+            for row in range(h):
+                at = ((y + row) * width + x) * 4
+                canvas[at:at + w * 4] = px[row * w * 4:(row + 1) * w * 4]
+            rects[sprite_name] = (page_no, x, y, w, h)
+        page_file = f"{name}_{page_no}.png"
+        (out_dir / page_file).write_bytes(png_write(width, height, bytes(canvas)))
+        pages.append((page_file, width, height))
+        outputs.append(page_file)
+
+    (out_dir / f"{name}.atlas").write_bytes(atlas_index(pages, rects))
+    index = {
+        "pages": [{"file": f, "width": w, "height": h} for f, w, h in pages],
+        "sprites": {
+            n: dict(zip(("page", "x", "y", "w", "h"), rects[n]))
+            for n in sorted(rects, key=lambda n: n.encode("utf-8"))
+        },
+    }
+    (out_dir / f"{name}.json").write_text(json.dumps(index, indent=1) + "\n", encoding="utf-8")
+    outputs += [f"{name}.atlas", f"{name}.json"]
+
+    used = sum(w * h for w, h in sizes.values())
+    total = sum(w * h for _, w, h in pages)
+    return {"outputs": outputs, "sprites": len(sizes), "pages": [[w, h] for _, w, h in pages],
+            "efficiency": used / total if total else 1.0}
+
+def build_atlases(
+    sprites_dir,
+    out_dir,
+    max_size: int = 2048,
+    padding: int = 1,
+    force: bool = False,
+    quiet: bool = False,
+    io_workers: int = IO_WORKERS,
+) -> list[str]:
+    """Собирает атласы из sprites_dir/<атлас>/**/*.png в out_dir: <атлас>_<N>.png,
+    <атлас>.atlas (бинарный индекс), <атлас>.json. Пересобираются только атласы,
+    у которых изменился набор или содержимое PNG. Возвращает пересобранные."""
+    sprites_dir, out_dir = Path(sprites_dir), Path(out_dir)
+    if max_size & (max_size - 1) or not 0 < max_size <= 65536:
+        raise SystemExit(f"--max-size must be a power of two up to 65536, got {max_size}")
+    groups = {}
+    for rel, path in walk_files(sprites_dir, "", SCAN_IGNORE):
+        if not rel.lower().endswith(".png"):
+            continue
+        atlas, _, sprite = rel.partition("/")
+        if not sprite:
+            atlas, sprite = sprites_dir.name, rel
+        groups.setdefault(atlas, []).append((sprite[:-4], path))
+
+    cache_path = out_dir / ATLAS_CACHE_NAME
+    options = {"max_size": max_size, "padding": padding}
+    try:
+        cache = json.loads(cache_path.read_text(encoding="utf-8"))
+        if cache.get("version") != ATLAS_CACHE_VERSION or cache.get("options") != options:
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    old_atlases = cache.get("atlases", {})
+    old_files = {f["path"]: f for a in old_atlases.values() for f in a["inputs"]}
+
+    def fingerprint(item):
+        sprite, path = item
+        st = path.stat()
+        key = path.as_posix()
+        old = old_files.get(key)
+        if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+            sha = old["sha256"]
+        else:
+            sha = hashlib.sha256(path.read_bytes()).hexdigest()
+        return {"path": key, "sprite": sprite, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha}
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    atlases, rebuilt = {}, []
+    for atlas in sorted(groups):
+        inputs = parallel_map(fingerprint, groups[atlas], io_workers)
+        old = old_atlases.get(atlas)
+        signature = [(f["sprite"], f["sha256"]) for f in inputs]
+        if (
+            not force and old
+            and [(f["sprite"], f["sha256"]) for f in old["inputs"]] == signature
+            and all((out_dir / f).exists() for f in old["outputs"])
+        ):
+            atlases[atlas] = dict(old, inputs=inputs)
+            continue
+        info = build_atlas(atlas, groups[atlas], out_dir, max_size, padding)
+        atlases[atlas] = dict(info, inputs=inputs)
+        rebuilt.append(atlas)
+        if not quiet:
+            pages = ", ".join(f"{w}x{h}" for w, h in info["pages"])
+            print(f"  atlas {atlas}: {info['sprites']} sprites -> {len(info['pages'])} page(s) {pages}, "
+                  f"efficiency {info['efficiency']:.1%}")
+
+    # Страницы, которых больше нет (атлас удалён или стал меньше)
+    current = {f for a in atlases.values() for f in a["outputs"]}
+    for a in old_atlases.values():
+        for f in a["outputs"]:
+            if f not in current:
+                (out_dir / f).unlink(missing_ok=True)
+
+    cache_path.write_text(
+        json.dumps({"version": ATLAS_CACHE_VERSION, "options": options, "atlases": atlases}, indent=1) + "\n",
+        encoding="utf-8",
+    )
+    if not quiet and not rebuilt:
+        print(f"  atlas: up to date ({len(atlases)} atlases)")
+    return rebuilt
+
+def cmd_build_atlas(argv: list[str]):
+    p = argparse.ArgumentParser(
+        prog="vsb_assets.py build-atlas",
+        description="Собрать атласы спрайтов: каждая папка <sprites>/<атлас>/ — свой атлас",
+    )
+    p.add_argument("sprites", help="Папка со спрайтами (assets/sprites проекта)")
+    p.add_argument("output", help="Куда писать атласы (assets/atlases)")
+    p.add_argument("--max-size", type=int, default=2048, help="Максимальная сторона страницы (степень двойки)")
+    p.add_argument("--padding", type=int, default=1, help="Прозрачный зазор между спрайтами, px")
+    p.add_argument("--force", action="store_true", help="Пересобрать все атласы")
+    p.add_argument("-q", "--quiet", action="store_true")
+    args = p.parse_args(argv)
+    build_atlases(args.sprites, args.output, args.max_size, args.padding, force=args.force, quiet=args.quiet)
+
+COMMANDS = {"pack-assets": cmd_pack_assets, "build-atlas": cmd_build_atlas}
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        raise SystemExit(f"usage: vsb_assets.py {{{','.join(COMMANDS)}}} ...")
+    COMMANDS[sys.argv[1]](sys.argv[2:])
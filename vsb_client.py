@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vsb_client.py — тонкий клиент демона `VS_build.py serve` для плагинов редактора.
+# Только stdlib, генератор не импортирует: запуск — время старта интерпретатора.
+# Без демона не генерирует сам (код выхода 3) — тогда зовите VS_build.py напрямую.
+#
+#   python vsb_client.py TestProject --incremental
+#   python vsb_client.py --json sync D:\Code\TestProject
+#   python vsb_client.py --stats
+#
+# Протокол — README, раздел «Резидентный генератор (serve / client)».
+
+import json
+import os
+import sys
+from multiprocessing.connection import Client
+from pathlib import Path
+
+NO_DAEMON_EXIT_CODE = 3
+
+def default_address() -> str:
+    """Тот же адрес, что serve_address() в VS_build.py."""
+    if sys.platform == "win32":
+        import getpass
+        try:
+            user = getpass.getuser()
+        except (ImportError, KeyError, OSError):
+            user = "default"
+        return "\\\\.\\pipe\\vsbuild-" + user
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if not base:
+        cache = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+        base = (Path(cache) if cache else Path.home() / ".cache") / "VS_build"
+    return str(Path(base) / "vsbuild.sock")
+
+def request(address: str, message: dict) -> dict:
+    with Client(address) as conn:
+        conn.send_bytes(json.dumps(message).encode("utf-8"))
+        return json.loads(conn.recv_bytes())
+
+def main(argv: list[str]) -> int:
+    address = default_address()
+    as_json = False
+    message = None
+    rest = list(argv)
+    while rest:
+        if rest[0] == "--socket" and len(rest) > 1:
+            address = rest[1]
+            rest = rest[2:]
+        elif rest[0] == "--json":
+            as_json = True
+            rest = rest[1:]
+        elif rest[0] in ("--ping", "--stats", "--shutdown"):
+            message = {"cmd": rest[0][2:]}
+            rest = rest[1:]
+        elif rest[0] == "--":
+            rest = rest[1:]
+            break
+        else:
+            break
+    if message is None:
+        if not rest:
+            print("Usage: vsb_client.py [--socket ADDR] [--json] [--ping|--stats|--shutdown] [--] <args...>",
+                  file=sys.stderr)
+            return 2
+        message = {"cmd": "run", "argv": rest, "cwd": os.getcwd()}
+
+    try:
+        reply = request(address, message)
+    except OSError as e:
+        print(f"vsb_client: no daemon on {address} ({e})", file=sys.stderr)
+        return NO_DAEMON_EXIT_CODE
+    except (EOFError, ValueError) as e:
+        print(f"vsb_client: daemon failed: {e!r}", file=sys.stderr)
+        return 1
+
+    if as_json or message["cmd"] != "run":
+        print(json.dumps(reply, indent=2))
+    else:
+        sys.stdout.write(reply.get("output", ""))
+    return reply.get("exit_code", 0 if reply.get("ok") else 1)
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))